@@ -1,6 +1,25 @@
 from django.contrib import admin
-from .models import Project, ProposalUtility
+from .models import IntervalSeries, Project, ProposalUtility, ServiceTerritory, Tariff, WebhookOutbox
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'name', 'selected_rate', 'created_at']
+    # __str__ reads the owner's username
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+
+
+@admin.register(ProposalUtility)
+class ProposalUtilityAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'rate_name', 'first_year_cost', 'computed_at']
+    # __str__ reads the project's address
+    list_select_related = ['project']
+    raw_id_fields = ['project']
+
 
 # Register the models
-admin.site.register(Project)
-admin.site.register(ProposalUtility)
+admin.site.register(WebhookOutbox)
+admin.site.register(IntervalSeries)
+admin.site.register(ServiceTerritory)
+admin.site.register(Tariff)
@@ -57,6 +57,8 @@ export const ProjectCard = ({
   const [loading, setLoading] = useState(false);
   const [tabValue, setTabValue] = useState(0);
   const [hasCalculatedRates, setHasCalculatedRates] = useState(false);
+  // List entries carry a preview; projects saved in this session the full text
+  const description = project?.description ?? project?.description_preview;
 
   useEffect(() => {
     if (project.selected_rate && calculatedRates.length > 0) {
@@ -246,7 +248,7 @@ export const ProjectCard = ({
           <RateDetailsSection />
         </Collapse>
 
-        {project?.description && (
+        {description && (
           <Typography
             variant="body2"
             color="text.secondary"
@@ -260,7 +262,7 @@ export const ProjectCard = ({
               lineHeight: 1.6
             }}
           >
-            {project.description}
+            {description}
           </Typography>
         )}
 
@@ -5,6 +5,7 @@ import {
   Alert,
   Box,
   Stack,
+  Button,
   CircularProgress,
   Backdrop
 } from '@mui/material';
@@ -16,6 +17,9 @@ import { ProjectEditDialog } from './ProjectEditDialog';
 const ProjectDashboard = () => {
   const {
     projects,
+    hasMoreProjects,
+    loadMoreProjects,
+    fetchProject,
     loading,
     error,
     setError,
@@ -148,6 +152,14 @@ const ProjectDashboard = () => {
               />
             ))}
           </Stack>
+
+          {hasMoreProjects && (
+            <Box sx={{ mt: 2, textAlign: 'center' }}>
+              <Button variant="outlined" onClick={loadMoreProjects} disabled={loading}>
+                Load more
+              </Button>
+            </Box>
+          )}
         </Box>
 
         <Backdrop
@@ -162,6 +174,7 @@ const ProjectDashboard = () => {
           open={editDialogOpen}
           onClose={handleEditClose}
           onSave={handleEditSave}
+          fetchProject={fetchProject}
           disabled={loading}
         />
       </Box>
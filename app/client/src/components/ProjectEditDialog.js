@@ -18,10 +18,12 @@ export const ProjectEditDialog = ({
   open,
   onClose,
   onSave,
+  fetchProject,
   disabled
 }) => {
-  const { editedProject, handleInputChange, handleSubmit } = useProjectEdit({
+  const { editedProject, descriptionLoaded, handleInputChange, handleSubmit } = useProjectEdit({
     project,
+    fetchProject,
     onSave,
     onClose
   });
@@ -99,6 +101,7 @@ export const ProjectEditDialog = ({
                 multiline
                 rows={3}
                 label="Description"
+                placeholder={descriptionLoaded ? '' : 'Loading description...'}
                 value={editedProject.description}
                 onChange={handleInputChange('description')}
               />
@@ -1,7 +1,8 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 
 export const useProjectEdit = ({
   project,
+  fetchProject,
   selectRate,
   initialRates = [],
   onSave,
@@ -15,9 +16,14 @@ export const useProjectEdit = ({
     percentage: '',
     selectedRate: ''
   });
+  const [descriptionLoaded, setDescriptionLoaded] = useState(false);
+  const descriptionEdited = useRef(false);
 
   useEffect(() => {
+    let cancelled = false;
     if (project) {
+      descriptionEdited.current = false;
+      setDescriptionLoaded(project.description !== undefined);
       setEditedProject({
         name: project.name || '',
         address: project.address || '',
@@ -26,10 +32,36 @@ export const useProjectEdit = ({
         percentage: project.percentage || '',
         selectedRate: project.selected_rate || ''
       });
+
+      // Project lists only carry a preview of the description, so load it from the detail endpoint
+      if (fetchProject && project.description === undefined) {
+        fetchProject(project.id)
+          .then((detail) => {
+            if (cancelled || detail?.description === undefined) {
+              return;
+            }
+            // Keep whatever the user typed while the detail was loading
+            if (!descriptionEdited.current) {
+              setEditedProject((prev) => ({
+                ...prev,
+                description: detail.description || ''
+              }));
+            }
+            setDescriptionLoaded(true);
+          })
+          // Left unloaded, the description is not sent on save
+          .catch(() => {});
+      }
     }
+    return () => {
+      cancelled = true;
+    };
   }, [project]);
 
   const handleInputChange = (field) => (event) => {
+    if (field === 'description') {
+      descriptionEdited.current = true;
+    }
     setEditedProject({ ...editedProject, [field]: event.target.value });
   };
 
@@ -47,13 +79,17 @@ export const useProjectEdit = ({
       });
     }
 
-    const success = await onSave(project.id, {
+    const changes = {
       name: editedProject.name,
       address: editedProject.address,
-      description: editedProject.description,
       consumption: editedProject.consumption,
       percentage: editedProject.percentage
-    });
+    };
+    // An unloaded, untouched description is left out so the stored one is kept
+    if (descriptionLoaded || descriptionEdited.current) {
+      changes.description = editedProject.description;
+    }
+    const success = await onSave(project.id, changes);
 
     if (success) {
       onClose();
@@ -62,6 +98,7 @@ export const useProjectEdit = ({
 
   return {
     editedProject,
+    descriptionLoaded,
     availableRates: initialRates.map((rate) => ({
       ...rate,
       uniqueId: `${rate.rate_name}`
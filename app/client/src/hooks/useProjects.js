@@ -3,6 +3,7 @@ import { fetchWithCSRF } from '../utils/api';
 
 export const useProjects = () => {
   const [projects, setProjects] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -11,7 +12,8 @@ export const useProjects = () => {
       setLoading(true);
       const response = await fetchWithCSRF('/api/projects/');
       const data = await response.json();
-      setProjects(data);
+      setProjects(data.results);
+      setNextPage(data.next);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -19,6 +21,26 @@ export const useProjects = () => {
     }
   };
 
+  const loadMoreProjects = async () => {
+    if (!nextPage) return;
+    try {
+      setLoading(true);
+      const response = await fetchWithCSRF(nextPage);
+      const data = await response.json();
+      setProjects((prev) => [...prev, ...data.results]);
+      setNextPage(data.next);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const fetchProject = async (projectId) => {
+    const response = await fetchWithCSRF(`/api/projects/${projectId}/`);
+    return response.json();
+  };
+
   const createProject = async (projectData) => {
     try {
       setLoading(true);
@@ -117,6 +139,9 @@ export const useProjects = () => {
 
   return {
     projects,
+    hasMoreProjects: Boolean(nextPage),
+    loadMoreProjects,
+    fetchProject,
     loading,
     error,
     setError,
@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from ...services.pricing_benchmark import (
+    DEFAULT_BASELINE, DEFAULT_FIXTURE, SCENARIOS, FixtureRateProvider, PricingBenchmark,
+    baseline_mismatch, environment_differences, find_regressions, load_report
+)
+from ...services.rate_provider import RateProvider
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rate processing, the calculator and the calculate_rates view, "
+        "and with --check fail on throughput regressions against a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', choices=list(SCENARIOS), dest='scenarios',
+            help="Scenario to run (repeatable); all by default"
+        )
+        parser.add_argument('--repeats', type=int, default=5, help="Timed runs per benchmark (the fastest is reported)")
+        parser.add_argument(
+            '--fixture', default=str(DEFAULT_FIXTURE),
+            help="OpenEI response JSON whose tariffs are priced (default: the committed synthetic tariffs)"
+        )
+        parser.add_argument('--synthetic', action='store_true', help="Price generated tariffs instead of the fixture")
+        parser.add_argument(
+            '--record', metavar='ADDRESS',
+            help="Fetch the live OpenEI response for an address into --fixture (required) and exit"
+        )
+        parser.add_argument('--output', help="Write the JSON report to this file")
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Fail on throughput regressions against --baseline; only meaningful on the machine that measured it"
+        )
+        parser.add_argument(
+            '--baseline', default=str(DEFAULT_BASELINE),
+            help="JSON report --check compares throughput against (default: the committed baseline)"
+        )
+        parser.add_argument(
+            '--max-regression', type=float, default=0.2,
+            help="With --check, fail when a benchmark is this fraction slower than the baseline"
+        )
+        parser.add_argument('--skip-view', action='store_true', help="Skip the calculate_rates endpoint benchmark")
+
+    def handle(self, *args, **options):
+        if options['record']:
+            if Path(options['fixture']) == DEFAULT_FIXTURE:
+                raise CommandError("Pass --fixture with the file to record into; the committed fixture is synthetic")
+            self._record(options['record'], options['fixture'])
+            return
+
+        # Read before running, so a new baseline can be written over the old one
+        baseline = load_report(options['baseline']) if options['check'] else None
+        fixture = None
+        if not options['synthetic']:
+            with open(options['fixture']) as f:
+                fixture = json.load(f)
+
+        benchmark = PricingBenchmark(
+            tier_mode=settings.RATE_TIER_MODE,
+            repeats=options['repeats'],
+            fixture=fixture,
+            fixture_name=Path(options['fixture']).name,
+            progress=self.stdout.write,
+        )
+
+        if options['skip_view']:
+            report = benchmark.run(options['scenarios'])
+        else:
+            report = self._run_with_view(benchmark, options['scenarios'])
+
+        encoded = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(encoded + '\n')
+            self.stdout.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(encoded)
+
+        if baseline is not None:
+            mismatch = baseline_mismatch(report, baseline)
+            if mismatch:
+                raise CommandError(f"Cannot compare against {options['baseline']}: {mismatch}")
+            for difference in environment_differences(report, baseline):
+                self.stderr.write(f"Warning: {difference}; throughput may not be comparable")
+            regressions = find_regressions(report, baseline, options['max_regression'])
+            if regressions:
+                raise CommandError(
+                    "Throughput regressed past {:.0%}:\n  {}".format(options['max_regression'], '\n  '.join(regressions))
+                )
+            self.stdout.write(self.style.SUCCESS("No throughput regressions against the baseline"))
+
+    def _record(self, address: str, path: str):
+        """Save the OpenEI response for an address as a benchmark fixture"""
+        if not settings.OPENEI_API_KEY:
+            raise CommandError("Recording a fixture needs OPENEI_API_KEY")
+        try:
+            payload = RateProvider(api_key=settings.OPENEI_API_KEY).get_utility_rates(address)
+        except Exception as e:
+            raise CommandError(f"Could not fetch rates for {address}: {str(e)}")
+        with open(path, 'w') as f:
+            json.dump(payload, f, indent=1)
+            f.write('\n')
+        self.stdout.write(f"Wrote {len(payload.get('items', []))} tariffs to {path}")
+
+    def _run_with_view(self, benchmark: PricingBenchmark, scenarios):
+        """Time calculate_rates through the full DRF stack on a throwaway test database"""
+        from django.contrib.auth.models import User
+        from rest_framework.test import APIClient
+
+        from ...models import Project
+        from ...views import project_viewset
+
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = User.objects.create_user('bench', 'bench@example.com', 'bench')
+            client = APIClient()
+            client.force_authenticate(user)
+            projects = [
+                Project.objects.create(
+                    user=user, name=f"Bench {n}", description='', address='1 Benchmark Way',
+                    consumption=1000 + 900 * n, percentage=4.0 + n % 7
+                )
+                for n in range(10)
+            ]
+
+            def view(payload, requests):
+                provider = FixtureRateProvider(payload)
+                with mock.patch.object(project_viewset, 'get_rate_provider', lambda: provider):
+                    for project in projects[:requests]:
+                        response = client.post(f'/api/projects/{project.id}/calculate_rates/', {}, format='json')
+                        if response.status_code != 200:
+                            raise CommandError(f"calculate_rates returned {response.status_code}")
+
+            return benchmark.run(scenarios, view=view)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...services.load_profiles import LoadProfileRegistry
+
+
+class Command(BaseCommand):
+    help = "Write the built-in 8760-hour load profiles to LOAD_PROFILE_DIR as .npy files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            default=settings.LOAD_PROFILE_DIR,
+            help="Target directory (defaults to LOAD_PROFILE_DIR)"
+        )
+
+    def handle(self, *args, **options):
+        registry = LoadProfileRegistry(options['directory'])
+        written = registry.write_builtin_profiles()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(written)} load profiles to {registry.directory}"
+        ))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...services.webhook_dispatcher import WebhookDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver queued webhook notifications from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain due rows once and exit")
+        parser.add_argument('--batch-size', type=int, default=settings.WEBHOOK_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.WEBHOOK_DISPATCH_WORKERS)
+        parser.add_argument('--max-attempts', type=int, default=settings.WEBHOOK_MAX_ATTEMPTS)
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds between polls")
+
+    def handle(self, *args, **options):
+        dispatcher = WebhookDispatcher(
+            batch_size=options['batch_size'],
+            max_workers=options['workers'],
+            max_attempts=options['max_attempts'],
+        )
+
+        if options['once']:
+            totals = dispatcher.drain()
+            self.stdout.write(self.style.SUCCESS(
+                f"Delivered {totals['delivered']}, retrying {totals['retried']}, dead-lettered {totals['dead']}"
+            ))
+            return
+
+        self.stdout.write("Dispatching webhooks (Ctrl+C to stop)")
+        dispatcher.run_forever(poll_interval=options['poll_interval'])
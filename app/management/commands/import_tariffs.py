@@ -0,0 +1,75 @@
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.tariff_import import FORMAT_CSV, FORMAT_JSON, FORMATS, TariffImporter, TariffSync
+
+
+class Command(BaseCommand):
+    help = "Import a U.S. Utility Rate Database (USURDB) JSON or CSV dump into the local tariff tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Dump file; .gz files are decompressed on the fly")
+        parser.add_argument(
+            '--format', choices=FORMATS, dest='file_format',
+            help="Dump format (detected from the file name by default)"
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help="Items processed and written per batch")
+        parser.add_argument(
+            '--sync', action='store_true',
+            help="Only reprocess new or changed tariffs and remove expired ones"
+        )
+        parser.add_argument('--prune', action='store_true', help="With --sync, remove tariffs missing from the dump")
+        parser.add_argument(
+            '--changes',
+            help="With --sync, write the changed tariff labels and affected territories to this JSON file"
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or self._detect_format(path)
+        if (options['prune'] or options['changes']) and not options['sync']:
+            raise CommandError("--prune and --changes require --sync")
+        if options['sync']:
+            importer = TariffSync(chunk_size=options['chunk_size'], progress=self.stdout.write, prune=options['prune'])
+        else:
+            importer = TariffImporter(chunk_size=options['chunk_size'], progress=self.stdout.write)
+
+        started = time.perf_counter()
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rb') as f:
+                stats = importer.run(f, file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"{path}: {str(e)}")
+
+        if options['sync']:
+            self._report_sync(stats, options['changes'], time.perf_counter() - started)
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} of {stats['read']} tariffs ({stats['skipped']} skipped) "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _report_sync(self, stats, changes_path, seconds: float):
+        if changes_path:
+            with open(changes_path, 'w') as f:
+                json.dump({'labels': stats['labels'], 'territories': stats['territories']}, f, indent=2)
+                f.write('\n')
+            self.stdout.write(f"Wrote {changes_path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced {stats['read']} tariffs: {stats['imported']} new or changed, {stats['unchanged']} unchanged, "
+            f"{stats['skipped']} skipped, {stats['expired']} expired, {stats['pruned']} pruned; "
+            f"{len(stats['territories'])} territories affected in {seconds:.1f}s"
+        ))
+
+    @staticmethod
+    def _detect_format(path: str) -> str:
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith('.csv'):
+            return FORMAT_CSV
+        if name.endswith('.json') or name.endswith('.jsonl'):
+            return FORMAT_JSON
+        raise CommandError("Cannot tell the dump format from the file name; pass --format")
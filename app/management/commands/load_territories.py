@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import ServiceTerritory
+from ...services.territory import TerritoryLoader, get_territory_resolver
+
+
+class Command(BaseCommand):
+    help = "Bulk-load ZIP code to utility (EIA id) service territories from CSV lookup files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="CSV files with zip, eiaid and utility_name columns")
+        parser.add_argument('--replace', action='store_true', help="Delete existing territories first")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk insert")
+
+    def handle(self, *args, **options):
+        loader = TerritoryLoader(batch_size=options['batch_size'])
+        totals = {'read': 0, 'loaded': 0, 'invalid': 0}
+
+        with transaction.atomic():
+            if options['replace']:
+                deleted, _ = ServiceTerritory.objects.all().delete()
+                self.stdout.write(f"Deleted {deleted} territories")
+            for path in options['paths']:
+                try:
+                    with open(path, 'rb') as f:
+                        stats = loader.load(f)
+                except (OSError, ValueError) as e:
+                    raise CommandError(f"{path}: {str(e)}")
+                self.stdout.write(
+                    f"{path}: {stats['read']} rows, {stats['loaded']} loaded, {stats['invalid']} invalid"
+                )
+                for name, count in stats.items():
+                    totals[name] += count
+        get_territory_resolver().clear()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {totals['loaded']} territories from {len(options['paths'])} file(s); "
+            f"{ServiceTerritory.objects.count()} ZIP/utility pairs in total"
+        ))
@@ -0,0 +1,62 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.portfolio_repricer import PortfolioRepricer
+from ...services.rate_provider import get_rate_provider
+
+
+class Command(BaseCommand):
+    help = "Reprice the selected rate of every project proposal after a tariff update"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="Pricing processes (1 prices in this process)"
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Projects per streamed chunk")
+        parser.add_argument(
+            '--checkpoint', default='reprice_checkpoint.json',
+            help="File recording progress after each chunk"
+        )
+        parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint")
+        parser.add_argument(
+            '--stale-only', action='store_true',
+            help="Only reprice proposals whose tariff content or pricing engine version changed"
+        )
+        parser.add_argument(
+            '--changes',
+            help="Changes file written by import_tariffs --sync; only proposals on its tariffs are repriced"
+        )
+
+    def handle(self, *args, **options):
+        labels = None
+        if options['changes']:
+            try:
+                with open(options['changes']) as f:
+                    labels = json.load(f)['labels']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"{options['changes']}: {str(e)}")
+            self.stdout.write(f"Repricing proposals on {len(labels)} changed tariffs")
+
+        repricer = PortfolioRepricer(
+            rate_provider=get_rate_provider(),
+            tier_mode=settings.RATE_TIER_MODE,
+            load_profile_dir=settings.LOAD_PROFILE_DIR,
+            horizon=settings.PROJECTION_HORIZON_YEARS,
+            discount_rate=settings.PROJECTION_DISCOUNT_RATE,
+            stale_only=options['stale_only'],
+            labels=labels,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            checkpoint_path=options['checkpoint'],
+            progress=self.stdout.write,
+        )
+        stats = repricer.run(resume=options['resume'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Repriced {stats['repriced']} proposals ({stats['unchanged']} unchanged, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed) "
+            f"in {stats['seconds']}s, {stats['projects_per_second']} projects/s"
+        ))
@@ -0,0 +1,70 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services.metrics import current_trace, end_trace, metrics, start_trace
+
+
+class ServerTimingMiddleware:
+    """
+    Samples requests for stage timing and reports it in a Server-Timing header.
+
+    A sampled request collects the spans recorded by the OpenEI client,
+    rate processing and pricing, plus response serialization (timed from
+    process_template_response until the rendered response comes back) and
+    the total. Only requests that recorded a stage get the header, and
+    unsampled requests skip all span bookkeeping.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trace, token = start_trace(self._sampled())
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(trace, started, response)
+
+    async def __acall__(self, request):
+        trace, token = start_trace(self._sampled())
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(trace, started, response)
+
+    def process_template_response(self, request, response):
+        trace = current_trace()
+        if trace is not None:
+            trace.serialize_started = time.perf_counter()
+        return response
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def _finish(self, trace, started, response):
+        if trace is None or not trace.spans:
+            return response
+        finished = time.perf_counter()
+        stages = [('total', finished - started)]
+        if trace.serialize_started is not None:
+            stages.insert(0, ('serialize', finished - trace.serialize_started))
+        for stage, seconds in stages:
+            trace.add(stage, seconds)
+            metrics.observe('pricing_stage_seconds', seconds, stage=stage)
+        response['Server-Timing'] = trace.server_timing()
+        return response
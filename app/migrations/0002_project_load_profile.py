@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='load_profile',
+            field=models.CharField(default='residential', help_text='Key of the 8760-hour load profile used for pricing', max_length=50),
+        ),
+    ]
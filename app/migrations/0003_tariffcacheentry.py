@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_project_load_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TariffCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('address', models.CharField(max_length=255)),
+                ('utility', models.CharField(blank=True, default='', max_length=255)),
+                ('eia_id', models.CharField(blank=True, default='', max_length=20)),
+                ('payload', models.JSONField()),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_webhookoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntervalSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('csv', 'CSV'), ('green_button', 'Green Button')], max_length=20)),
+                ('start', models.DateTimeField()),
+                ('utc_offset_minutes', models.IntegerField(default=0)),
+                ('interval_minutes', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('missing_intervals', models.PositiveIntegerField(default=0)),
+                ('total_kwh', models.FloatField()),
+                ('values', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interval_series', to='app.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', '-created_at'], name='app_interva_project_b47744_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_intervalseries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposalutility',
+            name='computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposalutility',
+            name='cumulative_cost',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposalutility',
+            name='engine_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proposalutility',
+            name='horizon',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposalutility',
+            name='npv',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposalutility',
+            name='tariff_hash',
+            field=models.CharField(blank=True, default='', help_text='Content hash of the OpenEI tariff the stored numbers were computed from', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='proposalutility',
+            index=models.Index(fields=['openei_id', 'tariff_hash'], name='app_proposa_openei__5a2a10_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_project_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tariffcacheentry',
+            name='territory',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.CreateModel(
+            name='ServiceTerritory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zip_code', models.CharField(max_length=5)),
+                ('eia_id', models.CharField(max_length=20)),
+                ('utility_name', models.CharField(max_length=255)),
+                ('state', models.CharField(blank=True, default='', max_length=2)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zip_code', 'eia_id'), name='unique_zip_utility')],
+            },
+        ),
+    ]
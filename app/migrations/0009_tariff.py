@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_service_territory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tariff',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=64, unique=True)),
+                ('eia_id', models.CharField(max_length=20)),
+                ('utility', models.CharField(max_length=255)),
+                ('name', models.CharField(max_length=255)),
+                ('sector', models.CharField(blank=True, default='', max_length=50)),
+                ('is_default', models.BooleanField(default=False)),
+                ('approved', models.BooleanField(default=True)),
+                ('startdate', models.DateTimeField(blank=True, null=True)),
+                ('enddate', models.DateTimeField(blank=True, null=True)),
+                ('average_rate', models.FloatField()),
+                ('content_hash', models.CharField(max_length=32)),
+                ('payload', models.JSONField()),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['eia_id', 'sector', 'startdate'], name='app_tariff_eia_id_333f18_idx'), models.Index(fields=['utility', 'sector', 'startdate'], name='app_tariff_utility_5b66c0_idx'), models.Index(fields=['enddate'], name='app_tariff_enddate_9fa00d_idx')],
+            },
+        ),
+    ]
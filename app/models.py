@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 class Project(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -20,9 +21,20 @@ class Project(models.Model):
         ]
     )
     selected_rate = models.CharField(max_length=255, default='')
+    load_profile = models.CharField(
+        max_length=50,
+        default='residential',
+        help_text="Key of the 8760-hour load profile used for pricing"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Project - {self.address}"
 
@@ -41,6 +53,155 @@ class ProposalUtility(models.Model):
         blank=True,
         help_text="Stores the complete rate structure"
     )
+    cumulative_cost = models.FloatField(null=True, blank=True)  # $ over the horizon
+    npv = models.FloatField(null=True, blank=True)  # $
+    horizon = models.PositiveSmallIntegerField(null=True, blank=True)
+    tariff_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        help_text="Content hash of the OpenEI tariff the stored numbers were computed from"
+    )
+    engine_version = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['openei_id', 'tariff_hash']),
+        ]
 
     def __str__(self):
         return f"Utility Proposal for {self.project.address}"
+
+class IntervalSeries(models.Model):
+    """Metered interval usage stored as packed little-endian float32 kWh values"""
+    SOURCE_CSV = 'csv'
+    SOURCE_GREEN_BUTTON = 'green_button'
+    SOURCE_CHOICES = [
+        (SOURCE_CSV, 'CSV'),
+        (SOURCE_GREEN_BUTTON, 'Green Button'),
+    ]
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='interval_series'
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    # Local wall-clock time of the first interval (UTC-labelled)
+    start = models.DateTimeField()
+    utc_offset_minutes = models.IntegerField(default=0)
+    interval_minutes = models.PositiveIntegerField()
+    count = models.PositiveIntegerField()
+    missing_intervals = models.PositiveIntegerField(default=0)
+    total_kwh = models.FloatField()
+    values = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', '-created_at']),
+        ]
+
+    def to_interval_data(self):
+        from .services.interval_data import IntervalData
+        return IntervalData.from_bytes(
+            self.start,
+            self.interval_minutes,
+            bytes(self.values),
+            missing=self.missing_intervals,
+            utc_offset_minutes=self.utc_offset_minutes,
+        )
+
+    def __str__(self):
+        return f"{self.count} x {self.interval_minutes} min intervals for {self.project.address}"
+
+class TariffCacheEntry(models.Model):
+    """Persistent tier of the OpenEI tariff response cache"""
+    key = models.CharField(max_length=64, unique=True)
+    address = models.CharField(max_length=255)
+    utility = models.CharField(max_length=255, blank=True, default='')
+    eia_id = models.CharField(max_length=20, blank=True, default='')
+    territory = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    payload = models.JSONField()
+    fetched_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Cached tariffs for {self.address}"
+
+class Tariff(models.Model):
+    """
+    OpenEI rate item imported from a U.S. Utility Rate Database dump by
+    `python manage.py import_tariffs`. ``payload`` is the OpenEI-shaped
+    item that RateProcessor compiles; the other columns index it.
+    """
+    label = models.CharField(max_length=64, unique=True)
+    eia_id = models.CharField(max_length=20)
+    utility = models.CharField(max_length=255)
+    name = models.CharField(max_length=255)
+    sector = models.CharField(max_length=50, blank=True, default='')
+    is_default = models.BooleanField(default=False)
+    approved = models.BooleanField(default=True)
+    startdate = models.DateTimeField(null=True, blank=True)
+    enddate = models.DateTimeField(null=True, blank=True)
+    average_rate = models.FloatField()  # $/kWh
+    content_hash = models.CharField(max_length=32)
+    payload = models.JSONField()
+    imported_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['eia_id', 'sector', 'startdate']),
+            models.Index(fields=['utility', 'sector', 'startdate']),
+            models.Index(fields=['enddate']),
+        ]
+
+    def __str__(self):
+        return f"{self.utility} - {self.name}"
+
+class ServiceTerritory(models.Model):
+    """
+    Utility serving a ZIP code, bulk-loaded offline from a ZIP to utility
+    lookup table by `python manage.py load_territories`
+    """
+    zip_code = models.CharField(max_length=5)
+    eia_id = models.CharField(max_length=20)
+    utility_name = models.CharField(max_length=255)
+    state = models.CharField(max_length=2, blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zip_code', 'eia_id'], name='unique_zip_utility'),
+        ]
+
+    def __str__(self):
+        return f"{self.utility_name} ({self.eia_id}) serving {self.zip_code}"
+
+class WebhookOutbox(models.Model):
+    """Webhook notification queued in the same transaction as the project write"""
+    STATUS_PENDING = 'pending'
+    STATUS_DELIVERED = 'delivered'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DELIVERED, 'Delivered'),
+        (STATUS_DEAD, 'Dead letter'),
+    ]
+
+    event = models.CharField(max_length=50)
+    url = models.CharField(max_length=500)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} webhook ({self.status})"
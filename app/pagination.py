@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ProjectCursorPagination(CursorPagination):
+    """
+    Newest projects first. The cursor filters on created_at, so each page
+    is an index range scan on (user, created_at) however many projects the
+    account has. ?ordering=-updated_at pages by last modification instead.
+    """
+    ordering = '-created_at'
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class ProposalCursorPagination(CursorPagination):
+    """Newest proposals first, paged on the primary key"""
+    ordering = '-id'
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
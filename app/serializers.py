@@ -1,5 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Project, ProposalUtility
+from .models import IntervalSeries, Project, ProposalUtility
+from .services.exact_billing import BILLING_MODE_EXACT, BILLING_MODES
+from .services.load_profiles import LoadProfileRegistry
+
+# Characters of a project's description included in list entries
+DESCRIPTION_PREVIEW_LENGTH = 300
 
 class ProjectSerializer(serializers.ModelSerializer):
     description = serializers.CharField(required=False, allow_blank=True)
@@ -8,14 +14,103 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'id', 'name', 'description', 'address', 'consumption',
-            'percentage', 'created_at', 'updated_at', 'selected_rate'
+            'percentage', 'created_at', 'updated_at', 'selected_rate',
+            'load_profile'
         ]
         read_only_fields = ['created_at', 'updated_at', 'selected_rate']
 
+    def validate_load_profile(self, value):
+        if value not in LoadProfileRegistry(settings.LOAD_PROFILE_DIR):
+            raise serializers.ValidationError(f"Unknown load profile: {value}")
+        return value
+
+class ProposalUtilityListSerializer(serializers.ModelSerializer):
+    """Proposal without its yearly pricing matrix, for lists"""
+    class Meta:
+        model = ProposalUtility
+        fields = [
+            'id', 'project', 'openei_id', 'rate_name', 'average_rate',
+            'first_year_cost', 'cumulative_cost', 'npv', 'horizon',
+            'computed_at'
+        ]
+        read_only_fields = fields
+
+class ProjectListSerializer(serializers.ModelSerializer):
+    """Project list entry with a description preview and its proposal summary"""
+    description_preview = serializers.CharField(read_only=True)
+    proposal = ProposalUtilityListSerializer(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'name', 'description_preview', 'address', 'consumption',
+            'percentage', 'created_at', 'updated_at', 'selected_rate',
+            'load_profile', 'proposal'
+        ]
+        read_only_fields = fields
+
+class RateScenarioSerializer(serializers.Serializer):
+    """Inline consumption/escalator scenario priced without a saved project"""
+    address = serializers.CharField(max_length=255)
+    consumption = serializers.IntegerField(min_value=1000, max_value=10000)
+    percentage = serializers.FloatField(min_value=4.0, max_value=10.0)
+    load_profile = serializers.CharField(max_length=50, default='residential')
+
+    def validate_load_profile(self, value):
+        if value not in LoadProfileRegistry(settings.LOAD_PROFILE_DIR):
+            raise serializers.ValidationError(f"Unknown load profile: {value}")
+        return value
+
+class CalculateRatesOptionsSerializer(serializers.Serializer):
+    """Optional projection settings for calculate_rates"""
+    horizon = serializers.IntegerField(min_value=1, max_value=50, required=False)
+    discount_rate = serializers.FloatField(min_value=0.0, max_value=100.0, required=False)
+    escalator_grid = serializers.ListField(
+        child=serializers.FloatField(min_value=-50.0, max_value=100.0),
+        required=False,
+        max_length=200
+    )
+    top_k = serializers.IntegerField(min_value=1, max_value=100, required=False)
+    use_interval_data = serializers.BooleanField(required=False, default=False)
+    billing_mode = serializers.ChoiceField(choices=BILLING_MODES, required=False)
+
+    def validate(self, data):
+        if data.get('use_interval_data') and data.get('billing_mode') == BILLING_MODE_EXACT:
+            raise serializers.ValidationError("Exact billing is not available for interval data")
+        return data
+
+class BatchCalculateRatesSerializer(serializers.Serializer):
+    project_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    scenarios = RateScenarioSerializer(many=True, required=False, default=list)
+
+    def validate(self, data):
+        count = len(set(data['project_ids'])) + len(data['scenarios'])
+        if count == 0:
+            raise serializers.ValidationError("Provide project_ids or scenarios")
+        if count > settings.RATE_BATCH_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.RATE_BATCH_MAX_ITEMS} projects and scenarios per request"
+            )
+        return data
+
+class IntervalSeriesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IntervalSeries
+        fields = [
+            'id', 'project', 'source', 'start', 'utc_offset_minutes',
+            'interval_minutes', 'count', 'missing_intervals', 'total_kwh',
+            'created_at'
+        ]
+        read_only_fields = fields
+
 class ProposalUtilitySerializer(serializers.ModelSerializer):
     class Meta:
         model = ProposalUtility
         fields = [
             'id', 'project', 'openei_id', 'rate_name',
-            'pricing_matrix', 'average_rate', 'first_year_cost'
+            'pricing_matrix', 'average_rate', 'first_year_cost',
+            'cumulative_cost', 'npv', 'horizon', 'tariff_hash',
+            'engine_version', 'computed_at'
         ]
+        # Proposals are only written by select_rate and reprice_projects
+        read_only_fields = fields
@@ -1,9 +1,36 @@
-from .rate_provider import RateProvider
+from .rate_provider import RateProvider, get_rate_provider
+from .local_rate_provider import LocalRateProvider
 from .rate_processor import RateProcessor
 from .rate_calculator import RateCalculator
+from .rate_engine import RateEngine, TIER_MODE_HOURLY, TIER_MODE_MONTHLY
+from .compiled_tariff import CompiledTariff
+from .load_profiles import LoadProfileRegistry
+from .tariff_cache import TariffCache
+from .territory import Territory, TerritoryResolver
+from .http_client import HttpClient, AsyncHttpClient
+from .rate_pricing import RatePricer
+from .projection import ProjectionEngine
+from .exact_billing import ExactBillingEngine, BILLING_MODE_FAST, BILLING_MODE_EXACT
 __all__ = [
     'RateProvider',
+    'get_rate_provider',
+    'LocalRateProvider',
     'RateProcessor',
     'RateCalculator',
+    'RateEngine',
+    'TIER_MODE_HOURLY',
+    'TIER_MODE_MONTHLY',
+    'CompiledTariff',
+    'LoadProfileRegistry',
+    'TariffCache',
+    'Territory',
+    'TerritoryResolver',
+    'HttpClient',
+    'AsyncHttpClient',
+    'RatePricer',
+    'ProjectionEngine',
+    'ExactBillingEngine',
+    'BILLING_MODE_FAST',
+    'BILLING_MODE_EXACT',
     'InputValidator'
 ]
@@ -0,0 +1,483 @@
+import logging
+from bisect import bisect_left
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_YEAR = 8760
+
+# Non-leap year used to lay the month x hour weekday/weekend schedules
+# onto an 8760-hour annual simulation
+REFERENCE_YEAR = 2023
+
+
+def _reference_calendar():
+    """Month, hour-of-day and weekend flag for every hour of REFERENCE_YEAR"""
+    start = date(REFERENCE_YEAR, 1, 1)
+    days = [start + timedelta(days=d) for d in range(HOURS_PER_YEAR // 24)]
+    day_month = np.array([day.month - 1 for day in days], dtype=np.intp)
+    day_weekend = np.array([day.weekday() >= 5 for day in days], dtype=np.intp)
+
+    hour_month = np.repeat(day_month, 24)
+    hour_of_day = np.tile(np.arange(24, dtype=np.intp), len(days))
+    hour_weekend = np.repeat(day_weekend, 24)
+    for array in (hour_month, hour_of_day, hour_weekend):
+        array.setflags(write=False)
+    return hour_month, hour_of_day, hour_weekend
+
+
+HOUR_MONTH, HOUR_OF_DAY, HOUR_IS_WEEKEND = _reference_calendar()
+
+
+@lru_cache(maxsize=8)
+def interval_calendar(steps_per_hour: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Month, hour-of-day and weekend flag for every interval of REFERENCE_YEAR"""
+    if steps_per_hour == 1:
+        return HOUR_MONTH, HOUR_OF_DAY, HOUR_IS_WEEKEND
+    arrays = tuple(np.repeat(array, steps_per_hour) for array in (HOUR_MONTH, HOUR_OF_DAY, HOUR_IS_WEEKEND))
+    for array in arrays:
+        array.setflags(write=False)
+    return arrays
+
+
+def annualize_fixed_charge(charge: float, units: str) -> float:
+    """Convert fixed charges to annual amount based on units"""
+    if units == '$/month':
+        return charge * 12
+    elif units == '$/day':
+        return charge * 365
+    return charge
+
+
+def _to_float(value) -> float:
+    return float(value) if isinstance(value, (int, float, Decimal)) else 0.0
+
+
+def _tier_tables(rates: np.ndarray, limits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cumulative upper bounds, lower bounds and cost below each tier of a (periods, tiers) table"""
+    bounds = np.maximum.accumulate(limits, axis=1)
+    lower = np.concatenate([np.zeros((limits.shape[0], 1)), bounds[:, :-1]], axis=1)
+    # Tiers past an unbounded one are unreachable and contribute nothing
+    finite = np.isfinite(bounds)
+    widths = np.zeros_like(bounds)
+    widths[finite] = bounds[finite] - lower[finite]
+    costs = np.concatenate([np.zeros((rates.shape[0], 1)), np.cumsum(rates * widths, axis=1)[:, :-1]], axis=1)
+    return bounds, lower, costs
+
+
+def _compile_tiers(structure) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rates, limits and per-period usability of an OpenEI tier structure,
+    padded with an unbounded copy of each period's last tier
+    """
+    period_count = max(len(structure), 1)
+    tier_count = max((len(period) for period in structure), default=0) + 1
+    rates = np.zeros((period_count, tier_count), dtype=np.float64)
+    limits = np.full((period_count, tier_count), np.inf, dtype=np.float64)
+    usable = np.zeros(period_count, dtype=bool)
+    for p, period in enumerate(structure):
+        for t, tier in enumerate(period):
+            rates[p, t] = _to_float(tier.get('rate', 0))
+            limits[p, t] = float(tier.get('max', float('inf')))
+        if period:
+            rates[p, len(period):] = rates[p, len(period) - 1]
+            usable[p] = True
+    return rates, limits, usable
+
+
+def _schedule_array(schedule) -> Optional[np.ndarray]:
+    """Return a 12 x 24 OpenEI month/hour schedule as an array, or None if malformed"""
+    try:
+        array = np.asarray(schedule, dtype=np.intp)
+    except (TypeError, ValueError):
+        return None
+    return array if array.shape == (12, 24) else None
+
+
+class CompiledTariff:
+    """
+    Immutable, array-backed form of an OpenEI rate item.
+
+    Built once per tariff by RateProcessor so every pricing call works off
+    the same float arrays instead of re-reading the raw OpenEI dicts.
+    Tiers are padded with an unbounded copy of each period's last tier so
+    consumption above every tier max falls back to the last rate.
+
+    ``hour_periods`` is the legacy single-day map (January weekday row) used
+    by the daily path; ``schedule`` holds the full (weekday/weekend, month,
+    hour) map and ``year_periods`` its expansion over REFERENCE_YEAR.
+
+    The tier index holds each period's tier limits as sorted cumulative
+    bounds (``tier_bounds``, a running max of ``limits``) next to
+    ``rates``, so tier lookups are binary searches rather than tier
+    scans. ``tier_costs`` is the cost of all kWh below each tier, which
+    turns month-to-date tier billing into two lookups per interval.
+    """
+
+    # Tier counts up to which lookups compare against every bound instead
+    # of binary searching
+    LINEAR_SEARCH_TIERS = 8
+
+    __slots__ = (
+        'label',
+        'rates',
+        'limits',
+        'hour_periods',
+        'schedule',
+        'year_periods',
+        'tier_bounds',
+        'tier_costs',
+        'tier_lower',
+        '_bound_lists',
+        '_rate_lists',
+        'annual_fixed_charge',
+        'average_rate',
+        'valid',
+        'annual_valid',
+        'demand',
+    )
+
+    def __init__(self,
+                 label: str,
+                 rates: np.ndarray,
+                 limits: np.ndarray,
+                 hour_periods: np.ndarray,
+                 schedule: np.ndarray,
+                 annual_fixed_charge: float,
+                 average_rate: float,
+                 valid: bool,
+                 annual_valid: bool,
+                 demand: Optional['CompiledDemand'] = None):
+        year_periods = schedule[HOUR_IS_WEEKEND, HOUR_MONTH, HOUR_OF_DAY]
+        tier_bounds, tier_lower, tier_costs = _tier_tables(rates, limits)
+        for array in (rates, limits, hour_periods, schedule, year_periods, tier_bounds, tier_lower, tier_costs):
+            array.setflags(write=False)
+        object.__setattr__(self, 'label', label)
+        object.__setattr__(self, 'rates', rates)
+        object.__setattr__(self, 'limits', limits)
+        object.__setattr__(self, 'hour_periods', hour_periods)
+        object.__setattr__(self, 'schedule', schedule)
+        object.__setattr__(self, 'year_periods', year_periods)
+        object.__setattr__(self, 'tier_bounds', tier_bounds)
+        object.__setattr__(self, 'tier_lower', tier_lower)
+        object.__setattr__(self, 'tier_costs', tier_costs)
+        object.__setattr__(self, '_bound_lists', tuple(row.tolist() for row in tier_bounds))
+        object.__setattr__(self, '_rate_lists', tuple(row.tolist() for row in rates))
+        object.__setattr__(self, 'annual_fixed_charge', float(annual_fixed_charge))
+        object.__setattr__(self, 'average_rate', float(average_rate))
+        object.__setattr__(self, 'valid', bool(valid))
+        object.__setattr__(self, 'annual_valid', bool(annual_valid))
+        object.__setattr__(self, 'demand', demand)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Rebuild through __init__ so process pools can ship compiled tariffs
+        return (type(self), (
+            self.label, self.rates, self.limits, self.hour_periods, self.schedule,
+            self.annual_fixed_charge, self.average_rate, self.valid, self.annual_valid, self.demand,
+        ))
+
+    def __repr__(self):
+        return (
+            f"CompiledTariff(label={self.label!r}, periods={self.rates.shape[0]}, "
+            f"tiers={self.rates.shape[1]}, valid={self.valid})"
+        )
+
+    @property
+    def tier_count(self) -> int:
+        return self.rates.shape[1]
+
+    def tier_index(self, period: int, kwh: float) -> int:
+        """First tier of a period whose limit is at or above ``kwh``"""
+        return min(bisect_left(self._bound_lists[period], kwh), self.tier_count - 1)
+
+    def rate_at(self, period: int, kwh: float) -> float:
+        """Rate billed for ``kwh`` in a period, as RateCalculator._get_applicable_rate"""
+        return self._rate_lists[period][self.tier_index(period, kwh)]
+
+    def tier_indices(self, periods: np.ndarray, kwh: np.ndarray, side: str = 'left') -> np.ndarray:
+        """
+        Batched tier lookup
+
+        Args:
+            periods: Rate period of each interval, shape (intervals,)
+            kwh: Values to look up, shape (..., intervals)
+            side: 'left' finds the first tier whose limit is at or above the
+                value; 'right' the tier whose [lower, upper) range holds it
+
+        Returns:
+            np.ndarray: Tier index per value, same shape as ``kwh``
+        """
+        kwh = np.asarray(kwh, dtype=np.float64)
+        periods = np.asarray(periods)
+        if self.tier_count <= self.LINEAR_SEARCH_TIERS:
+            # Counting bounds below the value is a branch-free linear search,
+            # cheaper than per-period binary searches for a few tiers
+            bounds = self.tier_bounds[periods]
+            below = kwh[..., None] > bounds if side == 'left' else kwh[..., None] >= bounds
+            index = np.count_nonzero(below, axis=-1)
+        else:
+            index = np.empty(kwh.shape, dtype=np.intp)
+            for period in np.unique(periods).tolist():
+                columns = periods == period
+                index[..., columns] = np.searchsorted(self.tier_bounds[period], kwh[..., columns], side=side)
+        return np.minimum(index, self.tier_count - 1, out=index)
+
+    def tier_values(self, table: np.ndarray, periods: np.ndarray, index: np.ndarray) -> np.ndarray:
+        """Gather ``table[periods, index]`` for a (periods, tiers) table via a flat index"""
+        return table.ravel().take(periods * self.tier_count + index)
+
+    def cumulative_cost(self, periods: np.ndarray, kwh: np.ndarray) -> np.ndarray:
+        """
+        Cost of the first ``kwh`` of a billing period at each interval's tiers
+
+        The per-period tier schedule is integrated up to ``kwh``, so the
+        cost of an interval that moves the month-to-date total from a to b
+        is cumulative_cost(b) - cumulative_cost(a).
+        """
+        kwh = np.asarray(kwh, dtype=np.float64)
+        index = self.tier_indices(periods, kwh, side='right')
+        return (
+            self.tier_values(self.tier_costs, periods, index)
+            + (kwh - self.tier_values(self.tier_lower, periods, index)) * self.tier_values(self.rates, periods, index)
+        )
+
+    @classmethod
+    def from_rate_data(cls, rate_data: Dict) -> 'CompiledTariff':
+        """
+        Compile the energy and fixed-charge fields of an OpenEI rate item
+
+        Args:
+            rate_data: Raw OpenEI item (or rate dictionary with the same keys)
+
+        Returns:
+            CompiledTariff: Compiled tariff; ``valid`` is False when the
+            energy structure cannot be priced
+        """
+        periods = rate_data.get('energyratestructure') or []
+        hour_periods = np.zeros(24, dtype=np.intp)
+        schedule = np.zeros((2, 12, 24), dtype=np.int16)
+        valid = False
+        annual_valid = False
+
+        weighted_sum = 0.0
+        total_weight = 0.0
+
+        try:
+            rates, limits, usable = _compile_tiers(periods)
+            for period in periods:
+                for tier in period:
+                    rate = tier.get('rate', 0)
+                    if isinstance(rate, (int, float, Decimal)):
+                        # Same weighting as RateProcessor.calculate_rate
+                        weight = tier.get('max', 1000)
+                        weighted_sum += float(rate) * weight
+                        total_weight += weight
+
+            weekday_rows = rate_data.get('energyweekdayschedule') or []
+            if periods and weekday_rows:
+                first_row = np.asarray(weekday_rows[0][:24], dtype=np.intp)
+                if first_row.shape == (24,) and np.all((first_row >= 0) & (first_row < len(periods))):
+                    hour_periods = first_row
+                    valid = bool(np.all(usable[hour_periods]))
+
+            weekday = _schedule_array(weekday_rows)
+            weekend = _schedule_array(rate_data.get('energyweekendschedule'))
+            if weekend is None:
+                weekend = weekday
+            if periods and weekday is not None:
+                both = np.stack([weekday, weekend])
+                if np.all((both >= 0) & (both < len(periods))):
+                    schedule = both.astype(np.int16)
+                    annual_valid = bool(np.all(usable[both]))
+
+        except Exception as e:
+            logger.error(f"Error compiling rate structure: {str(e)}")
+            rates, limits, _ = _compile_tiers([])
+            hour_periods = np.zeros(24, dtype=np.intp)
+            schedule = np.zeros((2, 12, 24), dtype=np.int16)
+            valid = False
+            annual_valid = False
+
+        try:
+            fixed_charge = annualize_fixed_charge(
+                float(rate_data.get('fixedchargefirstmeter', 0) or 0),
+                rate_data.get('fixedchargeunits', '')
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error compiling fixed charge: {str(e)}")
+            fixed_charge = 0.0
+
+        average_rate = round(weighted_sum / total_weight, 4) if total_weight > 0 else 0.0
+
+        return cls(
+            label=(rate_data.get('label') or '').strip(),
+            rates=rates,
+            limits=limits,
+            hour_periods=hour_periods,
+            schedule=schedule,
+            annual_fixed_charge=fixed_charge,
+            average_rate=average_rate,
+            valid=valid,
+            annual_valid=annual_valid,
+            demand=CompiledDemand.from_rate_data(rate_data),
+        )
+
+
+class CompiledDemand:
+    """
+    Demand charges of an OpenEI rate item, compiled for DemandChargeEngine.
+
+    TOU demand bills each billing month's peak kW within every period of
+    ``schedule`` (weekday/weekend, month, hour) against that period's kW
+    tiers. Flat demand bills the month's overall peak against the tiers of
+    the period ``flat_months`` assigns to the month. Tiers are cumulative
+    kW blocks with the same bound/lower/cost tables as energy tiers. Demand
+    is the load averaged over ``window_minutes``.
+    """
+
+    DEFAULT_WINDOW_MINUTES = 15.0
+
+    __slots__ = (
+        'rates',
+        'bounds',
+        'lower',
+        'costs',
+        'schedule',
+        'tou_valid',
+        'flat_rates',
+        'flat_bounds',
+        'flat_lower',
+        'flat_costs',
+        'flat_months',
+        'flat_valid',
+        'window_minutes',
+        'nonnegative',
+    )
+
+    def __init__(self,
+                 rates: np.ndarray,
+                 limits: np.ndarray,
+                 schedule: np.ndarray,
+                 tou_valid: bool,
+                 flat_rates: np.ndarray,
+                 flat_limits: np.ndarray,
+                 flat_months: np.ndarray,
+                 flat_valid: bool,
+                 window_minutes: float):
+        bounds, lower, costs = _tier_tables(rates, limits)
+        flat_bounds, flat_lower, flat_costs = _tier_tables(flat_rates, flat_limits)
+        arrays = (
+            rates, bounds, lower, costs, schedule,
+            flat_rates, flat_bounds, flat_lower, flat_costs, flat_months,
+        )
+        for array in arrays:
+            array.setflags(write=False)
+        object.__setattr__(self, 'rates', rates)
+        object.__setattr__(self, 'bounds', bounds)
+        object.__setattr__(self, 'lower', lower)
+        object.__setattr__(self, 'costs', costs)
+        object.__setattr__(self, 'schedule', schedule)
+        object.__setattr__(self, 'tou_valid', bool(tou_valid))
+        object.__setattr__(self, 'flat_rates', flat_rates)
+        object.__setattr__(self, 'flat_bounds', flat_bounds)
+        object.__setattr__(self, 'flat_lower', flat_lower)
+        object.__setattr__(self, 'flat_costs', flat_costs)
+        object.__setattr__(self, 'flat_months', flat_months)
+        object.__setattr__(self, 'flat_valid', bool(flat_valid))
+        object.__setattr__(self, 'window_minutes', float(window_minutes))
+        object.__setattr__(self, 'nonnegative', bool(rates.min() >= 0 and flat_rates.min() >= 0))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Cumulative bounds rebuild the same tier tables as the original limits
+        return (type(self), (
+            self.rates, self.bounds, self.schedule, self.tou_valid,
+            self.flat_rates, self.flat_bounds, self.flat_months, self.flat_valid, self.window_minutes,
+        ))
+
+    def __repr__(self):
+        return (
+            f"CompiledDemand(periods={self.rates.shape[0]}, tou_valid={self.tou_valid}, "
+            f"flat_periods={self.flat_rates.shape[0]}, flat_valid={self.flat_valid})"
+        )
+
+    @classmethod
+    def from_rate_data(cls, rate_data: Dict) -> Optional['CompiledDemand']:
+        """
+        Compile the demand fields of an OpenEI rate item
+
+        Args:
+            rate_data: Raw OpenEI item
+
+        Returns:
+            Optional[CompiledDemand]: None when the item has no demand charges
+            or they cannot be compiled
+        """
+        tou_structure = rate_data.get('demandratestructure') or []
+        flat_structure = rate_data.get('flatdemandstructure') or []
+        if not tou_structure and not flat_structure:
+            return None
+
+        try:
+            rates, limits, usable = _compile_tiers(tou_structure)
+            schedule = np.zeros((2, 12, 24), dtype=np.int16)
+            tou_valid = False
+            weekday = _schedule_array(rate_data.get('demandweekdayschedule'))
+            weekend = _schedule_array(rate_data.get('demandweekendschedule'))
+            if weekend is None:
+                weekend = weekday
+            if tou_structure and weekday is not None:
+                both = np.stack([weekday, weekend])
+                if np.all((both >= 0) & (both < len(tou_structure))):
+                    schedule = both.astype(np.int16)
+                    tou_valid = bool(np.all(usable[both]))
+
+            flat_rates, flat_limits, flat_usable = _compile_tiers(flat_structure)
+            flat_months = np.zeros(12, dtype=np.intp)
+            flat_valid = False
+            months = rate_data.get('flatdemandmonths')
+            if flat_structure and months:
+                months = np.asarray(months, dtype=np.intp)
+                if months.shape == (12,) and np.all((months >= 0) & (months < len(flat_structure))):
+                    flat_months = months
+                    flat_valid = bool(np.all(flat_usable[months]))
+            elif len(flat_structure) == 1:
+                # A single flat period applies all year
+                flat_valid = bool(flat_usable[0])
+
+            window_minutes = float(rate_data.get('demandwindow') or cls.DEFAULT_WINDOW_MINUTES)
+
+        except Exception as e:
+            logger.error(f"Error compiling demand structure: {str(e)}")
+            return None
+
+        if not tou_valid and not flat_valid:
+            return None
+
+        return cls(
+            rates=rates,
+            limits=limits,
+            schedule=schedule,
+            tou_valid=tou_valid,
+            flat_rates=flat_rates,
+            flat_limits=flat_limits,
+            flat_months=flat_months,
+            flat_valid=flat_valid,
+            window_minutes=window_minutes,
+        )
@@ -0,0 +1,170 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from .compiled_tariff import HOURS_PER_YEAR, CompiledDemand, interval_calendar
+
+logger = logging.getLogger(__name__)
+
+
+class DemandChargeEngine:
+    """
+    Monthly demand charges from hourly or sub-hourly load series.
+
+    Interval kWh is converted to kW and averaged over the tariff's demand
+    window with a prefix-sum rolling mean. Billing-month peaks per demand
+    period come from a max-reduce over runs of equal (month, period)
+    followed by a scatter-max into a small (month x period) table, so a
+    year of 15-minute data is a handful of array passes for any number
+    of load rows.
+    """
+
+    def price_annual(self, demand: Optional[CompiledDemand], loads_kwh) -> np.ndarray:
+        """
+        Demand charges for full years of interval load
+
+        Args:
+            demand: Compiled demand charges, or None
+            loads_kwh: kWh per interval over REFERENCE_YEAR, hourly (8760)
+                or sub-hourly (e.g. 35040 for 15-minute data); shape
+                (intervals,) or (loads, intervals)
+
+        Returns:
+            np.ndarray: Annual demand charges in dollars per load row
+        """
+        loads = np.atleast_2d(np.asarray(loads_kwh, dtype=np.float64))
+        steps_per_hour, remainder = divmod(loads.shape[-1], HOURS_PER_YEAR)
+        if remainder or steps_per_hour < 1:
+            raise ValueError(f"Expected a multiple of {HOURS_PER_YEAR} intervals, got {loads.shape[-1]}")
+        months, hour_of_day, is_weekend = interval_calendar(steps_per_hour)
+        return self.price_intervals(demand, loads, 1 / steps_per_hour, months, is_weekend, hour_of_day)
+
+    def price_intervals(self,
+                        demand: Optional[CompiledDemand],
+                        loads: np.ndarray,
+                        interval_hours: float,
+                        months: np.ndarray,
+                        is_weekend: np.ndarray,
+                        hour_of_day: np.ndarray,
+                        billing_periods: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Demand charges of time-ordered consumption intervals
+
+        Args:
+            demand: Compiled demand charges, or None
+            loads: kWh per interval, shape (loads, intervals)
+            interval_hours: Length of one interval in hours
+            months: Month of year (0-11) of each interval
+            is_weekend: 1 for weekend intervals, else 0
+            hour_of_day: Hour (0-23) of each interval
+            billing_periods: Billing period of each interval; a change of
+                value starts a new period. Defaults to ``months``
+
+        Returns:
+            np.ndarray: Demand charges in dollars for each load row
+        """
+        loads = np.atleast_2d(np.asarray(loads, dtype=np.float64))
+        totals = np.zeros(loads.shape[0], dtype=np.float64)
+        if demand is None or loads.shape[-1] == 0:
+            return totals
+
+        tou_peaks, flat_peaks, bill_months = self.billing_peaks(
+            demand, loads, interval_hours, months, is_weekend, hour_of_day, billing_periods
+        )
+
+        if tou_peaks is not None:
+            period_count = demand.rates.shape[0]
+            charges = self._tiered_charge(
+                tou_peaks, np.arange(period_count), demand.rates, demand.bounds, demand.lower, demand.costs
+            )
+            totals += charges.sum(axis=(-2, -1))
+
+        if flat_peaks is not None:
+            charges = self._tiered_charge(
+                flat_peaks, demand.flat_months[bill_months], demand.flat_rates,
+                demand.flat_bounds, demand.flat_lower, demand.flat_costs
+            )
+            totals += charges.sum(axis=-1)
+
+        return totals
+
+    def billing_peaks(self,
+                      demand: CompiledDemand,
+                      loads: np.ndarray,
+                      interval_hours: float,
+                      months: np.ndarray,
+                      is_weekend: np.ndarray,
+                      hour_of_day: np.ndarray,
+                      billing_periods: Optional[np.ndarray] = None):
+        """
+        Peak demand per billing period, before any rates are applied
+
+        Returns:
+            Tuple: TOU peaks of shape (loads, bills, demand periods) or None,
+            flat peaks of shape (loads, bills) or None, and the month of
+            each bill; peaks are -inf where a period has no intervals
+        """
+        kw = self.demand_kw(loads, interval_hours, demand.window_minutes)
+
+        billing = months if billing_periods is None else np.asarray(billing_periods)
+        boundary = np.ones(billing.shape[0], dtype=bool)
+        boundary[1:] = billing[1:] != billing[:-1]
+        bill_index = np.cumsum(boundary) - 1
+        bill_months = np.asarray(months)[boundary]
+        bill_count = bill_months.shape[0]
+
+        tou_peaks = flat_peaks = None
+        if demand.tou_valid:
+            period_count = demand.rates.shape[0]
+            periods = demand.schedule[is_weekend, months, hour_of_day].astype(np.intp)
+            tou_peaks = self._group_max(kw, bill_index * period_count + periods, bill_count * period_count)
+            tou_peaks = tou_peaks.reshape(loads.shape[0], bill_count, period_count)
+        if demand.flat_valid:
+            flat_peaks = self._group_max(kw, bill_index, bill_count)
+        return tou_peaks, flat_peaks, bill_months
+
+    @staticmethod
+    def demand_kw(loads: np.ndarray, interval_hours: float, window_minutes: float) -> np.ndarray:
+        """Average kW over the trailing demand window ending at each interval"""
+        kw = loads / interval_hours
+        window = int(round(window_minutes / (interval_hours * 60)))
+        if window <= 1:
+            return kw
+
+        running = np.concatenate([np.zeros(kw.shape[:-1] + (1,)), np.cumsum(kw, axis=-1)], axis=-1)
+        ends = np.arange(1, kw.shape[-1] + 1)
+        starts = np.maximum(ends - window, 0)
+        return (running[..., ends] - running[..., starts]) / (ends - starts)
+
+    @staticmethod
+    def _group_max(values: np.ndarray, keys: np.ndarray, size: int) -> np.ndarray:
+        """Max of each load row's values per key; -inf where a key never occurs"""
+        change = np.ones(keys.shape[0], dtype=bool)
+        change[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(change)
+        run_max = np.maximum.reduceat(values, starts, axis=-1)
+
+        peaks = np.full((values.shape[0], size), -np.inf)
+        np.maximum.at(peaks, (slice(None), keys[starts]), run_max)
+        return peaks
+
+    @staticmethod
+    def _tiered_charge(peaks: np.ndarray,
+                       periods: np.ndarray,
+                       rates: np.ndarray,
+                       bounds: np.ndarray,
+                       lower: np.ndarray,
+                       costs: np.ndarray) -> np.ndarray:
+        """Charge for each peak kW against its period's cumulative kW blocks"""
+        present = np.isfinite(peaks)
+        kw = np.where(present, np.maximum(peaks, 0.0), 0.0)
+
+        tier_count = rates.shape[1]
+        tier_index = np.count_nonzero(kw[..., None] >= bounds[periods], axis=-1)
+        flat_index = periods * tier_count + np.minimum(tier_index, tier_count - 1)
+        charges = (
+            costs.ravel().take(flat_index)
+            + (kw - lower.ravel().take(flat_index)) * rates.ravel().take(flat_index)
+        )
+        return np.where(present, charges, 0.0)
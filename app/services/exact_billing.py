@@ -0,0 +1,253 @@
+import logging
+from decimal import ROUND_HALF_UP, Context, Decimal, localcontext
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .compiled_tariff import HOURS_PER_YEAR, CompiledDemand, CompiledTariff, interval_calendar
+from .demand_charges import DemandChargeEngine
+from .rate_engine import TIER_MODE_HOURLY, TIER_MODE_MONTHLY
+
+logger = logging.getLogger(__name__)
+
+# float64 array pricing, for ranking and bulk comparison
+BILLING_MODE_FAST = 'fast'
+# Decimal bill lines rounded to the cent, for bill-accurate amounts
+BILLING_MODE_EXACT = 'exact'
+BILLING_MODES = (BILLING_MODE_FAST, BILLING_MODE_EXACT)
+
+# Fixed context for every exact-mode operation, independent of the caller's
+BILLING_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP)
+CENT = Decimal('0.01')
+# Billed kWh and kW are metered to three decimals
+QUANTITY = Decimal('0.001')
+
+MONTHS_PER_YEAR = 12
+
+
+def to_decimal(value: Union[float, Decimal]) -> Decimal:
+    """Decimal of a float's shortest repr, so a JSON rate of 0.1234 stays exactly 0.1234"""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(repr(float(value)))
+
+
+class ExactBillingEngine:
+    """
+    Bill-accurate Decimal pricing of compiled tariffs.
+
+    Consumption is still aggregated with float64 arrays: kWh per billing
+    month, rate period and tier, and demand peaks per billing month and
+    period. Each of those bill lines is then quantized to QUANTITY,
+    multiplied by its Decimal rate and rounded half-up to the cent in
+    BILLING_CONTEXT, and the lines are summed exactly. Fixed charges are
+    billed monthly, also rounded to the cent.
+
+    A bill differs from the fast float path by at most half a cent plus
+    half a QUANTITY times the line's rate on every line; tolerance() gives
+    that bound for a tariff.
+    """
+
+    def __init__(self, demand_engine: Optional[DemandChargeEngine] = None):
+        self.demand_engine = demand_engine or DemandChargeEngine()
+
+    def price_annual(self,
+                     tariff: CompiledTariff,
+                     load_kwh,
+                     tier_mode: str = TIER_MODE_HOURLY) -> Decimal:
+        """
+        Exact first-year bill total for one year of interval load
+
+        Args:
+            tariff: Compiled tariff to price
+            load_kwh: kWh per interval over REFERENCE_YEAR, hourly (8760)
+                or sub-hourly (e.g. 35040 15-minute values)
+            tier_mode: One of TIER_MODES
+
+        Returns:
+            Decimal: Energy, demand and fixed charges in dollars, to the cent
+        """
+        load = np.asarray(load_kwh, dtype=np.float64).reshape(-1)
+        steps_per_hour, remainder = divmod(load.size, HOURS_PER_YEAR)
+        if remainder or steps_per_hour < 1:
+            raise ValueError(f"Expected a multiple of {HOURS_PER_YEAR} intervals, got {load.size}")
+        months, hour_of_day, is_weekend = interval_calendar(steps_per_hour)
+
+        with localcontext(BILLING_CONTEXT):
+            total = Decimal(0)
+            if tariff.annual_valid:
+                periods = tariff.year_periods
+                if steps_per_hour > 1:
+                    periods = np.repeat(periods, steps_per_hour)
+                total += self._energy_charges(tariff, periods, months, load, tier_mode)
+            if tariff.demand is not None:
+                total += self._demand_charges(
+                    tariff.demand, load, 1 / steps_per_hour, months, is_weekend, hour_of_day
+                )
+            total += self._fixed_charges(tariff, MONTHS_PER_YEAR)
+        return total
+
+    def _energy_charges(self,
+                        tariff: CompiledTariff,
+                        periods: np.ndarray,
+                        months: np.ndarray,
+                        load: np.ndarray,
+                        tier_mode: str = TIER_MODE_HOURLY) -> Decimal:
+        """Energy bill lines, one per (billing period, rate period, tier) with usage"""
+        period_count, tier_count = tariff.rates.shape
+        bill_index = self._bill_index(months)
+        line_base = (bill_index * period_count + periods) * tier_count
+
+        if tier_mode == TIER_MODE_MONTHLY:
+            running = np.cumsum(load)
+            positions = np.arange(load.size)
+            first = np.diff(bill_index, prepend=-1) != 0
+            run_start = np.maximum.accumulate(np.where(first, positions, 0))
+            after = running - np.where(run_start > 0, running[run_start - 1], 0.0)
+            before = after - load
+            overlap = (
+                np.minimum(after[:, None], tariff.tier_bounds[periods])
+                - np.maximum(before[:, None], tariff.tier_lower[periods])
+            )
+            keys = (line_base[:, None] + np.arange(tier_count)).ravel()
+            weights = np.maximum(overlap, 0.0).ravel()
+        elif tier_mode == TIER_MODE_HOURLY:
+            keys = line_base + tariff.tier_indices(periods, load)
+            weights = load
+        else:
+            raise ValueError(f"Unknown tier mode: {tier_mode}")
+
+        line_kwh = np.bincount(keys, weights=weights)
+        rates = [[to_decimal(rate) for rate in row] for row in tariff.rates.tolist()]
+
+        total = Decimal(0)
+        for key in np.flatnonzero(line_kwh).tolist():
+            period, tier = divmod(key % (period_count * tier_count), tier_count)
+            quantity = Decimal(line_kwh[key]).quantize(QUANTITY)
+            total += (quantity * rates[period][tier]).quantize(CENT)
+        return total
+
+    def _demand_charges(self,
+                        demand: CompiledDemand,
+                        load: np.ndarray,
+                        interval_hours: float,
+                        months: np.ndarray,
+                        is_weekend: np.ndarray,
+                        hour_of_day: np.ndarray) -> Decimal:
+        """Demand bill lines, one per (billing period, demand period) peak"""
+        tou_peaks, flat_peaks, bill_months = self.demand_engine.billing_peaks(
+            demand, load[None, :], interval_hours, months, is_weekend, hour_of_day
+        )
+
+        total = Decimal(0)
+        if tou_peaks is not None:
+            tiers = self._decimal_tiers(demand.rates, demand.lower, demand.bounds)
+            for bill in tou_peaks[0].tolist():
+                for period, peak in enumerate(bill):
+                    total += self._tiered_line(peak, tiers[period])
+        if flat_peaks is not None:
+            tiers = self._decimal_tiers(demand.flat_rates, demand.flat_lower, demand.flat_bounds)
+            for peak, month in zip(flat_peaks[0].tolist(), bill_months.tolist()):
+                total += self._tiered_line(peak, tiers[demand.flat_months[month]])
+        return total
+
+    @staticmethod
+    def _fixed_charges(tariff: CompiledTariff, bills: int) -> Decimal:
+        """Annualized fixed charge billed monthly, each bill rounded to the cent"""
+        monthly = (to_decimal(tariff.annual_fixed_charge) / MONTHS_PER_YEAR).quantize(CENT)
+        return monthly * bills
+
+    @staticmethod
+    def tolerance(tariff: CompiledTariff) -> float:
+        """
+        Largest possible |exact - fast| first-year difference for a tariff
+
+        Every bill line may move by half a cent of rounding plus half a
+        QUANTITY of its quantity times its rate.
+        """
+        half_quantity = float(QUANTITY) / 2
+        half_cent = float(CENT) / 2
+
+        lines = tariff.rates.size
+        bound = lines * half_cent + half_quantity * float(np.abs(tariff.rates).max(initial=0.0)) * lines
+        demand = tariff.demand
+        if demand is not None:
+            for rates, valid in ((demand.rates, demand.tou_valid), (demand.flat_rates, demand.flat_valid)):
+                if valid:
+                    lines = rates.shape[0]
+                    bound += lines * (half_cent + half_quantity * float(np.abs(rates).max(initial=0.0)))
+        # The month's fixed-charge line
+        bound += half_cent
+        # Rounding and float aggregation noise on top of the line bound
+        return MONTHS_PER_YEAR * bound + 1e-6
+
+    def project(self,
+                base_cost: Union[float, Decimal],
+                escalator: Union[float, Sequence[float]],
+                horizon: int) -> List[Decimal]:
+        """
+        Escalated yearly bills, each year rounded to the cent
+
+        Args:
+            base_cost: First-year cost
+            escalator: Annual percentage increase, or a per-year curve of
+                horizon - 1 increases
+            horizon: Number of years
+
+        Returns:
+            List[Decimal]: Cost for each year of the horizon
+        """
+        if np.ndim(escalator) == 0:
+            escalators = [escalator] * (horizon - 1)
+        else:
+            escalators = list(np.asarray(escalator, dtype=np.float64).reshape(-1))
+            if len(escalators) != horizon - 1:
+                raise ValueError(f"Escalator curves need {horizon - 1} yearly values, got {len(escalators)}")
+
+        with localcontext(BILLING_CONTEXT):
+            cost = to_decimal(base_cost)
+            yearly = [cost.quantize(CENT)]
+            for increase in escalators:
+                cost *= 1 + to_decimal(increase) / 100
+                yearly.append(cost.quantize(CENT))
+        return yearly
+
+    @staticmethod
+    def totals(yearly: Sequence[Decimal], discount_rate: float = 0.0) -> Tuple[Decimal, Decimal]:
+        """Cumulative and net present cost of billed years; year k is discounted by (1 + d)^k"""
+        with localcontext(BILLING_CONTEXT):
+            discount = 1 + to_decimal(discount_rate) / 100
+            cumulative = sum(yearly, Decimal(0))
+            npv = sum((cost / discount ** year for year, cost in enumerate(yearly, start=1)), Decimal(0))
+            return cumulative, npv.quantize(CENT)
+
+    @staticmethod
+    def _bill_index(months: np.ndarray) -> np.ndarray:
+        boundary = np.ones(months.shape[0], dtype=bool)
+        boundary[1:] = months[1:] != months[:-1]
+        return np.cumsum(boundary) - 1
+
+    @staticmethod
+    def _decimal_tiers(rates: np.ndarray, lower: np.ndarray, bounds: np.ndarray):
+        """(rate, lower, upper) Decimal triples per period, dropping unreachable tiers"""
+        tiers = []
+        for period_rates, period_lower, period_bounds in zip(rates.tolist(), lower.tolist(), bounds.tolist()):
+            tiers.append([
+                (to_decimal(rate), to_decimal(low), None if np.isinf(high) else to_decimal(high))
+                for rate, low, high in zip(period_rates, period_lower, period_bounds)
+                if not np.isinf(low)
+            ])
+        return tiers
+
+    @staticmethod
+    def _tiered_line(peak: float, tiers) -> Decimal:
+        """One peak's charge across cumulative kW blocks, rounded to the cent"""
+        if np.isinf(peak):
+            return Decimal(0)
+        kw = Decimal(max(peak, 0.0)).quantize(QUANTITY)
+        charge = Decimal(0)
+        for rate, low, high in tiers:
+            if kw <= low:
+                break
+            charge += ((kw if high is None else min(kw, high)) - low) * rate
+        return charge.quantize(CENT)
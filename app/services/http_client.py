@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import random
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries to a fraction of overall traffic.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so
+    a failing upstream cannot multiply load by the per-request retry count.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class BudgetedRetry(Retry):
+    """urllib3 Retry that stops retrying once the shared RetryBudget is empty"""
+
+    budget: Optional[RetryBudget] = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.budget = self.budget
+        return retry
+
+    def increment(self, *args, **kwargs):
+        will_retry = self.total is None or self.total > 0
+        if self.budget is not None and will_retry and not self.budget.try_spend():
+            logger.warning("HTTP retry budget exhausted; not retrying")
+            final = self.new(total=0)
+            final.budget = None
+            return final.increment(*args, **kwargs)
+        return super().increment(*args, **kwargs)
+
+
+class _BudgetedAdapter(HTTPAdapter):
+    def __init__(self, budget: RetryBudget, **kwargs):
+        self.budget = budget
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.budget.deposit()
+        return super().send(request, **kwargs)
+
+
+class HttpClient:
+    """
+    Shared HTTP session with keep-alive pooling, timeouts and retries.
+
+    Connections are pooled per host (``pool_maxsize`` each) and reused
+    across calls. Requests default to separate connect/read timeouts.
+    Failures are retried with jittered exponential backoff, within a
+    process-wide RetryBudget. Connection errors are retried for every
+    method. Retry-able status codes are only retried for idempotent
+    methods, so webhook POSTs are not duplicated after a response.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 backoff_jitter: float = 0.5,
+                 retry_budget: Optional[RetryBudget] = None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry_budget = retry_budget or RetryBudget()
+
+        retry = BudgetedRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=self.RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        retry.budget = self.retry_budget
+
+        adapter = _BudgetedAdapter(
+            self.retry_budget,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHttpClient:
+    """
+    Async counterpart of HttpClient built on httpx.AsyncClient.
+
+    Keeps a keep-alive pool bound to one event loop. Connection failures are
+    retried by the transport; retry-able statuses on GET are retried with
+    jittered exponential backoff within the shared RetryBudget.
+    """
+
+    def __init__(self,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 pool_maxsize: int = 10,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 backoff_jitter: float = 0.5,
+                 retry_budget: Optional[RetryBudget] = None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.retry_budget = retry_budget or RetryBudget()
+        self.shutdown_guard = None
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=httpx.AsyncHTTPTransport(
+                retries=max_retries,
+                limits=httpx.Limits(
+                    max_connections=pool_maxsize * 4,
+                    max_keepalive_connections=pool_maxsize
+                )
+            )
+        )
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            response = await self.client.get(url, **kwargs)
+            if (response.status_code not in HttpClient.RETRY_STATUSES
+                    or attempt >= self.max_retries
+                    or not self.retry_budget.try_spend()):
+                return response
+            attempt += 1
+            delay = self.backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, self.backoff_jitter)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide HttpClient configured from settings"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HttpClient(
+                    connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+                    read_timeout=settings.HTTP_READ_TIMEOUT,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                    max_retries=settings.HTTP_MAX_RETRIES,
+                    backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+                    retry_budget=RetryBudget(ratio=settings.HTTP_RETRY_BUDGET_RATIO),
+                )
+    return _default_client
+
+
+async def _close_with_loop(client: AsyncHttpClient):
+    """
+    Async generator that closes ``client`` when it is finalized.
+
+    Event loops finalize live async generators in ``shutdown_asyncgens()``,
+    which asyncio.run(), asgiref and ASGI servers call before closing the
+    loop, so the pool is closed on the loop it belongs to.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+# httpx pools are bound to the loop that created them
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpClient]' = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    """AsyncHttpClient for the running event loop, sharing the sync client's retry budget"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncHttpClient(
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.HTTP_READ_TIMEOUT,
+            pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+            max_retries=settings.HTTP_MAX_RETRIES,
+            backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+            retry_budget=get_http_client().retry_budget,
+        )
+        # Start the guard on this loop so its shutdown closes the pool;
+        # the loop only holds a weak reference, so keep it on the client
+        guard = _close_with_loop(client)
+        try:
+            guard.asend(None).send(None)
+        except StopIteration:
+            pass
+        client.shutdown_guard = guard
+        _async_clients[loop] = client
+    return client
@@ -0,0 +1,347 @@
+import csv
+import io
+import logging
+from array import array
+from datetime import datetime, timedelta
+from typing import IO, Optional, Tuple
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ESPI_NAMESPACE = '{http://naesb.org/espi}'
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+DAYS_PER_YEAR = 365
+
+
+class IntervalData:
+    """
+    Consumption on a regular time grid.
+
+    ``start`` is the local wall-clock time of the first interval and
+    ``values`` the kWh of each ``interval_minutes`` step after it.
+    Intervals with no reading hold zero and are counted in ``missing``.
+    """
+
+    def __init__(self,
+                 start: datetime,
+                 interval_minutes: int,
+                 values: np.ndarray,
+                 missing: int = 0,
+                 utc_offset_minutes: int = 0):
+        self.start = start.replace(tzinfo=None)
+        self.interval_minutes = int(interval_minutes)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.missing = int(missing)
+        self.utc_offset_minutes = int(utc_offset_minutes)
+
+    @property
+    def interval_hours(self) -> float:
+        return self.interval_minutes / 60
+
+    @property
+    def days(self) -> float:
+        return self.values.size * self.interval_minutes / (24 * 60)
+
+    @property
+    def total_kwh(self) -> float:
+        return float(self.values.sum(dtype=np.float64))
+
+    def to_bytes(self) -> bytes:
+        """Little-endian float32 kWh per interval"""
+        return self.values.astype('<f4', copy=False).tobytes()
+
+    @classmethod
+    def from_bytes(cls, start: datetime, interval_minutes: int, payload: bytes, **kwargs) -> 'IntervalData':
+        return cls(start, interval_minutes, np.frombuffer(payload, dtype='<f4'), **kwargs)
+
+    def hourly(self) -> 'IntervalData':
+        """
+        Sum sub-hourly intervals into clock hours
+
+        Series that are already hourly or coarser, or whose interval does
+        not divide an hour, are returned unchanged.
+        """
+        if self.interval_minutes >= 60 or 60 % self.interval_minutes:
+            return self
+        steps = 60 // self.interval_minutes
+        lead = self.start.minute // self.interval_minutes
+        tail = -(lead + self.values.size) % steps
+        padded = np.concatenate([
+            np.zeros(lead, dtype=np.float32), self.values, np.zeros(tail, dtype=np.float32)
+        ])
+        hours = padded.reshape(-1, steps).sum(axis=1, dtype=np.float64)
+        return IntervalData(
+            start=self.start.replace(minute=0, second=0, microsecond=0),
+            interval_minutes=60,
+            values=hours,
+            missing=self.missing,
+            utc_offset_minutes=self.utc_offset_minutes,
+        )
+
+    def calendar(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Month (0-11), weekend flag, hour of day and billing period of every interval
+
+        Billing periods are calendar months, numbered year * 12 + month.
+        """
+        start = np.datetime64(self.start, 'm')
+        stamps = start + np.arange(self.values.size, dtype=np.int64) * np.timedelta64(self.interval_minutes, 'm')
+        month_index = stamps.astype('datetime64[M]').astype(np.int64)
+        days = stamps.astype('datetime64[D]')
+        # 1970-01-01 was a Thursday, so Monday is 0 after shifting by 3
+        weekday = (days.astype(np.int64) + 3) % 7
+        hour_of_day = ((stamps - days).astype('timedelta64[h]').astype(np.int64)).astype(np.intp)
+        return (
+            (month_index % 12).astype(np.intp),
+            (weekday >= 5).astype(np.intp),
+            hour_of_day,
+            month_index,
+        )
+
+
+class IntervalDataParser:
+    """
+    Streaming parser for interval usage uploads.
+
+    Reads utility CSV exports (a timestamp or date + time column and a kWh
+    column, optionally after preamble lines) and Green Button ESPI XML
+    row by row / element by element. Only compact timestamp and value
+    arrays are kept, so memory grows with the number of readings rather
+    than the file size. Readings are then snapped onto a regular grid.
+    """
+
+    TIMESTAMP_COLUMNS = ('timestamp', 'datetime', 'date/time', 'date time', 'interval start', 'start', 'start time', 'time')
+    DATE_COLUMNS = ('date', 'day')
+    TIME_COLUMNS = ('start time', 'time', 'hour')
+    VALUE_COLUMNS = ('kwh', 'usage', 'consumption', 'value', 'import', 'energy')
+
+    TIMESTAMP_FORMATS = (
+        '%m/%d/%Y %H:%M',
+        '%m/%d/%Y %H:%M:%S',
+        '%m/%d/%Y %I:%M %p',
+        '%m/%d/%Y %I:%M:%S %p',
+        '%m/%d/%y %H:%M',
+        '%Y/%m/%d %H:%M',
+        '%d.%m.%Y %H:%M',
+    )
+
+    # Preamble lines scanned for a CSV header before giving up
+    MAX_HEADER_LINES = 50
+
+    def __init__(self, max_intervals: int = 5 * 366 * 96):
+        self.max_intervals = max_intervals
+        self._timestamp_format: Optional[str] = None
+
+    def parse(self, stream: IO[bytes], filename: str = '') -> Tuple[str, IntervalData]:
+        """
+        Parse an uploaded file, detecting Green Button XML or CSV
+
+        Args:
+            stream: Binary file object positioned at the start
+            filename: Original file name, used as a format hint
+
+        Returns:
+            Tuple[str, IntervalData]: Source format ('csv' or 'green_button') and the series
+        """
+        head = stream.read(512)
+        stream.seek(0)
+        if filename.lower().endswith('.xml') or head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+            return 'green_button', self.parse_green_button(stream)
+        return 'csv', self.parse_csv(stream)
+
+    def parse_csv(self, stream: IO[bytes]) -> IntervalData:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            rows = csv.reader(text)
+            columns, scale = self._find_csv_header(rows)
+
+            stamps = array('d')
+            values = array('d')
+            timestamp_column, date_column, time_column, value_column = columns
+            for row in rows:
+                if len(row) <= value_column or not row[value_column].strip():
+                    continue
+                if timestamp_column is not None:
+                    raw = row[timestamp_column]
+                else:
+                    raw = f"{row[date_column].strip()} {row[time_column].strip()}"
+                try:
+                    value = float(row[value_column].replace(',', ''))
+                except ValueError:
+                    continue
+                stamps.append(self._parse_timestamp(raw))
+                values.append(value * scale)
+                if len(stamps) > self.max_intervals:
+                    raise ValueError(f"Interval file has more than {self.max_intervals} readings")
+        finally:
+            text.detach()
+
+        return self._to_grid(stamps, values)
+
+    def parse_green_button(self, stream: IO[bytes]) -> IntervalData:
+        stamps = array('d')
+        values = array('d')
+        durations = array('d')
+        multiplier = 0
+        utc_offset = 0
+
+        self._reject_dtd(stream)
+        for _, element in ElementTree.iterparse(stream, events=('end',)):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'IntervalReading':
+                start = element.find(f'{ESPI_NAMESPACE}timePeriod/{ESPI_NAMESPACE}start')
+                duration = element.find(f'{ESPI_NAMESPACE}timePeriod/{ESPI_NAMESPACE}duration')
+                value = element.find(f'{ESPI_NAMESPACE}value')
+                if start is not None and value is not None:
+                    stamps.append(float(start.text))
+                    values.append(float(value.text))
+                    durations.append(float(duration.text) if duration is not None else 0.0)
+                    if len(stamps) > self.max_intervals:
+                        raise ValueError(f"Interval file has more than {self.max_intervals} readings")
+                element.clear()
+            elif tag == 'ReadingType':
+                power = element.find(f'{ESPI_NAMESPACE}powerOfTenMultiplier')
+                if power is not None and power.text:
+                    multiplier = int(power.text)
+                element.clear()
+            elif tag == 'LocalTimeParameters':
+                offset = element.find(f'{ESPI_NAMESPACE}tzOffset')
+                if offset is not None and offset.text:
+                    utc_offset = int(offset.text)
+                element.clear()
+
+        if not stamps:
+            raise ValueError("No IntervalReading elements found")
+
+        # Readings are Wh scaled by 10^powerOfTenMultiplier, stamped in UTC
+        scale = (10 ** multiplier) / 1000
+        local = np.frombuffer(stamps, dtype=np.float64) + utc_offset
+        kwh = np.frombuffer(values, dtype=np.float64) * scale
+        step = int(np.median(np.frombuffer(durations, dtype=np.float64))) or None
+        return self._to_grid(local, kwh, step_seconds=step, utc_offset_minutes=utc_offset // 60)
+
+    @staticmethod
+    def _reject_dtd(stream: IO[bytes]):
+        """
+        Refuse XML that declares a DTD, the carrier of entity expansion and
+        external entity attacks; Green Button files never have one. A DTD
+        can only precede the root element, so the prolog is all that is read.
+        """
+        class RootElement(Exception):
+            pass
+
+        def doctype(*args):
+            raise ValueError("XML with a DOCTYPE declaration is not accepted")
+
+        def root(*args):
+            raise RootElement()
+
+        parser = expat.ParserCreate()
+        parser.StartDoctypeDeclHandler = doctype
+        parser.StartElementHandler = root
+        try:
+            while True:
+                chunk = stream.read(64 * 1024)
+                parser.Parse(chunk, not chunk)
+                if not chunk:
+                    break
+        except (RootElement, expat.ExpatError):
+            # Syntax errors are reported by the real parse
+            pass
+        finally:
+            stream.seek(0)
+
+    def _find_csv_header(self, rows) -> Tuple[Tuple[Optional[int], Optional[int], Optional[int], int], float]:
+        for _, row in zip(range(self.MAX_HEADER_LINES), rows):
+            names = [cell.strip().lower() for cell in row]
+            value_column = self._match(names, self.VALUE_COLUMNS)
+            if value_column is None:
+                continue
+            scale = 1.0
+            if 'wh' in names[value_column] and 'kwh' not in names[value_column]:
+                scale = 0.001
+
+            date_column = self._match(names, self.DATE_COLUMNS, exact=True)
+            time_column = self._match(names, self.TIME_COLUMNS)
+            if date_column is not None and time_column is not None:
+                return (None, date_column, time_column, value_column), scale
+            timestamp_column = self._match(names, self.TIMESTAMP_COLUMNS)
+            if timestamp_column is None:
+                timestamp_column = date_column
+            if timestamp_column is not None:
+                return (timestamp_column, None, None, value_column), scale
+        raise ValueError("Could not find timestamp and kWh columns in the CSV header")
+
+    @staticmethod
+    def _match(names, candidates, exact: bool = False) -> Optional[int]:
+        for candidate in candidates:
+            for index, name in enumerate(names):
+                if name == candidate or (not exact and name.startswith(candidate)):
+                    return index
+        return None
+
+    def _parse_timestamp(self, raw: str) -> float:
+        """Local wall-clock seconds since the epoch; any UTC offset in the text is dropped"""
+        raw = raw.strip()
+        if self._timestamp_format is None:
+            try:
+                parsed = datetime.fromisoformat(raw)
+                return (parsed.replace(tzinfo=None) - _EPOCH).total_seconds()
+            except ValueError:
+                pass
+            for timestamp_format in self.TIMESTAMP_FORMATS:
+                try:
+                    parsed = datetime.strptime(raw, timestamp_format)
+                except ValueError:
+                    continue
+                self._timestamp_format = timestamp_format
+                return (parsed - _EPOCH).total_seconds()
+            raise ValueError(f"Unrecognized timestamp: {raw!r}")
+        return (datetime.strptime(raw, self._timestamp_format) - _EPOCH).total_seconds()
+
+    def _to_grid(self,
+                 stamps,
+                 values,
+                 step_seconds: Optional[int] = None,
+                 utc_offset_minutes: int = 0) -> IntervalData:
+        """Snap readings onto a regular grid, summing duplicates and zero-filling gaps"""
+        stamps = np.asarray(stamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if stamps.size == 0:
+            raise ValueError("No interval readings found")
+
+        order = np.argsort(stamps, kind='stable')
+        stamps = stamps[order]
+        values = values[order]
+
+        if not step_seconds:
+            gaps = np.diff(stamps)
+            gaps = gaps[gaps > 0]
+            if gaps.size == 0:
+                raise ValueError("Interval data needs at least two distinct timestamps")
+            step_seconds = int(np.median(gaps))
+        if step_seconds < 60 or step_seconds % 60:
+            raise ValueError(f"Unsupported interval length: {step_seconds} seconds")
+
+        slots = np.floor((stamps - stamps[0]) / step_seconds).astype(np.int64)
+        size = int(slots[-1]) + 1
+        if size > self.max_intervals:
+            raise ValueError(f"Interval data spans more than {self.max_intervals} intervals")
+
+        grid = np.bincount(slots, weights=values, minlength=size)
+        missing = size - np.count_nonzero(np.bincount(slots, minlength=size))
+
+        start = _EPOCH + timedelta(seconds=float(stamps[0]))
+        return IntervalData(
+            start=start,
+            interval_minutes=step_seconds // 60,
+            values=grid,
+            missing=missing,
+            utc_offset_minutes=utc_offset_minutes,
+        )
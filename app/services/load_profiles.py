@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .compiled_tariff import HOUR_IS_WEEKEND, HOUR_MONTH, HOUR_OF_DAY, HOURS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+
+def _normalized_curve(curve: List[float]) -> List[float]:
+    """Scale a 24-hour percentage curve so it sums to exactly 100"""
+    total = sum(curve)
+    if not 99.5 <= total <= 100.5:
+        logger.warning(f"Load curve percentages sum to {total}, not 100")
+        return [x * (100 / total) for x in curve]
+    return list(curve)
+
+
+# Standard residential load curve (percentage of daily usage per hour),
+# validated once at import
+DEFAULT_LOAD_CURVE = _normalized_curve([
+    3.5, 2.8, 2.5, 2.3, 2.2, 2.3,  # 12am - 5am
+    2.8, 3.8, 4.5, 4.8, 4.7, 4.6,  # 6am - 11am
+    4.5, 4.4, 4.3, 4.2, 4.3, 4.6,  # 12pm - 5pm
+    5.0, 5.2, 5.0, 4.7, 4.3, 3.9   # 6pm - 11pm
+])
+
+DEFAULT_PROFILE = 'residential'
+
+# Per customer class: (weekday curve, weekend curve, seasonal sensitivity)
+_CLASS_SHAPES: Dict[str, Tuple[List[float], List[float], float]] = {
+    'residential': (DEFAULT_LOAD_CURVE, DEFAULT_LOAD_CURVE, 0.3),
+    'ev': (
+        [6.5, 6.5, 6.0, 5.5, 4.5, 3.0, 2.5, 3.0, 3.2, 3.3, 3.2, 3.1,
+         3.0, 2.9, 2.9, 2.9, 3.1, 3.5, 4.0, 4.2, 4.0, 4.5, 5.8, 6.5],
+        [6.0, 6.0, 5.5, 5.0, 4.2, 3.2, 2.8, 3.0, 3.3, 3.6, 3.7, 3.6,
+         3.5, 3.4, 3.3, 3.3, 3.5, 3.7, 4.0, 4.1, 4.0, 4.3, 5.0, 6.0],
+        0.1
+    ),
+    'heat_pump': (
+        [3.8, 3.6, 3.5, 3.5, 3.7, 4.3, 5.2, 5.4, 4.8, 4.1, 3.7, 3.5,
+         3.4, 3.3, 3.3, 3.4, 3.8, 4.4, 4.9, 5.0, 4.8, 4.5, 4.2, 4.0],
+        [3.8, 3.7, 3.6, 3.6, 3.7, 4.0, 4.5, 5.0, 5.0, 4.6, 4.2, 3.9,
+         3.7, 3.6, 3.6, 3.7, 3.9, 4.3, 4.7, 4.8, 4.6, 4.4, 4.2, 4.0],
+        1.0
+    ),
+    'commercial': (
+        [2.0, 1.9, 1.9, 1.9, 2.0, 2.4, 3.4, 4.8, 5.9, 6.4, 6.6, 6.7,
+         6.7, 6.8, 6.8, 6.6, 6.2, 5.3, 4.0, 3.1, 2.6, 2.3, 2.2, 2.1],
+        [3.6, 3.5, 3.5, 3.5, 3.6, 3.8, 4.0, 4.3, 4.5, 4.7, 4.8, 4.8,
+         4.8, 4.8, 4.8, 4.7, 4.6, 4.4, 4.2, 4.0, 3.9, 3.8, 3.7, 3.6],
+        0.4
+    ),
+}
+
+# Monthly deviation from the annual mean load, January first
+_CLIMATE_ZONES: Dict[str, List[float]] = {
+    'hot': [-0.2, -0.2, -0.1, 0.0, 0.2, 0.4, 0.5, 0.5, 0.3, 0.0, -0.1, -0.2],
+    'mild': [0.1, 0.05, 0.0, -0.1, -0.1, 0.0, 0.1, 0.1, 0.0, -0.1, 0.0, 0.1],
+    'cold': [0.5, 0.4, 0.2, 0.0, -0.2, -0.3, -0.3, -0.3, -0.2, 0.0, 0.2, 0.4],
+}
+
+_KEY_PATTERN = re.compile(r'^[a-z0-9_]+(\.[a-z0-9_]+)?$')
+
+# Profiles shared by every registry in the process, keyed by (directory, key)
+_profile_cache: Dict[Tuple[str, str], np.ndarray] = {}
+_profile_cache_lock = threading.Lock()
+# Available profile keys per directory, listed once per process
+_keys_cache: Dict[str, FrozenSet[str]] = {}
+
+
+def builtin_profile_keys() -> List[str]:
+    """Keys of the synthetic profiles: '<class>' and '<class>.<climate zone>'"""
+    keys = []
+    for customer_class in _CLASS_SHAPES:
+        keys.append(customer_class)
+        keys.extend(f"{customer_class}.{zone}" for zone in _CLIMATE_ZONES)
+    return keys
+
+
+def build_profile(key: str) -> np.ndarray:
+    """
+    Synthesize a built-in 8760-hour profile
+
+    Class-only keys have no seasonal variation; 'residential' therefore
+    reproduces DEFAULT_LOAD_CURVE on every day of the year.
+
+    Args:
+        key: '<class>' or '<class>.<climate zone>'
+
+    Returns:
+        np.ndarray: Share of annual consumption in each hour, summing to 1
+    """
+    customer_class, _, zone = key.partition('.')
+    if customer_class not in _CLASS_SHAPES or (zone and zone not in _CLIMATE_ZONES):
+        raise KeyError(f"Unknown load profile: {key}")
+
+    weekday, weekend, sensitivity = _CLASS_SHAPES[customer_class]
+    shapes = np.array([weekday, weekend], dtype=np.float64)
+    shapes /= shapes.sum(axis=1, keepdims=True)
+    profile = shapes[HOUR_IS_WEEKEND, HOUR_OF_DAY]
+
+    if zone:
+        seasonal = 1 + sensitivity * np.asarray(_CLIMATE_ZONES[zone])
+        profile = profile * seasonal[HOUR_MONTH]
+
+    return profile / profile.sum()
+
+
+class LoadProfileRegistry:
+    """
+    Registry of 8760-hour load profiles stored as .npy files.
+
+    Profiles are memory-mapped read-only, so every worker process shares the
+    same page-cache copy, and each mapping is opened once per process.
+    The store's keys are listed once per process as well, so key checks
+    do no filesystem work. Built-in profiles missing from the store are
+    synthesized in memory.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def get(self, key: Optional[str] = None) -> np.ndarray:
+        """
+        Return the read-only 8760-hour profile for a key
+
+        Args:
+            key: Profile key; DEFAULT_PROFILE when empty
+
+        Returns:
+            np.ndarray: Share of annual consumption in each hour
+        """
+        key = key or DEFAULT_PROFILE
+        if not _KEY_PATTERN.match(key):
+            raise KeyError(f"Invalid load profile key: {key}")
+
+        cache_key = (str(self.directory), key)
+        profile = _profile_cache.get(cache_key)
+        if profile is not None:
+            return profile
+
+        with _profile_cache_lock:
+            profile = _profile_cache.get(cache_key)
+            if profile is None:
+                profile = self._load(key)
+                _profile_cache[cache_key] = profile
+        return profile
+
+    def keys(self) -> List[str]:
+        """All profile keys available from the store or built in"""
+        return sorted(self._available_keys())
+
+    def __contains__(self, key) -> bool:
+        return key in self._available_keys()
+
+    def write_builtin_profiles(self) -> List[Path]:
+        """Write every built-in profile to the store as float32 .npy files"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for key in builtin_profile_keys():
+            path = self.directory / f"{key}.npy"
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, build_profile(key).astype(np.float32))
+            os.replace(tmp_path, path)
+            written.append(path)
+        with _profile_cache_lock:
+            _keys_cache.pop(str(self.directory), None)
+        return written
+
+    def _available_keys(self) -> FrozenSet[str]:
+        """Stored and built-in keys; each directory is listed once per process"""
+        cache_key = str(self.directory)
+        keys = _keys_cache.get(cache_key)
+        if keys is not None:
+            return keys
+
+        with _profile_cache_lock:
+            keys = _keys_cache.get(cache_key)
+            if keys is None:
+                stored = [path.stem for path in self.directory.glob('*.npy')] if self.directory.is_dir() else []
+                keys = frozenset(stored) | frozenset(builtin_profile_keys())
+                _keys_cache[cache_key] = keys
+        return keys
+
+    def _load(self, key: str) -> np.ndarray:
+        path = self.directory / f"{key}.npy"
+        if path.exists():
+            profile = np.load(path, mmap_mode='r')
+            if profile.shape != (HOURS_PER_YEAR,):
+                raise ValueError(f"Load profile {key} has shape {profile.shape}, expected ({HOURS_PER_YEAR},)")
+            return profile
+
+        profile = build_profile(key)
+        profile.setflags(write=False)
+        return profile
@@ -0,0 +1,72 @@
+import logging
+from typing import Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Tariff
+from .metrics import span
+from .territory import TerritoryResolver, get_territory_resolver
+
+logger = logging.getLogger(__name__)
+
+
+class LocalRateProvider:
+    """
+    Serves utility rates from the imported Tariff table instead of OpenEI.
+
+    Addresses are resolved to the utilities serving their ZIP code, and
+    each lookup is one indexed query returning an OpenEI-shaped response
+    with the same filters as the live API: approved default rates that
+    have not ended, newest first, at most ``limit`` of them.
+    """
+
+    def __init__(self, resolver: Optional[TerritoryResolver] = None, limit: int = 50):
+        self.resolver = resolver or get_territory_resolver()
+        self.limit = limit
+
+    def get_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> Dict:
+        """
+        Rates for an address from the local tariff database
+
+        Args:
+            address: Service address
+            utility: Optional utility name to restrict results to
+            eia_id: Optional utility EIA id to restrict results to
+
+        Returns:
+            Dict: OpenEI-shaped response; ``items`` is empty when no imported
+            tariff covers the address
+        """
+        if eia_id:
+            eia_ids = [str(eia_id)]
+        else:
+            eia_ids = self.utility_ids(address)
+        if not eia_ids:
+            logger.warning(f"No service territory found for {address}")
+            return {'items': []}
+
+        tariffs = Tariff.objects.filter(eia_id__in=eia_ids, approved=True, is_default=True)
+        if utility:
+            tariffs = tariffs.filter(utility__iexact=utility)
+        tariffs = tariffs.filter(Q(enddate__isnull=True) | Q(enddate__gte=timezone.now()))
+
+        with span('local_tariffs'):
+            items = list(tariffs.order_by('-startdate').values_list('payload', flat=True)[:self.limit])
+        return {'items': items}
+
+    async def aget_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> Dict:
+        return await sync_to_async(self.get_utility_rates)(address, utility, eia_id)
+
+    def resolve_territory(self, address: str):
+        return self.resolver.resolve(address)
+
+    def utility_ids(self, address: str) -> List[str]:
+        """EIA ids of every utility serving the address's ZIP code"""
+        territory = self.resolver.resolve(address)
+        if territory.eia_id:
+            return [territory.eia_id]
+        if territory.zip_code is None:
+            return []
+        return [eia_id for eia_id, _ in self.resolver.zip_utilities(territory.zip_code)]
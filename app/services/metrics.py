@@ -0,0 +1,162 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the stage duration histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Trace:
+    """Stage timings of one sampled request, in the order they finished"""
+
+    __slots__ = ('spans', 'serialize_started')
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.serialize_started: Optional[float] = None
+
+    def add(self, stage: str, seconds: float):
+        self.spans.append((stage, seconds))
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, summing repeated stages"""
+        totals: Dict[str, float] = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return ', '.join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items())
+
+
+_current_trace: 'contextvars.ContextVar[Optional[Trace]]' = contextvars.ContextVar('pricing_trace', default=None)
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and stage duration histograms.
+
+    Counters are always updated. Stage histograms are only fed by sampled
+    requests, so unsampled requests pay a single context variable lookup
+    per span. render() produces the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                state = series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += seconds
+            state[2] += 1
+
+    def value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every counter and histogram"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, 'counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{self._labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, (counts, total, count) in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                        cumulative += bucket_count
+                        le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                        lines.append(f"{name}_bucket{self._labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels(key)} {total:.6f}")
+                    lines.append(f"{name}_count{self._labels(key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, lines: List[str], name: str, kind: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    @staticmethod
+    def _labels(key: LabelKey) -> str:
+        if not key:
+            return ''
+        return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in key) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every request in the process
+metrics = MetricsRegistry()
+metrics.describe('pricing_stage_seconds', "Duration of calculate_rates stages in sampled requests")
+metrics.describe('tariff_cache_requests_total', "Tariff cache lookups by result (hit, stale, miss)")
+metrics.describe('tariffs_priced_total', "Tariffs whose first-year cost was simulated")
+metrics.describe('rates_pruned_total', "Rates skipped by top-K lower-bound pruning")
+metrics.describe('pricing_errors_total', "Pricing failures by stage")
+metrics.describe('openei_errors_total', "Failed OpenEI rate lookups")
+metrics.describe('request_errors_total', "Rate calculation requests answered with a server error, by view")
+
+
+def start_trace(sampled: bool) -> Tuple[Optional[Trace], contextvars.Token]:
+    """Begin a request's trace; spans are only recorded when sampled"""
+    trace = Trace() if sampled else None
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: contextvars.Token):
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str):
+    """Time a stage of the current request when it is sampled"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        trace.add(stage, seconds)
+        metrics.observe('pricing_stage_seconds', seconds, stage=stage)
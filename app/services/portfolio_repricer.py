@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import django
+import numpy as np
+from django.utils import timezone
+
+from ..models import Project, ProposalUtility
+from .compiled_tariff import CompiledTariff
+from .load_profiles import LoadProfileRegistry
+from .projection import DEFAULT_HORIZON_YEARS
+from .rate_calculator import RateCalculator
+from .rate_pricing import PRICING_ENGINE_VERSION
+from .rate_processor import RateProcessor
+from .rate_provider import RateProvider
+
+logger = logging.getLogger(__name__)
+
+# (tier mode, horizon, discount rate, load profile dir, load profile key, tariff,
+#  proposal ids, consumptions, escalators)
+PricingUnit = Tuple[str, int, float, str, str, CompiledTariff, List[int], List[float], List[float]]
+
+_worker_calculators: Dict[str, RateCalculator] = {}
+
+
+def _init_worker():
+    django.setup()
+
+
+def _price_unit(unit: PricingUnit) -> Tuple[List[int], List[List[float]], List[float], List[float]]:
+    """
+    Price every proposal of one (tariff, load profile) group; runs in a pool worker
+
+    Returns the proposal ids with their yearly projections, cumulative
+    costs and NPVs.
+    """
+    tier_mode, horizon, discount_rate, profile_dir, profile_key, tariff, proposal_ids, consumptions, escalators = unit
+    calculator = _worker_calculators.get(tier_mode)
+    if calculator is None:
+        calculator = _worker_calculators[tier_mode] = RateCalculator(tier_mode=tier_mode)
+    load_profile = LoadProfileRegistry(profile_dir).get(profile_key)
+    base_costs = calculator.calculate_base_costs(tariff, consumptions, load_profile)
+    series = calculator.projection.project(base_costs, escalators, horizon)
+    cumulative, npv = calculator.projection.totals(base_costs, escalators, horizon, discount_rate)
+    return (
+        proposal_ids,
+        calculator.projection.to_lists(series),
+        np.round(cumulative, 2).tolist(),
+        np.round(npv, 2).tolist(),
+    )
+
+
+class PortfolioRepricer:
+    """
+    Reprices the selected rate of every ProposalUtility in bulk.
+
+    Projects are streamed in id order and grouped by service territory, so
+    each territory's tariffs are fetched and compiled once. Pricing fans out
+    across a process pool, one unit per (tariff, load profile) group, and
+    results are written back with bulk_update. Progress is checkpointed
+    after every chunk so an interrupted run can resume.
+
+    With ``stale_only`` a proposal is only repriced when the content hash
+    of its tariff or PRICING_ENGINE_VERSION differs from the ones its
+    stored results were computed with. ``labels`` restricts the run to
+    proposals whose selected tariff is one of the given OpenEI labels,
+    such as the changes reported by a tariff sync.
+    """
+
+    MAX_TERRITORIES = 256
+
+    def __init__(self,
+                 rate_provider: RateProvider,
+                 tier_mode: str,
+                 load_profile_dir: str,
+                 horizon: int = DEFAULT_HORIZON_YEARS,
+                 discount_rate: float = 0.0,
+                 stale_only: bool = False,
+                 labels: Optional[Iterable[str]] = None,
+                 workers: int = 0,
+                 chunk_size: int = 2000,
+                 checkpoint_path: Optional[str] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+        self.rate_provider = rate_provider
+        self.rate_processor = RateProcessor()
+        self.tier_mode = tier_mode
+        self.load_profile_dir = str(load_profile_dir)
+        self.horizon = horizon
+        self.discount_rate = discount_rate
+        self.stale_only = stale_only
+        self.labels = list(labels) if labels is not None else None
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress or logger.info
+        self._territories: 'OrderedDict[str, Optional[Dict[str, Dict]]]' = OrderedDict()
+
+    def run(self, resume: bool = False) -> Dict[str, float]:
+        """
+        Reprice all proposals, optionally continuing from the checkpoint
+
+        Returns:
+            Dict: Counts of repriced, unchanged, skipped and failed proposals plus throughput
+        """
+        state = self._load_checkpoint() if resume else {}
+        stats = {
+            'last_project_id': state.get('last_project_id', 0),
+            'repriced': state.get('repriced', 0),
+            'unchanged': state.get('unchanged', 0),
+            'skipped': state.get('skipped', 0),
+            'failed': state.get('failed', 0),
+        }
+        if stats['last_project_id']:
+            self.progress(f"Resuming after project {stats['last_project_id']}")
+
+        started = time.perf_counter()
+        seen = 0
+        executor = self._make_executor()
+        try:
+            for chunk in self._stream_chunks(stats['last_project_id']):
+                chunk_started = time.perf_counter()
+                repriced, unchanged, skipped, failed = self._reprice_chunk(chunk, executor)
+
+                stats['last_project_id'] = chunk[-1].id
+                stats['repriced'] += repriced
+                stats['unchanged'] += unchanged
+                stats['skipped'] += skipped
+                stats['failed'] += failed
+                self._save_checkpoint(stats)
+
+                seen += len(chunk)
+                elapsed = time.perf_counter() - started
+                self.progress(
+                    f"Chunk of {len(chunk)} up to project {chunk[-1].id}: "
+                    f"{len(chunk) / max(time.perf_counter() - chunk_started, 1e-9):.0f} projects/s "
+                    f"({seen / max(elapsed, 1e-9):.0f} overall), "
+                    f"{stats['repriced']} repriced, {stats['unchanged']} unchanged, "
+                    f"{stats['skipped']} skipped, {stats['failed']} failed"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 2)
+        stats['projects_per_second'] = round(seen / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+    def _stream_chunks(self, after_id: int) -> Iterator[List[Project]]:
+        projects = Project.objects.filter(id__gt=after_id, proposal__isnull=False)
+        if self.labels is not None:
+            projects = projects.filter(proposal__openei_id__in=self.labels)
+        projects = (
+            projects
+            .select_related('proposal')
+            .only(
+                'id', 'address', 'consumption', 'percentage', 'load_profile',
+                'proposal__id', 'proposal__openei_id', 'proposal__average_rate',
+                'proposal__first_year_cost', 'proposal__pricing_matrix',
+                'proposal__tariff_hash', 'proposal__engine_version',
+            )
+            .order_by('id')
+            .iterator(chunk_size=self.chunk_size)
+        )
+        chunk = []
+        for project in projects:
+            chunk.append(project)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _reprice_chunk(self, chunk: List[Project], executor: Optional[Executor]) -> Tuple[int, int, int, int]:
+        by_territory = defaultdict(list)
+        for project in chunk:
+            by_territory[self.territory_key(project)].append(project)
+
+        unchanged = skipped = failed = 0
+        groups = defaultdict(lambda: ([], [], []))
+        rates_by_group = {}
+        proposals = {}
+
+        for territory, projects in by_territory.items():
+            rates = self._territory_rates(territory, projects[0].address)
+            if rates is None:
+                failed += len(projects)
+                continue
+            for project in projects:
+                proposal = project.proposal
+                rate = rates.get(proposal.openei_id)
+                # select_rate refuses tariffs whose schedule does not cover the year
+                if rate is None or not rate['compiled'].annual_valid:
+                    skipped += 1
+                    continue
+                if self.stale_only and self.is_current(proposal, rate):
+                    unchanged += 1
+                    continue
+                # Territories sharing a tariff share its compiled object via
+                # the processed-rate memo, so they are priced as one unit
+                group_key = (id(rate['compiled']), project.load_profile)
+                ids, consumptions, escalators = groups[group_key]
+                ids.append(proposal.id)
+                consumptions.append(project.consumption)
+                escalators.append(project.percentage)
+                rates_by_group[group_key] = rate
+                proposals[proposal.id] = proposal
+
+        units = [
+            (
+                self.tier_mode, self.horizon, self.discount_rate, self.load_profile_dir, key[1],
+                rates_by_group[key]['compiled'], *groups[key]
+            )
+            for key in groups
+        ]
+        group_rates = {
+            proposal_id: rates_by_group[key]
+            for key in groups for proposal_id in groups[key][0]
+        }
+
+        computed_at = timezone.now()
+        if executor is not None:
+            futures = [(unit, executor.submit(_price_unit, unit)) for unit in units]
+            outcomes = ((unit, future.result) for unit, future in futures)
+        else:
+            outcomes = ((unit, partial(_price_unit, unit)) for unit in units)
+        for unit, price in outcomes:
+            try:
+                proposal_ids, projections, cumulative_costs, npvs = price()
+            except Exception as e:
+                # Only this unit's proposals fail; the rest of the chunk is still written
+                unit_ids = unit[6]
+                logger.error(f"Error repricing {len(unit_ids)} proposals on tariff {unit[5].label}: {str(e)}")
+                for proposal_id in unit_ids:
+                    del proposals[proposal_id]
+                failed += len(unit_ids)
+                continue
+            for proposal_id, projection, cumulative, npv in zip(proposal_ids, projections, cumulative_costs, npvs):
+                proposal = proposals[proposal_id]
+                rate = group_rates[proposal_id]
+                proposal.average_rate = rate['avg_rate']
+                proposal.first_year_cost = projection[0]
+                proposal.pricing_matrix = projection
+                proposal.cumulative_cost = cumulative
+                proposal.npv = npv
+                proposal.horizon = self.horizon
+                proposal.tariff_hash = rate['content_hash']
+                proposal.engine_version = PRICING_ENGINE_VERSION
+                proposal.computed_at = computed_at
+
+        ProposalUtility.objects.bulk_update(
+            list(proposals.values()),
+            [
+                'average_rate', 'first_year_cost', 'pricing_matrix', 'cumulative_cost', 'npv',
+                'horizon', 'tariff_hash', 'engine_version', 'computed_at',
+            ],
+            batch_size=500
+        )
+        return len(proposals), unchanged, skipped, failed
+
+    @staticmethod
+    def is_current(proposal: ProposalUtility, rate: Dict) -> bool:
+        """Whether a proposal's stored results came from this tariff content and engine"""
+        return proposal.tariff_hash == rate['content_hash'] and proposal.engine_version == PRICING_ENGINE_VERSION
+
+    def territory_key(self, project: Project) -> str:
+        return self.rate_provider.resolve_territory(project.address).key
+
+    def _territory_rates(self, territory: str, address: str) -> Optional[Dict[str, Dict]]:
+        """Processed rates of a territory keyed by label, fetched once per run"""
+        if territory in self._territories:
+            self._territories.move_to_end(territory)
+            return self._territories[territory]
+
+        try:
+            raw_rates = self.rate_provider.get_utility_rates(address)
+            rates = {rate['label']: rate for rate in self.rate_processor.process_rate_data(raw_rates)}
+        except Exception as e:
+            logger.error(f"Error fetching rates for territory {territory}: {str(e)}")
+            rates = None
+
+        self._territories[territory] = rates
+        while len(self._territories) > self.MAX_TERRITORIES:
+            self._territories.popitem(last=False)
+        return rates
+
+    def _make_executor(self) -> Optional[Executor]:
+        if self.workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def _load_checkpoint(self) -> Dict:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, stats: Dict):
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,275 @@
+import json
+import logging
+import platform
+import random
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .exact_billing import BILLING_MODE_EXACT, BILLING_MODE_FAST
+from .rate_calculator import RateCalculator
+from .rate_processor import ProcessedRateCache, RateProcessor
+
+logger = logging.getLogger(__name__)
+
+# name -> (tariffs per OpenEI response, projects priced against them)
+SCENARIOS: 'OrderedDict[str, Tuple[int, int]]' = OrderedDict([
+    ('1', (1, 1)),
+    ('50', (50, 1)),
+    ('10k', (100, 100)),
+])
+
+# Synthetic OpenEI-shaped fixture and the throughput baseline measured against it
+BENCHMARK_DIR = Path(__file__).resolve().parent.parent / 'benchmarks'
+DEFAULT_FIXTURE = BENCHMARK_DIR / 'synthetic_tariffs.json'
+DEFAULT_BASELINE = BENCHMARK_DIR / 'baseline.json'
+
+# Per-pair scalar benchmarks are skipped above this many tariff x project pairs
+MAX_SCALAR_PAIRS = 1000
+# Most calculate_rates requests timed per scenario
+MAX_VIEW_REQUESTS = 10
+# Fast benchmarks are looped until one timed sample takes at least this long
+MIN_SAMPLE_SECONDS = 0.05
+
+
+def synthetic_openei_payload(tariff_count: int, seed: int = 0) -> Dict:
+    """
+    Deterministic OpenEI-shaped response with TOU periods, tiers, fixed
+    and (for every third tariff) demand charges
+    """
+    rng = random.Random(seed)
+    items = []
+    for n in range(tariff_count):
+        period_count = rng.randint(1, 4)
+        structure = []
+        for _ in range(period_count):
+            limit = 0.0
+            tiers = []
+            for tier in range(rng.randint(1, 3)):
+                limit += rng.uniform(100, 500)
+                entry = {'rate': round(rng.uniform(0.05, 0.5), 5)}
+                if tier:
+                    tiers[-1]['max'] = round(limit, 1)
+                tiers.append(entry)
+            structure.append(tiers)
+
+        item = {
+            'label': f'bench{seed}-{n}',
+            'name': f'Benchmark Rate {n}',
+            'utility': 'Benchmark Utility',
+            'eiaid': 99999,
+            'sector': 'Residential',
+            'startdate': 1672531200 + n,
+            'is_default': n == 0,
+            'approved': True,
+            'energyratestructure': structure,
+            'energyweekdayschedule': [[rng.randrange(period_count) for _ in range(24)] for _ in range(12)],
+            'energyweekendschedule': [[rng.randrange(period_count) for _ in range(24)] for _ in range(12)],
+            'fixedchargefirstmeter': round(rng.uniform(5, 15), 2),
+            'fixedchargeunits': '$/month',
+        }
+        if n % 3 == 2:
+            item.update({
+                'demandratestructure': [[{'rate': round(rng.uniform(2, 20), 2)}] for _ in range(2)],
+                'demandweekdayschedule': [[rng.randrange(2) for _ in range(24)] for _ in range(12)],
+                'demandweekendschedule': [[0] * 24 for _ in range(12)],
+                'flatdemandstructure': [[{'rate': round(rng.uniform(1, 5), 2)}]],
+                'flatdemandmonths': [0] * 12,
+            })
+        items.append(item)
+    return {'items': items}
+
+
+class FixtureRateProvider:
+    """Stands in for RateProvider, serving one recorded or synthetic response"""
+
+    def __init__(self, payload: Dict):
+        self.payload = payload
+
+    def get_utility_rates(self, address: str) -> Dict:
+        return self.payload
+
+    async def aget_utility_rates(self, address: str) -> Dict:
+        return self.payload
+
+
+class PricingBenchmark:
+    """
+    Throughput benchmarks for the pricing hot path.
+
+    Each scenario prices a fixed set of generated (or fixture) tariffs for
+    a fixed set of projects. Every benchmark is run once to warm up, then
+    timed ``repeats`` times, looping calls that are faster than
+    MIN_SAMPLE_SECONDS; the fastest sample, which is the least disturbed
+    by other load on the machine, is reported as operations per second so
+    results can be compared against a stored baseline.
+    """
+
+    def __init__(self,
+                 tier_mode: str,
+                 repeats: int = 5,
+                 fixture: Optional[Dict] = None,
+                 fixture_name: str = 'fixture',
+                 seed: int = 0,
+                 progress: Optional[Callable[[str], None]] = None):
+        self.tier_mode = tier_mode
+        self.repeats = repeats
+        self.fixture = fixture
+        self.fixture_name = fixture_name
+        self.seed = seed
+        self.progress = progress or logger.info
+
+    def payload(self, tariff_count: int) -> Dict:
+        if self.fixture is None:
+            return synthetic_openei_payload(tariff_count, self.seed)
+        items = self.fixture.get('items', [])
+        if not items:
+            raise ValueError("Fixture has no items")
+        # Repeat fixture items to reach the scenario size, with unique labels
+        repeated = []
+        for n in range(tariff_count):
+            item = dict(items[n % len(items)])
+            item['label'] = f"{item.get('label', 'fixture')}-{n}"
+            repeated.append(item)
+        return {'items': repeated}
+
+    def run(self, scenarios: Optional[List[str]] = None, view: Optional[Callable] = None) -> Dict:
+        """
+        Run every benchmark of the selected scenarios
+
+        Args:
+            scenarios: Scenario names from SCENARIOS; all by default
+            view: Optional callable(payload, requests) that makes that
+                many full calculate_rates requests against the payload
+
+        Returns:
+            Dict: Environment details and one result per (scenario, benchmark)
+        """
+        results = []
+        for name in scenarios or list(SCENARIOS):
+            tariff_count, project_count = SCENARIOS[name]
+            payload = self.payload(tariff_count)
+            rng = np.random.default_rng(self.seed)
+            consumptions = rng.integers(1000, 10001, project_count).astype(float).tolist()
+            escalators = rng.uniform(4.0, 10.0, project_count).round(2).tolist()
+
+            for benchmark, ops, func in self._benchmarks(payload, consumptions, escalators, view):
+                seconds = self._time(func)
+                result = {
+                    'scenario': name,
+                    'benchmark': benchmark,
+                    'ops': ops,
+                    'seconds': round(seconds, 6),
+                    'ops_per_second': round(ops / seconds, 2) if seconds > 0 else float('inf'),
+                }
+                self.progress(
+                    f"{name:>4} {benchmark:<26} {result['ops_per_second']:>14,.1f} ops/s "
+                    f"({seconds * 1e3:.2f} ms for {ops})"
+                )
+                results.append(result)
+
+        return {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'tier_mode': self.tier_mode,
+            'repeats': self.repeats,
+            'fixture': 'synthetic' if self.fixture is None else self.fixture_name,
+            'results': results,
+        }
+
+    def _benchmarks(self, payload: Dict, consumptions: List[float], escalators: List[float], view):
+        calculator = RateCalculator(tier_mode=self.tier_mode)
+        rates = RateProcessor(cache=ProcessedRateCache()).process_rate_data(payload)
+        tariffs = [rate['compiled'] for rate in rates]
+        pairs = len(tariffs) * len(consumptions)
+        warm_processor = RateProcessor(cache=ProcessedRateCache())
+
+        def process_cold():
+            RateProcessor(cache=ProcessedRateCache()).process_rate_data(payload)
+
+        def daily_cost():
+            for tariff in tariffs:
+                for consumption in consumptions:
+                    calculator.calculate_daily_cost(tariff, None, consumption / 365)
+
+        def yearly_cost(billing_mode):
+            def run():
+                for tariff in tariffs:
+                    for consumption, escalator in zip(consumptions, escalators):
+                        calculator.calculate_yearly_cost(tariff, consumption, escalator, billing_mode=billing_mode)
+            return run
+
+        def yearly_costs_batch():
+            for tariff in tariffs:
+                calculator.calculate_yearly_costs(tariff, consumptions, escalators)
+
+        yield 'process_rate_data_cold', len(payload['items']), process_cold
+        yield 'process_rate_data_warm', len(payload['items']), lambda: warm_processor.process_rate_data(payload)
+        yield 'daily_cost', pairs, daily_cost
+        if pairs <= MAX_SCALAR_PAIRS:
+            yield 'yearly_cost', pairs, yearly_cost(BILLING_MODE_FAST)
+            yield 'yearly_cost_exact', pairs, yearly_cost(BILLING_MODE_EXACT)
+        yield 'yearly_costs_batch', pairs, yearly_costs_batch
+        if view is not None:
+            requests = min(len(consumptions), MAX_VIEW_REQUESTS)
+            yield 'calculate_rates_view', requests * len(tariffs), lambda: view(payload, requests)
+
+    def _time(self, func: Callable) -> float:
+        """Fastest seconds per call, looping fast functions so timer noise does not dominate"""
+        started = time.perf_counter()
+        func()
+        loops = max(1, int(MIN_SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-9)))
+        timings = []
+        for _ in range(self.repeats):
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            timings.append((time.perf_counter() - started) / loops)
+        return min(timings)
+
+
+def find_regressions(report: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Benchmarks whose throughput fell more than ``max_regression`` (a
+    fraction, e.g. 0.2) below the baseline
+    """
+    previous = {
+        (result['scenario'], result['benchmark']): result['ops_per_second']
+        for result in baseline.get('results', [])
+    }
+    regressions = []
+    for result in report['results']:
+        before = previous.get((result['scenario'], result['benchmark']))
+        if not before:
+            continue
+        if result['ops_per_second'] < before * (1 - max_regression):
+            regressions.append(
+                f"{result['scenario']}/{result['benchmark']}: {result['ops_per_second']:,.1f} ops/s "
+                f"vs baseline {before:,.1f} ({result['ops_per_second'] / before - 1:+.0%})"
+            )
+    return regressions
+
+
+def baseline_mismatch(report: Dict, baseline: Dict) -> Optional[str]:
+    """Why a baseline cannot be compared against a report, or None if it can"""
+    for key in ('fixture', 'tier_mode'):
+        if report.get(key) != baseline.get(key):
+            return f"baseline was measured with {key} {baseline.get(key)!r}, this run used {report.get(key)!r}"
+    return None
+
+
+def environment_differences(report: Dict, baseline: Dict) -> List[str]:
+    """Interpreter and numpy versions that differ between a report and its baseline"""
+    return [
+        f"{key} {baseline.get(key)} in the baseline, {report.get(key)} here"
+        for key in ('python', 'numpy')
+        if report.get(key) != baseline.get(key)
+    ]
+
+
+def load_report(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,121 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON_YEARS = 20
+
+
+class ProjectionEngine:
+    """
+    Escalated multi-year cost projections computed with array math.
+
+    Escalators are annual percentages. A constant escalator per base cost
+    is a 1-D array; a per-year curve is a 2-D array of shape
+    (costs or 1, horizon - 1) holding the increase applied going into
+    each following year. Series are built with a cumulative product, so
+    they match the year-by-year loop in RateCalculator exactly. Totals for
+    constant escalators use the geometric series closed form, so
+    sensitivity grids never materialize their yearly series unless asked.
+    """
+
+    def __init__(self, horizon: int = DEFAULT_HORIZON_YEARS, discount_rate: float = 0.0):
+        if horizon < 1:
+            raise ValueError(f"Projection horizon must be at least one year, got {horizon}")
+        self.horizon = horizon
+        self.discount_rate = discount_rate
+
+    def project(self, base_costs, escalators, horizon: Optional[int] = None) -> np.ndarray:
+        """
+        Escalated yearly cost series
+
+        Args:
+            base_costs: First-year costs, scalar or shape (costs,)
+            escalators: Annual percentage increases, constant (scalar or
+                shape (costs,)) or per-year curves (shape (costs or 1, horizon - 1))
+            horizon: Number of years; defaults to the engine horizon
+
+        Returns:
+            np.ndarray: Unrounded costs, shape (costs, horizon)
+        """
+        horizon = horizon or self.horizon
+        base = np.atleast_1d(np.asarray(base_costs, dtype=np.float64))
+        factors = self._growth_factors(escalators, base.size, horizon)
+
+        steps = np.empty((base.size, horizon), dtype=np.float64)
+        steps[:, 0] = base
+        steps[:, 1:] = factors
+        return np.cumprod(steps, axis=1)
+
+    def sensitivity(self, base_costs, escalators, horizon: Optional[int] = None) -> np.ndarray:
+        """
+        Yearly series for every (base cost, constant escalator) pair
+
+        Returns:
+            np.ndarray: Unrounded costs, shape (costs, escalators, horizon)
+        """
+        horizon = horizon or self.horizon
+        base = np.atleast_1d(np.asarray(base_costs, dtype=np.float64))
+        grid = np.atleast_1d(np.asarray(escalators, dtype=np.float64))
+        series = self.project(np.repeat(base, grid.size), np.tile(grid, base.size), horizon)
+        return series.reshape(base.size, grid.size, horizon)
+
+    def totals(self,
+               base_costs,
+               escalators,
+               horizon: Optional[int] = None,
+               discount_rate: Optional[float] = None):
+        """
+        Cumulative and net present cost over the horizon
+
+        Year k (1-based) is discounted by (1 + discount_rate)^k. Constant
+        escalators are summed in closed form; curves from their series.
+        Inputs broadcast together, so a (costs, 1) base against an
+        (escalators,) grid gives (costs, escalators) totals.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Cumulative and NPV totals
+        """
+        horizon = horizon or self.horizon
+        discount = 1 + (self.discount_rate if discount_rate is None else discount_rate) / 100
+        base = np.asarray(base_costs, dtype=np.float64)
+        escalators = np.asarray(escalators, dtype=np.float64)
+
+        if escalators.ndim == 2:
+            series = self.project(base, escalators, horizon)
+            weights = discount ** -np.arange(1, horizon + 1, dtype=np.float64)
+            return series.sum(axis=-1), series @ weights
+
+        growth = 1 + escalators / 100
+        cumulative = base * self._geometric_sum(growth, horizon)
+        npv = base / discount * self._geometric_sum(growth / discount, horizon)
+        return cumulative, npv
+
+    @staticmethod
+    def to_lists(series: np.ndarray, decimals: int = 2) -> List:
+        """Round like the scalar projection loop (Python round per value)"""
+        if series.ndim == 1:
+            return [round(value, decimals) for value in series.tolist()]
+        return [ProjectionEngine.to_lists(row, decimals) for row in series]
+
+    @staticmethod
+    def _geometric_sum(ratio: np.ndarray, horizon: int) -> np.ndarray:
+        """1 + r + ... + r^(horizon - 1), falling back to the horizon when r == 1"""
+        ratio = np.asarray(ratio, dtype=np.float64)
+        near_one = np.isclose(ratio, 1.0, rtol=0.0, atol=1e-12)
+        safe = np.where(near_one, 2.0, ratio)
+        return np.where(near_one, float(horizon), (1 - safe ** horizon) / (1 - safe))
+
+    @staticmethod
+    def _growth_factors(escalators, count: int, horizon: int) -> np.ndarray:
+        escalators = np.asarray(escalators, dtype=np.float64)
+        if escalators.ndim == 2:
+            if escalators.shape[-1] != horizon - 1:
+                raise ValueError(
+                    f"Escalator curves need {horizon - 1} yearly values, got {escalators.shape[-1]}"
+                )
+            return np.broadcast_to(1 + escalators / 100, (count, horizon - 1))
+        factors = np.broadcast_to(1 + escalators.reshape(-1) / 100, (count,))
+        return np.broadcast_to(factors[:, None], (count, horizon - 1))
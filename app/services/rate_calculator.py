@@ -1,6 +1,16 @@
 import logging
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .compiled_tariff import CompiledTariff, annualize_fixed_charge
+from .demand_charges import DemandChargeEngine
+from .exact_billing import BILLING_MODE_EXACT, BILLING_MODE_FAST, BILLING_MODES, ExactBillingEngine
+from .interval_data import DAYS_PER_YEAR, IntervalData
+from .load_profiles import DEFAULT_LOAD_CURVE
+from .projection import DEFAULT_HORIZON_YEARS, ProjectionEngine
+from .rate_engine import TIER_MODE_HOURLY, TIER_MODES, RateEngine
 
 logger = logging.getLogger(__name__)
 
@@ -10,36 +20,52 @@ class RateCalculator:
     to calculate more accurate electricity costs
     """
 
-    def __init__(self):
-        # Standard load curve (percentage of daily usage per hour)
-        self.load_curve = [
-            3.5, 2.8, 2.5, 2.3, 2.2, 2.3,  # 12am - 5am
-            2.8, 3.8, 4.5, 4.8, 4.7, 4.6,  # 6am - 11am
-            4.5, 4.4, 4.3, 4.2, 4.3, 4.6,  # 12pm - 5pm
-            5.0, 5.2, 5.0, 4.7, 4.3, 3.9   # 6pm - 11pm
-        ]
-        # Validate load curve sums to approximately 100%
-        total = sum(self.load_curve)
-        if not 99.5 <= total <= 100.5:
-            logger.warning(f"Load curve percentages sum to {total}, not 100")
-            # Normalize to ensure exactly 100%
-            self.load_curve = [x * (100/total) for x in self.load_curve]
+    def __init__(self, tier_mode: str = TIER_MODE_HOURLY):
+        """
+        Args:
+            tier_mode: How annual pricing applies tier limits; TIER_MODE_HOURLY
+                compares each hour's kWh, TIER_MODE_MONTHLY accumulates kWh
+                across each billing month
+        """
+        if tier_mode not in TIER_MODES:
+            raise ValueError(f"Unknown tier mode: {tier_mode}")
+        self.tier_mode = tier_mode
+
+        # Standard load curve (percentage of daily usage per hour),
+        # normalized once when load_profiles is imported
+        self.load_curve = DEFAULT_LOAD_CURVE
+
+        self.engine = RateEngine(self.load_curve)
+        self.demand_engine = DemandChargeEngine()
+        self.exact_engine = ExactBillingEngine(self.demand_engine)
+        self.projection = ProjectionEngine()
 
     def calculate_daily_cost(self,
-                           rate_structure: List[List[Dict]],
-                           weekday_schedule: List[List[int]],
+                           rate_structure: Union[List[List[Dict]], CompiledTariff],
+                           weekday_schedule: Optional[List[List[int]]],
                            daily_consumption_kwh: float) -> float:
         """
         Calculate daily electricity cost based on TOU rates and load curve
 
         Args:
-            rate_structure: List of rate periods, each containing tiers with rates
+            rate_structure: List of rate periods, each containing tiers with rates,
+                or a CompiledTariff (weekday_schedule is then ignored)
             weekday_schedule: Hour-by-hour schedule of which rate period applies
             daily_consumption_kwh: Total daily consumption in kWh
 
         Returns:
             float: Total daily cost in dollars
         """
+        if isinstance(rate_structure, CompiledTariff):
+            if not rate_structure.valid:
+                return 0.0
+            # Binary search of the compiled tier index for each hour
+            return sum(
+                (percentage/100) * daily_consumption_kwh
+                * rate_structure.rate_at(period, (percentage/100) * daily_consumption_kwh)
+                for percentage, period in zip(self.load_curve, rate_structure.hour_periods.tolist())
+            )
+
         try:
             hourly_consumption = [
                 (percentage/100) * daily_consumption_kwh
@@ -68,6 +94,26 @@ class RateCalculator:
             logger.error(f"Error calculating daily cost: {str(e)}")
             return 0.0
 
+    def calculate_daily_costs(self,
+                              rate_infos: Sequence[Union[Dict, CompiledTariff]],
+                              daily_consumptions_kwh: Sequence[float]) -> np.ndarray:
+        """
+        Vectorized batch version of calculate_daily_cost
+
+        Compiles each tariff once and prices all consumptions against all
+        tariffs in a single pass. calculate_daily_cost remains the scalar
+        reference implementation and produces the same numbers.
+
+        Args:
+            rate_infos: Compiled tariffs or rate dictionaries to compile
+            daily_consumptions_kwh: Total daily consumption values in kWh
+
+        Returns:
+            np.ndarray: Daily costs in dollars, shape (consumptions, tariffs)
+        """
+        tariffs = [self.compile(rate_info) for rate_info in rate_infos]
+        return self.engine.price_daily(tariffs, daily_consumptions_kwh)
+
     def _get_applicable_rate(self,
                            period_rates: List[Dict],
                            consumption: float) -> float:
@@ -96,14 +142,15 @@ class RateCalculator:
             return 0.0
 
     def calculate_average_rate(self,
-                             rate_structure: List[List[Dict]],
-                             weekday_schedule: List[List[int]],
+                             rate_structure: Union[List[List[Dict]], CompiledTariff],
+                             weekday_schedule: Optional[List[List[int]]],
                              daily_consumption_kwh: float) -> float:
         """
         Calculate effective average rate per kWh based on load curve and TOU rates
 
         Args:
-            rate_structure: List of rate periods, each containing tiers with rates
+            rate_structure: List of rate periods, each containing tiers with rates,
+                or a CompiledTariff (weekday_schedule is then ignored)
             weekday_schedule: Hour-by-hour schedule of which rate period applies
             daily_consumption_kwh: Total daily consumption in kWh
 
@@ -125,56 +172,263 @@ class RateCalculator:
             return 0.0
 
     def calculate_yearly_cost(self,
-                            rate_info: Dict,
+                            rate_info: Union[Dict, CompiledTariff],
                             yearly_consumption: float,
-                            escalator: float = 2.0) -> List[float]:
+                            escalator: Union[float, Sequence[float]] = 2.0,
+                            load_profile: Optional[np.ndarray] = None,
+                            horizon: int = DEFAULT_HORIZON_YEARS,
+                            billing_mode: str = BILLING_MODE_FAST) -> List[Union[float, Decimal]]:
         """
         Calculate projected yearly costs including fixed charges and escalation
 
         Args:
-            rate_info: Dictionary containing rate structure and schedule
+            rate_info: Compiled tariff, or rate dictionary holding one under
+                'compiled' (raw OpenEI fields are compiled on the fly)
             yearly_consumption: Total yearly consumption in kWh
-            escalator: Annual percentage increase in rates
+            escalator: Annual percentage increase in rates, or a per-year
+                curve of horizon - 1 increases
+            load_profile: 8760-hour share of annual consumption, e.g. from
+                LoadProfileRegistry; defaults to the standard daily load curve
+            horizon: Number of years to project
+            billing_mode: BILLING_MODE_FAST for float costs, or
+                BILLING_MODE_EXACT for Decimal bills rounded to the cent
 
         Returns:
-            List[float]: Projected costs for next 20 years
+            List: Projected costs for each year of the horizon
         """
         try:
-            daily_consumption = yearly_consumption / 365
+            yearly_base_cost = self.calculate_base_cost(rate_info, yearly_consumption, load_profile, billing_mode)
+            if billing_mode == BILLING_MODE_EXACT:
+                return self.exact_engine.project(yearly_base_cost, escalator, horizon)
 
-            # Calculate base daily cost using TOU rates
-            daily_cost = self.calculate_daily_cost(
-                rate_info['energyratestructure'],
-                rate_info['energyweekdayschedule'],
-                daily_consumption
-            )
+            # Project costs with escalator
+            escalators = np.asarray(escalator, dtype=np.float64)
+            if escalators.ndim == 1:
+                escalators = escalators[None, :]
+            series = self.projection.project(yearly_base_cost, escalators, horizon)
+            return self.projection.to_lists(series[0])
 
-            # Add fixed charges
-            fixed_charge = self._calculate_annual_fixed_charge(
-                float(rate_info['fixedchargefirstmeter']),
-                rate_info['fixedchargeunits']
-            )
+        except Exception as e:
+            logger.error(f"Error calculating yearly costs: {str(e)}")
+            return [0] * horizon
 
-            yearly_base_cost = (daily_cost * 365) + fixed_charge
+    def calculate_base_cost(self,
+                            rate_info: Union[Dict, CompiledTariff],
+                            yearly_consumption: float,
+                            load_profile: Optional[np.ndarray] = None,
+                            billing_mode: str = BILLING_MODE_FAST) -> Union[float, Decimal]:
+        """
+        First-year cost: 8760-hour energy cost plus demand and annualized
+        fixed charges
 
-            # Project costs with escalator
-            yearly_costs = []
-            current_cost = yearly_base_cost
+        Args:
+            rate_info: Compiled tariff or rate dictionary
+            yearly_consumption: Total yearly consumption in kWh
+            load_profile: 8760-hour share of annual consumption
+            billing_mode: BILLING_MODE_FAST for the float64 array path, or
+                BILLING_MODE_EXACT for monthly Decimal bill lines rounded
+                to the cent (within ExactBillingEngine.tolerance of fast)
 
-            for _ in range(20):
-                yearly_costs.append(round(current_cost, 2))
-                current_cost *= (1 + (escalator / 100))
+        Returns:
+            Union[float, Decimal]: Unrounded float, or exact Decimal,
+            first-year cost in dollars
+        """
+        if billing_mode not in BILLING_MODES:
+            raise ValueError(f"Unknown billing mode: {billing_mode}")
+        tariff = self.compile(rate_info)
+
+        if load_profile is None:
+            hourly_load = self.engine.annual_load(yearly_consumption)
+        else:
+            hourly_load = yearly_consumption * np.asarray(load_profile, dtype=np.float64)
+
+        if billing_mode == BILLING_MODE_EXACT:
+            return self.exact_engine.price_annual(tariff, hourly_load, self.tier_mode)
+
+        # Simulate all 8760 hours against the weekday/weekend schedules
+        energy_cost = self.calculate_annual_energy_cost(tariff, hourly_load)
+        demand_cost = self.calculate_annual_demand_cost(tariff, hourly_load)
+
+        return energy_cost + demand_cost + tariff.annual_fixed_charge
+
+    def calculate_yearly_costs(self,
+                               rate_info: Union[Dict, CompiledTariff],
+                               yearly_consumptions: Sequence[float],
+                               escalators: Sequence[float],
+                               load_profile: Optional[np.ndarray] = None,
+                               horizon: int = DEFAULT_HORIZON_YEARS) -> List[List[float]]:
+        """
+        Batch version of calculate_yearly_cost for many projects on one tariff
 
-            return yearly_costs
+        Returns the same numbers as calling calculate_yearly_cost once per
+        (consumption, escalator) pair, pricing all annual loads together.
 
-        except Exception as e:
-            logger.error(f"Error calculating yearly costs: {str(e)}")
-            return [0] * 20
+        Args:
+            rate_info: Compiled tariff or rate dictionary
+            yearly_consumptions: Total yearly consumption in kWh per project
+            escalators: Annual percentage increase in rates per project, or
+                per-year curves of shape (projects, horizon - 1)
+            load_profile: 8760-hour share of annual consumption shared by all projects
+            horizon: Number of years to project
+
+        Returns:
+            List[List[float]]: Projected costs for each year of the horizon per project
+        """
+        base_costs = self.calculate_base_costs(rate_info, yearly_consumptions, load_profile)
+        series = self.projection.project(base_costs, escalators, horizon)
+        return self.projection.to_lists(series)
+
+    def calculate_base_cost_bounds(self,
+                                   rate_infos: Sequence[Union[Dict, CompiledTariff]],
+                                   yearly_consumption: float,
+                                   load_profile: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cheap lower bound on calculate_base_cost for each rate
+
+        Every period's kWh is billed at that period's cheapest tier, which
+        no tier mode can undercut, plus the annualized fixed charge. Demand
+        charges only add to this unless a tariff has negative demand rates,
+        whose bound is then -inf.
+
+        Args:
+            rate_infos: Compiled tariffs or rate dictionaries
+            yearly_consumption: Total yearly consumption in kWh
+            load_profile: 8760-hour share of annual consumption
+
+        Returns:
+            np.ndarray: Lower bounds in dollars, one per rate
+        """
+        tariffs = [self.compile(rate_info) for rate_info in rate_infos]
+        if load_profile is None:
+            hourly_load = self.engine.annual_load(yearly_consumption)
+        else:
+            hourly_load = yearly_consumption * np.asarray(load_profile, dtype=np.float64)
+
+        bounds = self.engine.energy_lower_bounds(tariffs, hourly_load)
+        bounds += np.array([tariff.annual_fixed_charge for tariff in tariffs], dtype=np.float64)
+        bounds[[tariff.demand is not None and not tariff.demand.nonnegative for tariff in tariffs]] = -np.inf
+        # Shave float rounding so a bound never exceeds the simulated cost it bounds
+        return bounds - 1e-9 * np.abs(bounds)
+
+    def calculate_base_costs(self,
+                             rate_info: Union[Dict, CompiledTariff],
+                             yearly_consumptions: Sequence[float],
+                             load_profile: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Batch version of calculate_base_cost, pricing all annual loads together
+
+        Returns:
+            np.ndarray: Unrounded first-year costs in dollars per consumption
+        """
+        tariff = self.compile(rate_info)
+        consumptions = np.asarray(yearly_consumptions, dtype=np.float64).reshape(-1)
+        if load_profile is None:
+            shape = self.engine.annual_load_shape
+        else:
+            shape = np.asarray(load_profile, dtype=np.float64)
+
+        base_costs = np.empty(consumptions.size, dtype=np.float64)
+        batch = 256
+        for start in range(0, consumptions.size, batch):
+            loads = consumptions[start:start + batch, None] * shape[None, :]
+            energy = self.engine.price_annual([tariff], loads, self.tier_mode)[:, 0]
+            demand = self.demand_engine.price_annual(tariff.demand, loads)
+            base_costs[start:start + batch] = energy + demand + tariff.annual_fixed_charge
+        return base_costs
+
+    def calculate_annual_energy_cost(self,
+                                     rate_info: Union[Dict, CompiledTariff],
+                                     hourly_load_kwh) -> float:
+        """
+        Calculate a year's energy cost from 8760 hourly consumption values
+
+        Args:
+            rate_info: Compiled tariff or rate dictionary
+            hourly_load_kwh: Consumption in kWh for each hour of the year
+
+        Returns:
+            float: Annual energy cost in dollars, excluding fixed charges
+        """
+        tariff = self.compile(rate_info)
+        return float(self.engine.price_annual([tariff], hourly_load_kwh, self.tier_mode)[0, 0])
+
+    def calculate_annual_demand_cost(self,
+                                     rate_info: Union[Dict, CompiledTariff],
+                                     load_kwh) -> float:
+        """
+        Calculate a year's demand charges from hourly or 15-minute consumption
+
+        Args:
+            rate_info: Compiled tariff or rate dictionary
+            load_kwh: Consumption in kWh for each interval of the year
+                (8760 hourly or 35040 15-minute values)
+
+        Returns:
+            float: Annual TOU and flat demand charges in dollars
+        """
+        tariff = self.compile(rate_info)
+        if tariff.demand is None:
+            return 0.0
+        return float(self.demand_engine.price_annual(tariff.demand, load_kwh)[0])
+
+    def calculate_interval_cost(self,
+                                rate_info: Union[Dict, CompiledTariff],
+                                data: IntervalData) -> Dict[str, float]:
+        """
+        Price metered interval data directly
+
+        Energy is billed per clock hour at the period of its actual weekday
+        or weekend, month and hour, with calendar months as billing periods.
+        Demand charges use the original interval resolution. Fixed charges
+        are prorated to the days covered.
+
+        Args:
+            rate_info: Compiled tariff or rate dictionary
+            data: Interval consumption series
+
+        Returns:
+            Dict[str, float]: Energy, demand, fixed and total cost in dollars
+            for the covered span, plus the total scaled to one year
+        """
+        tariff = self.compile(rate_info)
+
+        energy_cost = 0.0
+        if tariff.annual_valid and data.values.size:
+            hourly = data.hourly()
+            months, is_weekend, hour_of_day, billing_periods = hourly.calendar()
+            periods = tariff.schedule[is_weekend, months, hour_of_day]
+            energy_cost = float(self.engine.price_intervals(
+                tariff, periods, billing_periods, hourly.values[None, :].astype(np.float64), self.tier_mode
+            )[0])
+
+        demand_cost = 0.0
+        if tariff.demand is not None and data.values.size:
+            months, is_weekend, hour_of_day, billing_periods = data.calendar()
+            demand_cost = float(self.demand_engine.price_intervals(
+                tariff.demand, data.values[None, :], data.interval_hours,
+                months, is_weekend, hour_of_day, billing_periods
+            )[0])
+
+        fixed_cost = tariff.annual_fixed_charge * data.days / DAYS_PER_YEAR
+        total = energy_cost + demand_cost + fixed_cost
+        return {
+            'energy_cost': energy_cost,
+            'demand_cost': demand_cost,
+            'fixed_cost': fixed_cost,
+            'total_cost': total,
+            'annualized_cost': total * DAYS_PER_YEAR / data.days if data.days else 0.0,
+        }
+
+    @staticmethod
+    def compile(rate_info: Union[Dict, CompiledTariff]) -> CompiledTariff:
+        """Return the CompiledTariff for a rate, compiling raw OpenEI fields if needed"""
+        if isinstance(rate_info, CompiledTariff):
+            return rate_info
+        compiled = rate_info.get('compiled')
+        if isinstance(compiled, CompiledTariff):
+            return compiled
+        return CompiledTariff.from_rate_data(rate_info)
 
     def _calculate_annual_fixed_charge(self, charge: float, units: str) -> float:
         """Convert fixed charges to annual amount based on units"""
-        if units == '$/month':
-            return charge * 12
-        elif units == '$/day':
-            return charge * 365
-        return charge
+        return annualize_fixed_charge(charge, units)
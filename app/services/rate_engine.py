@@ -0,0 +1,233 @@
+import logging
+from typing import Sequence
+
+import numpy as np
+
+from .compiled_tariff import HOURS_PER_YEAR, CompiledTariff, interval_calendar
+
+logger = logging.getLogger(__name__)
+
+# Tier limits compared against each hour's kWh on its own
+TIER_MODE_HOURLY = 'hourly'
+# Tier limits treated as monthly cumulative kWh, as OpenEI defines them
+TIER_MODE_MONTHLY = 'monthly'
+TIER_MODES = (TIER_MODE_HOURLY, TIER_MODE_MONTHLY)
+
+
+class RateEngine:
+    """
+    Vectorized counterpart of RateCalculator.calculate_daily_cost.
+
+    Tariffs are priced from their CompiledTariff rate/limit arrays, so a
+    whole batch of consumptions x tariffs is priced with array operations
+    instead of per-hour Python loops.
+    """
+
+    # Upper bound on elements in the (consumptions, tariffs, hours, tiers)
+    # working set before the batch is split into consumption chunks
+    MAX_BATCH_ELEMENTS = 4_000_000
+
+    def __init__(self, load_curve: Sequence[float]):
+        self.load_fractions = np.asarray(load_curve, dtype=np.float64) / 100
+        # Share of annual consumption in each of the 8760 hours
+        self.annual_load_shape = np.tile(self.load_fractions, HOURS_PER_YEAR // 24) / (HOURS_PER_YEAR // 24)
+
+    def annual_load(self, yearly_consumption_kwh: float) -> np.ndarray:
+        """Spread a yearly consumption over 8760 hours using the daily load curve"""
+        return yearly_consumption_kwh * self.annual_load_shape
+
+    def price_daily(self,
+                    tariffs: Sequence[CompiledTariff],
+                    daily_consumptions_kwh: Sequence[float]) -> np.ndarray:
+        """
+        Price every daily consumption against every compiled tariff
+
+        Args:
+            tariffs: Compiled tariffs to price
+            daily_consumptions_kwh: Total daily consumption values in kWh
+
+        Returns:
+            np.ndarray: Daily cost in dollars, shape (consumptions, tariffs)
+        """
+        consumptions = np.asarray(daily_consumptions_kwh, dtype=np.float64).reshape(-1)
+        if not tariffs or consumptions.size == 0:
+            return np.zeros((consumptions.size, len(tariffs)))
+
+        rates, bounds, valid = self._stack_hourly(tariffs)
+        costs = np.empty((consumptions.size, len(tariffs)), dtype=np.float64)
+
+        per_consumption = max(rates.size, 1)
+        chunk = max(1, self.MAX_BATCH_ELEMENTS // per_consumption)
+        for start in range(0, consumptions.size, chunk):
+            daily = consumptions[start:start + chunk]
+            # (chunk, 1, 24, 1) hourly kWh against (tariffs, 24, tiers) bounds
+            hourly = daily[:, None, None] * self.load_fractions[None, None, :]
+            tier_index = np.argmax(hourly[..., None] <= bounds[None], axis=-1)
+            hourly_rates = np.take_along_axis(
+                np.broadcast_to(rates[None], (daily.size,) + rates.shape),
+                tier_index[..., None],
+                axis=-1
+            )[..., 0]
+            costs[start:start + chunk] = np.sum(hourly * hourly_rates, axis=-1)
+
+        costs[:, ~valid] = 0.0
+        return costs
+
+    def price_annual(self,
+                     tariffs: Sequence[CompiledTariff],
+                     hourly_loads_kwh,
+                     tier_mode: str = TIER_MODE_HOURLY) -> np.ndarray:
+        """
+        Price full years of hourly load against every compiled tariff
+
+        Each tariff's weekday/weekend month x hour schedule is already
+        expanded into ``year_periods``, so a whole year is priced in one
+        vectorized pass per tariff.
+
+        Args:
+            tariffs: Compiled tariffs to price
+            hourly_loads_kwh: 8760 hourly kWh values, or an array of shape
+                (loads, 8760); sub-hourly years (e.g. 35040 15-minute
+                values) bill each interval at its hour's period
+            tier_mode: TIER_MODE_HOURLY selects tiers per hour as in the daily
+                path; TIER_MODE_MONTHLY accumulates kWh across each billing month
+
+        Returns:
+            np.ndarray: Annual energy cost in dollars, shape (loads, tariffs)
+        """
+        loads = np.atleast_2d(np.asarray(hourly_loads_kwh, dtype=np.float64))
+        steps_per_hour, remainder = divmod(loads.shape[-1], HOURS_PER_YEAR)
+        if remainder or steps_per_hour < 1:
+            raise ValueError(f"Expected a multiple of {HOURS_PER_YEAR} hourly values, got {loads.shape[-1]}")
+        months = interval_calendar(steps_per_hour)[0]
+
+        costs = np.zeros((loads.shape[0], len(tariffs)), dtype=np.float64)
+        for n, tariff in enumerate(tariffs):
+            if tariff.annual_valid:
+                periods = tariff.year_periods
+                if steps_per_hour > 1:
+                    periods = np.repeat(periods, steps_per_hour)
+                costs[:, n] = self.price_intervals(tariff, periods, months, loads, tier_mode)
+        return costs
+
+    def energy_lower_bounds(self, tariffs: Sequence[CompiledTariff], hourly_load_kwh) -> np.ndarray:
+        """
+        Lower bound on price_annual for one load, in either tier mode
+
+        Each period's kWh for the year is priced at the period's cheapest
+        tier rate, costing one weighted bincount per tariff instead of a
+        full tier simulation.
+
+        Returns:
+            np.ndarray: Energy cost lower bounds in dollars, one per tariff
+        """
+        load = np.asarray(hourly_load_kwh, dtype=np.float64)
+        bounds = np.zeros(len(tariffs), dtype=np.float64)
+        for n, tariff in enumerate(tariffs):
+            if tariff.annual_valid:
+                period_kwh = np.bincount(tariff.year_periods, weights=load, minlength=tariff.rates.shape[0])
+                bounds[n] = period_kwh @ tariff.rates.min(axis=1)
+        return bounds
+
+    def price_intervals(self,
+                        tariff: CompiledTariff,
+                        periods: np.ndarray,
+                        months: np.ndarray,
+                        loads: np.ndarray,
+                        tier_mode: str = TIER_MODE_HOURLY) -> np.ndarray:
+        """
+        Energy cost of time-ordered consumption intervals
+
+        Args:
+            tariff: Compiled tariff to price
+            periods: Rate period billed in each interval
+            months: Billing month of each interval; a change of value starts
+                a new billing period
+            loads: kWh per interval, shape (loads, intervals)
+            tier_mode: One of TIER_MODES
+
+        Returns:
+            np.ndarray: Energy cost in dollars for each load row
+        """
+        if tier_mode == TIER_MODE_MONTHLY:
+            return self._price_monthly_tiers(tariff, periods, months, loads)
+        if tier_mode != TIER_MODE_HOURLY:
+            raise ValueError(f"Unknown tier mode: {tier_mode}")
+        return self._price_hourly_tiers(tariff, periods, loads)
+
+    def _price_hourly_tiers(self, tariff: CompiledTariff, periods: np.ndarray, loads: np.ndarray) -> np.ndarray:
+        """Select each interval's tier by binary search of its own kWh in the tier bounds"""
+        totals = np.empty(loads.shape[0], dtype=np.float64)
+
+        chunk = max(1, self.MAX_BATCH_ELEMENTS // max(periods.size * tariff.tier_count, 1))
+        for start in range(0, loads.shape[0], chunk):
+            block = loads[start:start + chunk]
+            tier_index = tariff.tier_indices(periods, block)
+            totals[start:start + chunk] = np.sum(block * tariff.tier_values(tariff.rates, periods, tier_index), axis=-1)
+        return totals
+
+    def _price_monthly_tiers(self,
+                             tariff: CompiledTariff,
+                             periods: np.ndarray,
+                             months: np.ndarray,
+                             loads: np.ndarray) -> np.ndarray:
+        """
+        Split each interval's kWh across tiers using month-to-date consumption
+
+        Month-to-date totals before and after every interval come from a
+        prefix sum reset at each billing-period boundary. With a few tiers
+        the share of an interval inside a tier is the overlap of that range
+        with the tier's [lower, upper) bounds. With many tiers the interval
+        cost is the tier schedule integrated over the range, the difference
+        of CompiledTariff.cumulative_cost at its two ends, so each interval
+        takes two binary searches however many tiers the tariff has.
+        """
+        linear = tariff.tier_count <= tariff.LINEAR_SEARCH_TIERS
+        if linear:
+            rates = tariff.rates[periods]
+            upper = tariff.tier_bounds[periods]
+            lower = tariff.tier_lower[periods]
+
+        positions = np.arange(months.shape[0])
+        boundary = np.ones(months.shape[0], dtype=bool)
+        boundary[1:] = months[1:] != months[:-1]
+        run_start = np.maximum.accumulate(np.where(boundary, positions, 0))
+
+        totals = np.empty(loads.shape[0], dtype=np.float64)
+        chunk = max(1, self.MAX_BATCH_ELEMENTS // max(periods.size * tariff.tier_count, 1))
+        for start in range(0, loads.shape[0], chunk):
+            block = loads[start:start + chunk]
+            running = np.cumsum(block, axis=-1)
+            offset = np.where(run_start > 0, running[:, run_start - 1], 0.0)
+            after = running - offset
+            before = after - block
+
+            if linear:
+                overlap = np.minimum(after[..., None], upper[None]) - np.maximum(before[..., None], lower[None])
+                tier_kwh = np.maximum(overlap, 0.0)
+                totals[start:start + chunk] = np.sum(tier_kwh * rates[None], axis=(-2, -1))
+            else:
+                interval_costs = tariff.cumulative_cost(periods, after) - tariff.cumulative_cost(periods, before)
+                totals[start:start + chunk] = np.sum(interval_costs, axis=-1)
+        return totals
+
+    @staticmethod
+    def _stack_hourly(tariffs: Sequence[CompiledTariff]):
+        """
+        Gather each tariff's per-hour rates and tier_bounds into (tariffs, 24, tiers),
+        the same sorted bounds CompiledTariff.rate_at searches
+        """
+        tier_count = max(tariff.rates.shape[1] for tariff in tariffs)
+        rates = np.empty((len(tariffs), 24, tier_count), dtype=np.float64)
+        bounds = np.full((len(tariffs), 24, tier_count), np.inf, dtype=np.float64)
+        valid = np.empty(len(tariffs), dtype=bool)
+
+        for n, tariff in enumerate(tariffs):
+            width = tariff.rates.shape[1]
+            hour_rates = tariff.rates[tariff.hour_periods]
+            rates[n, :, :width] = hour_rates
+            rates[n, :, width:] = hour_rates[:, -1:]
+            bounds[n, :, :width] = tariff.tier_bounds[tariff.hour_periods]
+            valid[n] = tariff.valid
+
+        return rates, bounds, valid
@@ -0,0 +1,340 @@
+import heapq
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .exact_billing import BILLING_MODE_EXACT, BILLING_MODE_FAST
+from .interval_data import IntervalData
+from .load_profiles import LoadProfileRegistry
+from .metrics import metrics, span
+from .projection import DEFAULT_HORIZON_YEARS, ProjectionEngine
+from .rate_calculator import RateCalculator
+from .rate_processor import RateProcessor
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change to processing or pricing alters computed costs, so
+# results stored on proposals are recomputed by the stale-only repricer
+PRICING_ENGINE_VERSION = 1
+
+
+class RatePricer:
+    """
+    Turns a raw OpenEI response into priced rate results for one project.
+
+    Shared by the synchronous and asynchronous calculate_rates views so both
+    return identical numbers. Instances hold no per-request state and can
+    be used from executor threads.
+    """
+
+    def __init__(self,
+                 tier_mode: str,
+                 load_profile_dir: str,
+                 horizon: int = DEFAULT_HORIZON_YEARS,
+                 discount_rate: float = 0.0):
+        self.processor = RateProcessor()
+        self.calculator = RateCalculator(tier_mode=tier_mode)
+        self.profiles = LoadProfileRegistry(load_profile_dir)
+        self.projection = ProjectionEngine(horizon=horizon, discount_rate=discount_rate)
+
+    def price(self,
+              raw_rates: Dict,
+              yearly_consumption: float,
+              escalator: float,
+              load_profile_key: Optional[str] = None,
+              horizon: Optional[int] = None,
+              discount_rate: Optional[float] = None,
+              escalator_grid: Optional[Sequence[float]] = None,
+              top_k: Optional[int] = None,
+              interval_data: Optional[IntervalData] = None,
+              billing_mode: str = BILLING_MODE_FAST) -> List[Dict]:
+        """
+        Process and price every rate in an OpenEI response
+
+        Each rate's first-year cost is simulated once; the projection, its
+        totals and any escalator sensitivity grid are derived from it.
+        With ``top_k`` only the cheapest rates are returned, cheapest
+        first, and rates whose lower bound rules them out are never
+        simulated. With ``interval_data`` the first-year cost is the
+        metered series priced directly and scaled to one year. In
+        BILLING_MODE_EXACT first-year costs, projections and totals are
+        Decimal bills rounded to the cent; the sensitivity grid stays on
+        the fast path.
+
+        Args:
+            raw_rates: Raw OpenEI response payload
+            yearly_consumption: Total yearly consumption in kWh
+            escalator: Annual percentage increase in rates
+            load_profile_key: LoadProfileRegistry key for the project
+            horizon: Projection years (defaults to the pricer's horizon)
+            discount_rate: Annual NPV discount rate in percent
+            escalator_grid: Optional escalators to add a sensitivity grid for
+            top_k: Return only this many rates with the lowest first-year cost
+            interval_data: Metered usage to price instead of the load profile
+            billing_mode: BILLING_MODE_FAST or BILLING_MODE_EXACT
+
+        Returns:
+            List[Dict]: One result per rate with its yearly projection;
+            rates that cannot be priced are left out
+        """
+        with span('process_rate_data'):
+            processed_rates = self.processor.process_rate_data(raw_rates)
+        load_profile = self.profiles.get(load_profile_key)
+        horizon = horizon or self.projection.horizon
+
+        with span('pricing'):
+            if top_k:
+                priced = self._rank(
+                    processed_rates, yearly_consumption, load_profile, top_k, interval_data, billing_mode
+                )
+            else:
+                priced = [
+                    (rate, self._base_cost(rate, yearly_consumption, load_profile, interval_data, billing_mode))
+                    for rate in processed_rates
+                ]
+                metrics.increment('tariffs_priced_total', len(processed_rates))
+                priced = [(rate, base_cost) for rate, base_cost in priced if base_cost is not None]
+
+        with span('projection'):
+            return self._results(priced, escalator, horizon, discount_rate, escalator_grid, billing_mode)
+
+    def _results(self,
+                 priced,
+                 escalator: float,
+                 horizon: int,
+                 discount_rate: Optional[float],
+                 escalator_grid: Optional[Sequence[float]],
+                 billing_mode: str) -> List[Dict]:
+        """Projection, totals and optional sensitivity grid for each priced rate"""
+        results = []
+        for rate, base_cost in priced:
+            if billing_mode == BILLING_MODE_EXACT:
+                exact_engine = self.calculator.exact_engine
+                yearly_bills = exact_engine.project(base_cost, escalator, horizon)
+                cumulative, npv = exact_engine.totals(
+                    yearly_bills, self.projection.discount_rate if discount_rate is None else discount_rate
+                )
+                yearly_costs = [float(cost) for cost in yearly_bills]
+            else:
+                yearly_costs = self.projection.to_lists(self.projection.project(base_cost, escalator, horizon)[0])
+                cumulative, npv = self.projection.totals(base_cost, escalator, horizon, discount_rate)
+
+            result = {
+                'label': rate['label'],
+                'rate_name': rate['name'],
+                'utility': rate['utility'],
+                'avg_rate': rate['avg_rate'],
+                'first_year_cost': yearly_costs[0],
+                'yearly_projection': yearly_costs,
+                'cumulative_cost': round(float(cumulative), 2),
+                'npv': round(float(npv), 2)
+            }
+            if escalator_grid:
+                result['sensitivity'] = self._sensitivity(float(base_cost), escalator_grid, horizon, discount_rate)
+            results.append(result)
+
+        return results
+
+    def price_selected(self,
+                       raw_rates: Dict,
+                       yearly_consumption: float,
+                       escalator: float,
+                       label: Optional[str] = None,
+                       rate_name: Optional[str] = None,
+                       utility: Optional[str] = None,
+                       load_profile_key: Optional[str] = None,
+                       horizon: Optional[int] = None,
+                       discount_rate: Optional[float] = None) -> Optional[Dict]:
+        """
+        Price a single rate of an OpenEI response for storing on a proposal
+
+        Only the selected rate is simulated. The result carries the content
+        hash of the tariff it was computed from and PRICING_ENGINE_VERSION,
+        so stored numbers can later be checked for staleness.
+
+        Args:
+            raw_rates: Raw OpenEI response payload
+            yearly_consumption: Total yearly consumption in kWh
+            escalator: Annual percentage increase in rates
+            label: OpenEI label of the selected rate
+            rate_name: Rate name to match when no label is given
+            utility: Utility name to narrow a rate_name match
+            load_profile_key: LoadProfileRegistry key for the project
+            horizon: Projection years (defaults to the pricer's horizon)
+            discount_rate: Annual NPV discount rate in percent
+
+        Returns:
+            Optional[Dict]: The rate's result, or None if no rate in the response
+            matches or the matching rate cannot be priced
+        """
+        def matches(rate):
+            if label:
+                return rate['label'] == label
+            return rate['name'] == rate_name and (not utility or rate['utility'] == utility)
+
+        rate = next((rate for rate in self.processor.process_rate_data(raw_rates) if matches(rate)), None)
+        if rate is None:
+            return None
+
+        horizon = horizon or self.projection.horizon
+        base_cost = self._base_cost(rate, yearly_consumption, self.profiles.get(load_profile_key))
+        metrics.increment('tariffs_priced_total')
+        if base_cost is None:
+            return None
+        result = self._results([(rate, base_cost)], escalator, horizon, discount_rate, None, BILLING_MODE_FAST)[0]
+        result.update({
+            'horizon': horizon,
+            'tariff_hash': rate['content_hash'],
+            'engine_version': PRICING_ENGINE_VERSION,
+        })
+        return result
+
+    def _base_cost(self,
+                   rate: Dict,
+                   yearly_consumption: float,
+                   load_profile,
+                   interval_data: Optional[IntervalData] = None,
+                   billing_mode: str = BILLING_MODE_FAST):
+        """First-year cost of a rate, or None when it cannot be priced"""
+        try:
+            if not self.calculator.compile(rate).annual_valid:
+                # Its energy schedule does not cover the year, so any cost would be understated
+                logger.warning(f"Skipping rate {rate['label']} without a complete energy schedule")
+                return None
+            if interval_data is not None:
+                return self.calculator.calculate_interval_cost(rate, interval_data)['annualized_cost']
+            return self.calculator.calculate_base_cost(rate, yearly_consumption, load_profile, billing_mode)
+        except Exception as e:
+            metrics.increment('pricing_errors_total', stage='base_cost')
+            logger.error(f"Error calculating yearly costs: {str(e)}")
+            return None
+
+    def _rank(self,
+              rates: List[Dict],
+              yearly_consumption: float,
+              load_profile,
+              top_k: int,
+              interval_data: Optional[IntervalData] = None,
+              billing_mode: str = BILLING_MODE_FAST):
+        """
+        The top_k cheapest (rate, first-year cost) pairs, cheapest first
+
+        Rates are simulated in order of their lower bound; once K rates are
+        priced, any rate whose bound is not below the K-th best cost cannot
+        enter the top K, and neither can any rate after it. Metered
+        interval data has no profile bound, so every rate is simulated.
+        Exact bills can undercut the float bound by the mode tolerance.
+        Rates that cannot be priced get an infinite bound and are never
+        ranked.
+        """
+        if interval_data is None:
+            bounds = self.calculator.calculate_base_cost_bounds(rates, yearly_consumption, load_profile)
+        else:
+            bounds = np.full(len(rates), -np.inf)
+        if billing_mode == BILLING_MODE_EXACT:
+            bounds -= [self.calculator.exact_engine.tolerance(self.calculator.compile(rate)) for rate in rates]
+        bounds[[not self.calculator.compile(rate).annual_valid for rate in rates]] = np.inf
+
+        # Max-heap of (-cost, -index) holding the best K so far
+        best = []
+        simulated = 0
+        for index in np.argsort(bounds, kind='stable').tolist():
+            if bounds[index] == np.inf or (len(best) == top_k and bounds[index] >= -best[0][0]):
+                break
+            simulated += 1
+            cost = self._base_cost(rates[index], yearly_consumption, load_profile, interval_data, billing_mode)
+            if cost is None:
+                continue
+            entry = (-cost, -index)
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        metrics.increment('tariffs_priced_total', simulated)
+        metrics.increment('rates_pruned_total', len(rates) - simulated)
+        logger.debug(f"Ranking simulated {simulated} of {len(rates)} rates for the top {top_k}")
+        return [(rates[-index], -cost) for cost, index in sorted(best, reverse=True)]
+
+    def _sensitivity(self, base_cost: float, escalators: Sequence[float], horizon: int, discount_rate):
+        series = self.projection.sensitivity(base_cost, escalators, horizon)[0]
+        cumulative, npv = self.projection.totals(base_cost, np.asarray(escalators), horizon, discount_rate)
+        return {
+            'escalator': list(escalators),
+            'yearly_projection': self.projection.to_lists(series),
+            'cumulative_cost': self.projection.to_lists(cumulative),
+            'npv': self.projection.to_lists(npv),
+        }
+
+    def price_batch(self,
+                    raw_rates: Dict,
+                    yearly_consumptions: Sequence[float],
+                    escalators: Sequence[float],
+                    load_profile_keys: Sequence[Optional[str]],
+                    horizon: Optional[int] = None) -> Dict[str, List]:
+        """
+        Price many scenarios that share one OpenEI response
+
+        The response is processed once and each rate prices all scenarios
+        with the same load profile in a single vectorized pass.
+
+        Args:
+            raw_rates: Raw OpenEI response payload
+            yearly_consumptions: Total yearly consumption in kWh per scenario
+            escalators: Annual percentage increase in rates per scenario
+            load_profile_keys: LoadProfileRegistry key per scenario
+            horizon: Projection years (defaults to the pricer's horizon)
+
+        Returns:
+            Dict: Columnar result; rate columns are indexed by rate, and
+            first_year_cost / yearly_projection by [scenario][rate]. Rates
+            that cannot be priced are left out, as in price()
+        """
+        processed_rates = []
+        for rate in self.processor.process_rate_data(raw_rates):
+            if self.calculator.compile(rate).annual_valid:
+                processed_rates.append(rate)
+            else:
+                logger.warning(f"Skipping rate {rate['label']} without a complete energy schedule")
+        projections = [[None] * len(processed_rates) for _ in yearly_consumptions]
+        failed = set()
+
+        by_profile = defaultdict(list)
+        for index, key in enumerate(load_profile_keys):
+            by_profile[key].append(index)
+
+        for key, indices in by_profile.items():
+            load_profile = self.profiles.get(key)
+            consumptions = [yearly_consumptions[i] for i in indices]
+            profile_escalators = [escalators[i] for i in indices]
+            for column, rate in enumerate(processed_rates):
+                if column in failed:
+                    continue
+                try:
+                    yearly_costs = self.calculator.calculate_yearly_costs(
+                        rate, consumptions, profile_escalators, load_profile,
+                        horizon=horizon or self.projection.horizon
+                    )
+                except Exception as e:
+                    metrics.increment('pricing_errors_total', stage='batch')
+                    logger.error(f"Error calculating yearly costs for rate {rate['label']}: {str(e)}")
+                    failed.add(column)
+                    continue
+                for index, costs in zip(indices, yearly_costs):
+                    projections[index][column] = costs
+
+        if failed:
+            columns = [column for column in range(len(processed_rates)) if column not in failed]
+            processed_rates = [processed_rates[column] for column in columns]
+            projections = [[row[column] for column in columns] for row in projections]
+
+        return {
+            'label': [rate['label'] for rate in processed_rates],
+            'rate_name': [rate['name'] for rate in processed_rates],
+            'utility': [rate['utility'] for rate in processed_rates],
+            'avg_rate': [rate['avg_rate'] for rate in processed_rates],
+            'first_year_cost': [[costs[0] for costs in row] for row in projections],
+            'yearly_projection': projections,
+        }
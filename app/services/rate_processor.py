@@ -1,45 +1,161 @@
+import hashlib
+import json
 import logging
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime
 
+from .compiled_tariff import CompiledTariff
+
 logger = logging.getLogger(__name__)
 
+def content_hash(item: Dict) -> str:
+    """Stable hash of an OpenEI rate item's full content"""
+    encoded = json.dumps(item, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+class ProcessedRateCache:
+    """
+    Bounded LRU of processed rates keyed by OpenEI item content hash.
+
+    Items that failed validation are cached as None so they are skipped
+    without being processed again. Item hashes of recently seen payload
+    objects are remembered by identity (holding a reference so the id
+    cannot be reused), which lets payloads served from the in-process
+    tariff cache skip hashing as well.
+    """
+
+    MAX_PAYLOADS = 64
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._payloads: 'OrderedDict[int, Tuple[Dict, List[str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def item_hashes(self, api_data: Dict) -> List[str]:
+        """Content hashes of a payload's items, reused for the same payload object"""
+        with self._lock:
+            seen = self._payloads.get(id(api_data))
+            if seen is not None and seen[0] is api_data:
+                self._payloads.move_to_end(id(api_data))
+                return seen[1]
+
+        hashes = [content_hash(item) for item in api_data.get('items', [])]
+        with self._lock:
+            self._payloads[id(api_data)] = (api_data, hashes)
+            while len(self._payloads) > self.MAX_PAYLOADS:
+                self._payloads.popitem(last=False)
+        return hashes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._payloads.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+# Shared by every RateProcessor in the process
+processed_rate_cache = ProcessedRateCache()
+
 class RateProcessor:
     """Processes raw rate data into standardized format"""
+    def __init__(self, cache: Optional[ProcessedRateCache] = None):
+        self.cache = processed_rate_cache if cache is None else cache
+
     def process_rate_data(self, api_data: Dict) -> List[Dict]:
+        """
+        Process an OpenEI response into rate dictionaries
+
+        Each item is memoized by content hash, and so is the whole processed
+        list, so unchanged tariffs skip sorting, parsing and compilation on
+        warm paths. Returned dicts are fresh copies; their CompiledTariff
+        objects are shared and immutable.
+        """
+        items = api_data.get('items', [])
+        hashes = self.cache.item_hashes(api_data)
+        list_key = 'list:' + hashlib.blake2b(''.join(hashes).encode('ascii'), digest_size=16).hexdigest()
+
+        found, cached_rates = self.cache.get(list_key)
+        if found:
+            return [dict(rate_info) for rate_info in cached_rates]
+
         processed_rates = []
         cutoff_date = datetime(2021, 12, 31).timestamp()
 
         # Sort items by is_default to ensure default rates appear first
-        items = sorted(
-            api_data.get('items', []),
-            key=lambda x: (not x.get('is_default', False), x.get('startdate', 0))
+        ordered = sorted(
+            zip(items, hashes),
+            key=lambda pair: (not pair[0].get('is_default', False), pair[0].get('startdate', 0))
         )
 
-        for item in items:
+        for item, key in ordered:
             if item.get('enddate') and item['enddate'] < cutoff_date:
                 continue
 
-            try:
-                avg_rate = self.calculate_rate(item)
-                rate_info = self._extract_rate_info(item, avg_rate)
+            found, rate_info = self.cache.get(key)
+            if not found:
+                rate_info = self._process_item(item)
+                if rate_info is not None:
+                    rate_info['content_hash'] = key
+                self.cache.set(key, rate_info)
 
-                # Only add valid rates (with required fields)
-                if rate_info['label'] and rate_info['name'] and rate_info['utility']:
-                    processed_rates.append(rate_info)
-                else:
-                    logger.warning(f"Skipping rate with missing required fields: {item.get('name')}")
+            if rate_info is not None:
+                processed_rates.append(rate_info)
 
-            except Exception as e:
-                logger.warning(f"Error processing rate {item.get('name')}: {str(e)}")
-                continue
+        self.cache.set(list_key, processed_rates)
+        return [dict(rate_info) for rate_info in processed_rates]
+
+    def _process_item(self, item: Dict) -> Optional[Dict]:
+        """Process a single item, returning None when it should be skipped"""
+        try:
+            rate_info = self._extract_rate_info(item)
+
+            # Only add valid rates (with required fields)
+            if rate_info['label'] and rate_info['name'] and rate_info['utility']:
+                return rate_info
+            logger.warning(f"Skipping rate with missing required fields: {item.get('name')}")
+
+        except Exception as e:
+            logger.warning(f"Error processing rate {item.get('name')}: {str(e)}")
+
+        return None
 
-        return processed_rates
+    def _extract_rate_info(self, item: Dict, avg_rate: Optional[float] = None) -> Dict:
+        """
+        Extract and validate rate information from API response
 
-    def _extract_rate_info(self, item: Dict, avg_rate: float) -> Dict:
-        """Extract and validate rate information from API response"""
+        The energy and fixed-charge structures are compiled once into a
+        CompiledTariff stored under 'compiled'; the raw OpenEI dicts are
+        not carried along.
+        """
         try:
+            compiled = CompiledTariff.from_rate_data(item)
+            if avg_rate is None:
+                avg_rate = compiled.average_rate
             return {
                 'label': item.get('label', '').strip(),
                 'utility': item.get('utility', '').strip(),
@@ -48,10 +164,7 @@ class RateProcessor:
                 'approved': bool(item.get('approved', True)),
                 'startdate': datetime.fromtimestamp(item['startdate']).strftime('%Y-%m-%d') if item.get('startdate') else '',
                 'avg_rate': avg_rate,
-                'energyratestructure': item.get('energyratestructure', []),
-                'energyweekdayschedule': item.get('energyweekdayschedule', []),
-                'fixedchargefirstmeter': Decimal(str(item.get('fixedchargefirstmeter', 0))),
-                'fixedchargeunits': item.get('fixedchargeunits', '')
+                'compiled': compiled
             }
         except Exception as e:
             logger.error(f"Error extracting rate info: {str(e)}")
@@ -1,41 +1,145 @@
 import logging
 import requests
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+
+from django.conf import settings
+
+from .http_client import HttpClient, get_async_http_client, get_http_client
+from .metrics import metrics, span
+from .local_rate_provider import LocalRateProvider
+from .tariff_cache import TariffCache, get_tariff_cache
+from .territory import Territory, TerritoryResolver, get_territory_resolver
 
 logger = logging.getLogger(__name__)
 
+TARIFF_SOURCE_OPENEI = 'openei'
+TARIFF_SOURCE_LOCAL = 'local'
+
 class RateProvider:
     """Implementation of RateDataProvider for OpenEI API"""
     OPENEI_BASE_URL = "https://api.openei.org/utility_rates"
 
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str,
+                 cache: Optional[TariffCache] = None,
+                 http: Optional[HttpClient] = None,
+                 resolver: Optional[TerritoryResolver] = None):
         self.api_key = api_key
+        self.cache = cache
+        self.resolver = resolver
+        self.http = http or get_http_client()
         if not self.api_key:
             logger.error("OPENEI_API_KEY not configured")
 
-    def get_utility_rates(self, address: str) -> List[Dict]:
+    def get_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> List[Dict]:
+        """
+        Fetch rates for an address, served from the tariff cache when configured
+
+        With a territory resolver, the tariff cache is keyed by territory:
+        every address in a single-utility territory shares one cache
+        entry. OpenEI is always queried with the address itself, so the
+        rates are the ones that apply there.
+
+        Args:
+            address: Service address
+            utility: Optional utility name to restrict results to
+            eia_id: Optional utility EIA id to restrict results to
+        """
+        if self.cache is None:
+            return self._fetch_utility_rates(address, utility, eia_id)
+        territory = None
+        if self.resolver is not None and not utility and not eia_id:
+            territory = self.resolver.resolve(address)
+        return self.cache.get_or_fetch(
+            lambda: self._fetch_utility_rates(address, utility, eia_id),
+            address,
+            utility,
+            eia_id,
+            territory.key if territory is not None else ''
+        )
+
+    async def aget_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> List[Dict]:
+        """Async variant of get_utility_rates using a pooled httpx client"""
+        if self.cache is None:
+            return await self._afetch_utility_rates(address, utility, eia_id)
+        territory = None
+        if self.resolver is not None and not utility and not eia_id:
+            territory = await self.resolver.aresolve(address)
+        return await self.cache.aget_or_fetch(
+            lambda: self._afetch_utility_rates(address, utility, eia_id),
+            address,
+            utility,
+            eia_id,
+            territory.key if territory is not None else ''
+        )
+
+    def resolve_territory(self, address: str) -> Territory:
+        """Territory of an address, or its canonical address without a resolver"""
+        if self.resolver is None:
+            return Territory.for_address(address)
+        return self.resolver.resolve(address)
+
+    def _params(self, address: str, utility: str = '', eia_id: str = '') -> Dict:
+        params = {
+            'api_key': self.api_key,
+            'format': 'json',
+            'version': 'latest',
+            'approved': 'true',
+            'is_default': 'true',
+            'limit': 50,
+            'detail': 'full'
+        }
+        if address:
+            params['address'] = address
+        if utility:
+            params['ratesforutility'] = utility
+        if eia_id:
+            params['eia'] = eia_id
+        return params
+
+    def _fetch_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> List[Dict]:
+        try:
+            with span('openei'):
+                response = self.http.get(
+                    self.OPENEI_BASE_URL,
+                    params=self._params(address, utility, eia_id)
+                )
+
+            if response.status_code == 200:
+                with span('json_decode'):
+                    return response.json()
+            raise requests.RequestException(f"API error: {response.status_code}")
+
+        except Exception as e:
+            metrics.increment('openei_errors_total')
+            logger.error(f"Error fetching utility rates: {str(e)}")
+            raise
+
+    async def _afetch_utility_rates(self, address: str, utility: str = '', eia_id: str = '') -> List[Dict]:
         try:
-            params = {
-                'api_key': self.api_key,
-                'address': address,
-                'format': 'json',
-                'version': 'latest',
-                'approved': 'true',
-                'is_default': 'true',
-                'limit': 50,
-                'detail': 'full'
-            }
-
-            response = requests.get(
-                self.OPENEI_BASE_URL,
-                params=params,
-                timeout=10
-            )
+            with span('openei'):
+                response = await get_async_http_client().get(
+                    self.OPENEI_BASE_URL,
+                    params=self._params(address, utility, eia_id)
+                )
 
             if response.status_code == 200:
-                return response.json()
+                with span('json_decode'):
+                    return response.json()
             raise requests.RequestException(f"API error: {response.status_code}")
 
         except Exception as e:
+            metrics.increment('openei_errors_total')
             logger.error(f"Error fetching utility rates: {str(e)}")
             raise
+
+
+def get_rate_provider() -> Union[RateProvider, LocalRateProvider]:
+    """Rate provider for the configured TARIFF_SOURCE"""
+    if settings.TARIFF_SOURCE == TARIFF_SOURCE_LOCAL:
+        return LocalRateProvider(resolver=get_territory_resolver())
+    return RateProvider(
+        api_key=settings.OPENEI_API_KEY,
+        cache=get_tariff_cache(),
+        resolver=get_territory_resolver()
+    )
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from ..models import TariffCacheEntry
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'[^\w\s#-]')
+
+
+def normalize_address(address: str) -> str:
+    """Lower-case an address and collapse punctuation and whitespace"""
+    address = _PUNCTUATION.sub(' ', (address or '').lower())
+    return _WHITESPACE.sub(' ', address).strip()
+
+
+class TariffCache:
+    """
+    Two-tier cache for raw OpenEI utility rate responses.
+
+    Entries are keyed by service territory when one is given, otherwise
+    by normalized address, utility and EIA id. The
+    in-process tier is an LRU bounded by ``max_entries``; the persistent
+    tier is the TariffCacheEntry table, shared by every worker. Entries
+    younger than ``ttl`` are fresh. Entries older than ``ttl`` but younger
+    than ``stale_ttl`` are returned immediately while a background refresh
+    runs (stale-while-revalidate); anything older is fetched synchronously.
+    """
+
+    def __init__(self,
+                 ttl: float,
+                 stale_ttl: float,
+                 max_entries: int = 512,
+                 persistent: bool = True):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.persistent = persistent
+
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(address: str, utility: str = '', eia_id: str = '', territory: str = '') -> str:
+        if territory:
+            raw = f"territory|{territory}"
+        else:
+            raw = '|'.join([normalize_address(address), (utility or '').strip().lower(), str(eia_id or '').strip()])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_or_fetch(self,
+                     fetch: Callable[[], Dict],
+                     address: str,
+                     utility: str = '',
+                     eia_id: str = '',
+                     territory: str = '') -> Dict:
+        """
+        Return the cached payload for a lookup, fetching it when needed
+
+        Args:
+            fetch: Callable performing the remote lookup
+            address: Service address as entered by the user
+            utility: Optional utility name filter
+            eia_id: Optional utility EIA id filter
+            territory: Optional territory key shared by every address it covers
+
+        Returns:
+            Dict: Raw OpenEI response payload
+        """
+        key = self.make_key(address, utility, eia_id, territory)
+        cached = self._get_local(key)
+        if cached is None and self.persistent:
+            cached = self._get_persistent(key)
+            if cached is not None:
+                self._set_local(key, *cached)
+
+        if cached is not None:
+            fetched_at, payload = cached
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                metrics.increment('tariff_cache_requests_total', result='hit')
+                return payload
+            if age < self.stale_ttl:
+                self.stale_hits += 1
+                metrics.increment('tariff_cache_requests_total', result='stale')
+                self._refresh_in_background(key, fetch, address, utility, eia_id, territory)
+                return payload
+
+        self.misses += 1
+        metrics.increment('tariff_cache_requests_total', result='miss')
+        payload = fetch()
+        self.store(key, payload, address, utility, eia_id, territory)
+        return payload
+
+    async def aget_or_fetch(self,
+                            afetch: Callable[[], Awaitable[Dict]],
+                            address: str,
+                            utility: str = '',
+                            eia_id: str = '',
+                            territory: str = '') -> Dict:
+        """
+        Async variant of get_or_fetch
+
+        The in-process tier is read without leaving the event loop; database
+        access runs in a worker thread and stale entries are refreshed in a
+        background task.
+        """
+        key = self.make_key(address, utility, eia_id, territory)
+        cached = self._get_local(key)
+        if cached is None and self.persistent:
+            cached = await sync_to_async(self._get_persistent)(key)
+            if cached is not None:
+                self._set_local(key, *cached)
+
+        if cached is not None:
+            fetched_at, payload = cached
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                metrics.increment('tariff_cache_requests_total', result='hit')
+                return payload
+            if age < self.stale_ttl:
+                self.stale_hits += 1
+                metrics.increment('tariff_cache_requests_total', result='stale')
+                self._arefresh_in_background(key, afetch, address, utility, eia_id, territory)
+                return payload
+
+        self.misses += 1
+        metrics.increment('tariff_cache_requests_total', result='miss')
+        payload = await afetch()
+        await sync_to_async(self.store)(key, payload, address, utility, eia_id, territory)
+        return payload
+
+    def store(self, key: str, payload: Dict, address: str, utility: str = '', eia_id: str = '', territory: str = ''):
+        fetched_at = time.time()
+        self._set_local(key, fetched_at, payload)
+        if self.persistent:
+            self._set_persistent(key, fetched_at, payload, address, utility, eia_id, territory)
+
+    def invalidate(self, address: str, utility: str = '', eia_id: str = '', territory: str = ''):
+        key = self.make_key(address, utility, eia_id, territory)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.persistent:
+            TariffCacheEntry.objects.filter(key=key).delete()
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[Tuple[float, Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, fetched_at: float, payload: Dict):
+        with self._lock:
+            self._entries[key] = (fetched_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_persistent(self, key: str) -> Optional[Tuple[float, Dict]]:
+        try:
+            entry = TariffCacheEntry.objects.only('payload', 'fetched_at').get(key=key)
+        except TariffCacheEntry.DoesNotExist:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading tariff cache: {str(e)}")
+            return None
+        return entry.fetched_at.timestamp(), entry.payload
+
+    def _set_persistent(self, key, fetched_at, payload, address, utility, eia_id, territory=''):
+        try:
+            fetched = datetime.fromtimestamp(fetched_at, tz=timezone.utc)
+            TariffCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    'address': normalize_address(address)[:255],
+                    'utility': (utility or '')[:255],
+                    'eia_id': str(eia_id or '')[:20],
+                    'territory': (territory or '')[:255],
+                    'payload': payload,
+                    'fetched_at': fetched,
+                }
+            )
+            # Drop rows that can no longer be served, even as stale
+            TariffCacheEntry.objects.filter(
+                fetched_at__lt=fetched - timedelta(seconds=self.stale_ttl)
+            ).delete()
+        except Exception as e:
+            logger.warning(f"Error writing tariff cache: {str(e)}")
+
+    def _refresh_in_background(self, key, fetch, address, utility, eia_id, territory=''):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(key, fetch(), address, utility, eia_id, territory)
+            except Exception as e:
+                logger.warning(f"Background tariff refresh failed for {address}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                connection.close()
+
+        threading.Thread(target=refresh, name='tariff-cache-refresh', daemon=True).start()
+
+    def _arefresh_in_background(self, key, afetch, address, utility, eia_id, territory=''):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                payload = await afetch()
+                await sync_to_async(self.store)(key, payload, address, utility, eia_id, territory)
+            except Exception as e:
+                logger.warning(f"Background tariff refresh failed for {address}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_default_cache: Optional[TariffCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_tariff_cache() -> TariffCache:
+    """Process-wide TariffCache configured from settings"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = TariffCache(
+                    ttl=settings.TARIFF_CACHE_TTL,
+                    stale_ttl=settings.TARIFF_CACHE_STALE_TTL,
+                    max_entries=settings.TARIFF_CACHE_MAX_ENTRIES,
+                )
+    return _default_cache
@@ -0,0 +1,421 @@
+import csv
+import io
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from typing import IO, Callable, Dict, Iterator, List, Optional, Set
+
+from django.db import transaction
+from django.utils import timezone as django_timezone
+
+from ..models import Tariff, TariffCacheEntry
+from .rate_processor import ProcessedRateCache, RateProcessor, content_hash
+from .territory import Territory
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JSON = 'json'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_JSON, FORMAT_CSV)
+
+# CSV exports flatten tier structures into <structure>/period<i>/tier<j><field> columns
+_STRUCTURE_COLUMN = re.compile(
+    r'^(energyratestructure|demandratestructure|flatdemandstructure|coincidentratestructure)'
+    r'/period(\d+)/tier(\d+)(rate|max|adj|sell|unit)$'
+)
+_ITEMS_KEY = re.compile(r'"items"\s*:\s*\[')
+
+# CSV columns holding JSON-encoded month/hour schedules
+SCHEDULE_FIELDS = (
+    'energyweekdayschedule', 'energyweekendschedule', 'demandweekdayschedule',
+    'demandweekendschedule', 'flatdemandmonths', 'coincidentrateschedule',
+)
+NUMERIC_FIELDS = (
+    'fixedchargefirstmeter', 'fixedchargeeaaddl', 'mincharge', 'annualmincharge',
+    'peakkwcapacitymin', 'peakkwcapacitymax', 'peakkwhusagemin', 'peakkwhusagemax',
+    'voltageminimum', 'voltagemaximum', 'demandwindow', 'demandratchetpercentage',
+)
+BOOLEAN_FIELDS = ('is_default', 'approved')
+DATE_FIELDS = ('startdate', 'enddate')
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y')
+
+
+class USURDBReader:
+    """
+    Incremental reader for U.S. Utility Rate Database dumps.
+
+    JSON dumps may be a top-level array, an object with an ``items``
+    array, or one object per line; items are decoded one at a time from
+    a bounded buffer. CSV dumps are read row by row and their flattened
+    columns rebuilt into OpenEI-shaped items. Either way only the current
+    item is held in memory.
+    """
+
+    READ_SIZE = 1 << 20
+
+    def items(self, stream: IO[bytes], file_format: str) -> Iterator[Dict]:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            if file_format == FORMAT_JSON:
+                for item in self._json_items(text):
+                    yield self.normalize(item)
+            elif file_format == FORMAT_CSV:
+                for row in csv.DictReader(text):
+                    yield self.normalize(self.csv_row_to_item(row))
+            else:
+                raise ValueError(f"Unknown tariff dump format: {file_format}")
+        finally:
+            text.detach()
+
+    def _json_items(self, text: IO[str]) -> Iterator[Dict]:
+        decoder = json.JSONDecoder()
+        buffer = text.read(self.READ_SIZE)
+        position = self._skip_whitespace(buffer, 0)
+        in_array = False
+
+        if buffer[position:position + 1] == '[':
+            position += 1
+            in_array = True
+        elif buffer[position:position + 1] == '{':
+            match = _ITEMS_KEY.search(buffer, position)
+            if match is not None:
+                position = match.end()
+                in_array = True
+
+        while True:
+            position = self._skip_whitespace(buffer, position)
+            if in_array and buffer[position:position + 1] == ',':
+                position = self._skip_whitespace(buffer, position + 1)
+            if position >= len(buffer):
+                more = text.read(self.READ_SIZE)
+                if not more:
+                    return
+                buffer, position = buffer[position:] + more, 0
+                continue
+            if in_array and buffer[position] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The item runs past the buffer; read more and retry
+                more = text.read(self.READ_SIZE)
+                if not more:
+                    raise
+                buffer, position = buffer[position:] + more, 0
+                continue
+
+            if isinstance(item, dict):
+                yield item
+            position = end
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, position: int) -> int:
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+        return position
+
+    @staticmethod
+    def csv_row_to_item(row: Dict[str, str]) -> Dict:
+        """Rebuild an OpenEI item from a flattened CSV export row"""
+        item = {}
+        structures: Dict[str, Dict[int, Dict[int, Dict]]] = {}
+        for column, value in row.items():
+            if column is None or value is None:
+                continue
+            value = value.strip()
+            if value == '':
+                continue
+            match = _STRUCTURE_COLUMN.match(column)
+            if match is not None:
+                structure, period, tier, field = match.groups()
+                tiers = structures.setdefault(structure, {}).setdefault(int(period), {})
+                tiers.setdefault(int(tier), {})[field] = value if field == 'unit' else float(value)
+            elif column in SCHEDULE_FIELDS:
+                item[column] = json.loads(value)
+            elif column in NUMERIC_FIELDS:
+                item[column] = float(value)
+            else:
+                item[column] = value
+
+        for structure, periods in structures.items():
+            item[structure] = [
+                [periods[period][tier] for tier in sorted(periods[period])]
+                for period in sorted(periods)
+            ]
+        return item
+
+    @staticmethod
+    def normalize(item: Dict) -> Dict:
+        """Coerce a dump item to the field types of the OpenEI API"""
+        if not item.get('label') and item.get('_id'):
+            identifier = item['_id']
+            item['label'] = identifier.get('$oid', '') if isinstance(identifier, dict) else str(identifier)
+        item.pop('_id', None)
+
+        for field in BOOLEAN_FIELDS:
+            if isinstance(item.get(field), str):
+                item[field] = item[field].strip().lower() in ('true', '1', 'yes', 't')
+        for field in DATE_FIELDS:
+            if field in item:
+                item[field] = _epoch_seconds(item[field])
+                if item[field] is None:
+                    del item[field]
+        if isinstance(item.get('eiaid'), str) and item['eiaid'].strip().isdigit():
+            item['eiaid'] = int(item['eiaid'])
+        return item
+
+
+def _epoch_seconds(value) -> Optional[int]:
+    """Epoch seconds from an API timestamp, a Mongo export date or a CSV date string"""
+    if isinstance(value, dict):
+        value = value.get('$date', value.get('$numberLong'))
+        if isinstance(value, dict):
+            value = value.get('$numberLong')
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.lstrip('-').isdigit()):
+            return int(value) // 1000
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = value.strip()
+    if value.lstrip('-').isdigit():
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = None
+        for date_format in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, date_format)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        logger.warning(f"Unrecognized tariff date: {value!r}")
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _timestamp(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value else None
+
+
+class TariffImporter:
+    """
+    Loads a USURDB dump into the Tariff table.
+
+    Items are streamed from the dump and run through RateProcessor in
+    chunks of ``chunk_size``, which validates and compiles each tariff;
+    items it rejects are not stored. Each chunk is written with one
+    upsert keyed on the OpenEI label.
+    """
+
+    UPDATE_FIELDS = [
+        'eia_id', 'utility', 'name', 'sector', 'is_default', 'approved', 'startdate',
+        'enddate', 'average_rate', 'content_hash', 'payload', 'imported_at',
+    ]
+
+    def __init__(self,
+                 chunk_size: int = 500,
+                 reader: Optional[USURDBReader] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+        self.chunk_size = chunk_size
+        self.reader = reader or USURDBReader()
+        self.progress = progress or logger.info
+        # A private memo sized to a chunk, so imports do not evict the request path's
+        self.processor = RateProcessor(cache=ProcessedRateCache(max_entries=2 * chunk_size))
+
+    def run(self, stream: IO[bytes], file_format: str) -> Dict[str, int]:
+        """
+        Import every item of a dump
+
+        Args:
+            stream: Binary file object of the dump
+            file_format: FORMAT_JSON or FORMAT_CSV
+
+        Returns:
+            Dict: Counts of items read, imported and skipped
+        """
+        stats = {'read': 0, 'imported': 0, 'skipped': 0}
+        chunk = []
+        for item in self.reader.items(stream, file_format):
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk, stats)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, stats)
+        return stats
+
+    def compile_chunk(self, items: List[Dict]) -> List[Tariff]:
+        """Tariff rows for the items of a chunk that RateProcessor accepts"""
+        self.processor.cache.clear()
+        payload = {'items': items}
+        by_hash = dict(zip(self.processor.cache.item_hashes(payload), items))
+
+        tariffs = []
+        for rate in self.processor.process_rate_data(payload):
+            item = by_hash[rate['content_hash']]
+            tariffs.append(Tariff(
+                label=rate['label'],
+                eia_id=str(item.get('eiaid', '')),
+                utility=rate['utility'][:255],
+                name=rate['name'][:255],
+                sector=str(item.get('sector', ''))[:50],
+                is_default=rate['is_default'],
+                approved=rate['approved'],
+                startdate=_timestamp(item.get('startdate')),
+                enddate=_timestamp(item.get('enddate')),
+                average_rate=rate['avg_rate'],
+                content_hash=rate['content_hash'],
+                payload=item,
+            ))
+        return tariffs
+
+    def _import_chunk(self, items: List[Dict], stats: Dict[str, int]):
+        tariffs = self.compile_chunk(items)
+        # A dump can repeat a label; keep its last version
+        tariffs = list({tariff.label: tariff for tariff in tariffs}.values())
+        Tariff.objects.bulk_create(
+            tariffs,
+            update_conflicts=True,
+            unique_fields=['label'],
+            update_fields=self.UPDATE_FIELDS,
+        )
+        stats['read'] += len(items)
+        stats['imported'] += len(tariffs)
+        stats['skipped'] += len(items) - len(tariffs)
+        self.progress(f"{stats['read']} items read, {stats['imported']} imported, {stats['skipped']} skipped")
+
+
+class TariffSync(TariffImporter):
+    """
+    Incremental refresh of the Tariff table from a newer dump.
+
+    Each incoming item's label and content hash are compared against the
+    stored version; only new or changed items go through RateProcessor and
+    are written. Tariffs whose enddate has passed are removed, and with
+    ``prune`` so are tariffs missing from the dump. The labels and utility
+    territories of every tariff that was added, changed or removed are
+    collected, and cached OpenEI responses for those territories dropped,
+    so downstream repricing can be limited to what actually moved.
+    """
+
+    def __init__(self, *args, prune: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prune = prune
+        self.changed_labels: Set[str] = set()
+        self.affected_utilities: Set[str] = set()
+        self._seen_labels: Set[str] = set()
+
+    def run(self, stream: IO[bytes], file_format: str) -> Dict:
+        """
+        Sync the table with a dump
+
+        Args:
+            stream: Binary file object of the dump
+            file_format: FORMAT_JSON or FORMAT_CSV
+
+        Returns:
+            Dict: Counts of items read, imported, unchanged and skipped
+            and of tariffs expired and pruned, plus the sorted changed
+            ``labels`` and affected ``territories``
+        """
+        self.changed_labels.clear()
+        self.affected_utilities.clear()
+        self._seen_labels.clear()
+        now = django_timezone.now()
+
+        stats = {'read': 0, 'imported': 0, 'unchanged': 0, 'skipped': 0, 'expired': 0, 'pruned': 0}
+        chunk = []
+        for item in self.reader.items(stream, file_format):
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self._sync_chunk(chunk, stats, now)
+                chunk = []
+        if chunk:
+            self._sync_chunk(chunk, stats, now)
+
+        stats['expired'] = self._remove(Tariff.objects.filter(enddate__lte=now))
+        if self.prune:
+            stats['pruned'] = self._remove(Tariff.objects.exclude(label__in=self._seen_labels))
+
+        territories = sorted(Territory.for_utility(eia_id).key for eia_id in self.affected_utilities)
+        TariffCacheEntry.objects.filter(territory__in=territories).delete()
+        stats['labels'] = sorted(self.changed_labels)
+        stats['territories'] = territories
+        return stats
+
+    def _sync_chunk(self, items: List[Dict], stats: Dict, now: datetime):
+        stats['read'] += len(items)
+        # A dump can repeat a label; keep its last version
+        items = list({item.get('label', ''): item for item in items}.values())
+        labels = [item.get('label', '') for item in items]
+        self._seen_labels.update(labels)
+        stored = {
+            label: (stored_hash, eia_id)
+            for label, stored_hash, eia_id in Tariff.objects
+            .filter(label__in=labels)
+            .values_list('label', 'content_hash', 'eia_id')
+        }
+
+        changed = []
+        for item in items:
+            previous = stored.get(item.get('label', ''))
+            if previous is not None and previous[0] == content_hash(item):
+                stats['unchanged'] += 1
+            elif previous is None and item.get('enddate') and _timestamp(item['enddate']) <= now:
+                # Already expired and never stored
+                stats['skipped'] += 1
+            else:
+                changed.append(item)
+
+        if not changed:
+            self.progress(f"{stats['read']} items read, {stats['unchanged']} unchanged")
+            return
+        tariffs = self.compile_chunk(changed)
+        accepted = {tariff.label for tariff in tariffs}
+        # Stored tariffs whose new version RateProcessor rejects are removed
+        rejected = [item.get('label', '') for item in changed if item.get('label', '') not in accepted]
+        rejected_stored = [label for label in rejected if label in stored]
+
+        with transaction.atomic():
+            Tariff.objects.bulk_create(
+                tariffs,
+                update_conflicts=True,
+                unique_fields=['label'],
+                update_fields=self.UPDATE_FIELDS,
+            )
+            if rejected_stored:
+                Tariff.objects.filter(label__in=rejected_stored).delete()
+
+        for tariff in tariffs:
+            self.changed_labels.add(tariff.label)
+            self.affected_utilities.add(tariff.eia_id)
+        for label in list(accepted) + rejected_stored:
+            if label in stored:
+                # The tariff may have moved between utilities
+                self.affected_utilities.add(stored[label][1])
+        self.changed_labels.update(rejected_stored)
+
+        stats['imported'] += len(tariffs)
+        stats['skipped'] += len(rejected)
+        self.progress(
+            f"{stats['read']} items read, {stats['imported']} imported, "
+            f"{stats['unchanged']} unchanged, {stats['skipped']} skipped"
+        )
+
+    def _remove(self, tariffs) -> int:
+        """Delete tariffs, recording their labels and utilities as changed"""
+        removed = list(tariffs.values_list('label', 'eia_id'))
+        for label, eia_id in removed:
+            self.changed_labels.add(label)
+            self.affected_utilities.add(eia_id)
+        if removed:
+            Tariff.objects.filter(label__in=[label for label, _ in removed]).delete()
+        return len(removed)
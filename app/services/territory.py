@@ -0,0 +1,297 @@
+import csv
+import io
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from ..models import ServiceTerritory
+from .tariff_cache import normalize_address
+
+logger = logging.getLogger(__name__)
+
+# USPS state, district and territory codes
+US_STATE_CODES = frozenset({
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA',
+    'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM',
+    'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA',
+    'WV', 'WI', 'WY', 'AS', 'GU', 'MP', 'PR', 'VI',
+})
+# ZIP (or ZIP+4) right after a state code: "Springfield, IL 62701"
+_STATE_ZIP_CODE = re.compile(r'\b([A-Za-z]{2})\.?,?\s+(\d{5})(?:-\d{4})?\b')
+# ZIP (or ZIP+4) ending the address, optionally followed by the country
+_TRAILING_ZIP_CODE = re.compile(
+    r'(?:^|[\s,])(\d{5})(?:-\d{4})?(?:[\s,]+(?:usa|us|united states(?: of america)?))?[\s.,]*$',
+    re.IGNORECASE
+)
+
+# USPS street suffix and directional abbreviations
+STREET_ABBREVIATIONS = {
+    'avenue': 'ave', 'av': 'ave', 'boulevard': 'blvd', 'circle': 'cir', 'court': 'ct',
+    'drive': 'dr', 'expressway': 'expy', 'freeway': 'fwy', 'highway': 'hwy', 'lane': 'ln',
+    'parkway': 'pkwy', 'place': 'pl', 'road': 'rd', 'square': 'sq', 'street': 'st',
+    'str': 'st', 'terrace': 'ter', 'trail': 'trl', 'turnpike': 'tpke',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+# Secondary unit designators; the designator and its number are dropped
+UNIT_DESIGNATORS = {
+    'apt', 'apartment', 'unit', 'ste', 'suite', 'rm', 'room', 'fl', 'floor',
+    'bldg', 'building', 'lot', 'spc', 'space', 'trlr', 'dept',
+}
+
+
+def canonical_address(address: str) -> str:
+    """
+    Normalized address with USPS abbreviations and no secondary unit, so
+    "123 Main Street, Apt 4" and "123 Main St" are the same address
+    """
+    tokens = normalize_address(address).split(' ')
+    kept = []
+    skip_next = False
+    for token in tokens:
+        if skip_next:
+            skip_next = False
+            continue
+        if token in UNIT_DESIGNATORS:
+            skip_next = True
+            continue
+        if token.startswith('#'):
+            # "# 4" or "#4"
+            skip_next = token == '#'
+            continue
+        kept.append(STREET_ABBREVIATIONS.get(token, token))
+    return ' '.join(token for token in kept if token)
+
+
+def extract_zip_code(address: str) -> Optional[str]:
+    """
+    ZIP code of an address: the last one following a state code, else one
+    ending the address. House and unit numbers are never taken for a ZIP,
+    so "Unit 5, 12345 Main St, Springfield IL" has none.
+    """
+    address = (address or '').strip()
+    after_state = [
+        match.group(2) for match in _STATE_ZIP_CODE.finditer(address)
+        if match.group(1).upper() in US_STATE_CODES
+    ]
+    if after_state:
+        return after_state[-1]
+    match = _TRAILING_ZIP_CODE.search(address)
+    return match.group(1) if match else None
+
+
+class Territory:
+    """
+    Stable key for the tariffs that apply to an address.
+
+    Addresses whose ZIP code is served by a single utility share that
+    utility's EIA id territory; any other address falls back to its
+    canonical form.
+    """
+
+    __slots__ = ('key', 'eia_id', 'utility_name', 'zip_code')
+
+    def __init__(self, key: str, eia_id: str = '', utility_name: str = '', zip_code: Optional[str] = None):
+        self.key = key
+        self.eia_id = eia_id
+        self.utility_name = utility_name
+        self.zip_code = zip_code
+
+    @classmethod
+    def for_utility(cls, eia_id: str, utility_name: str = '', zip_code: Optional[str] = None) -> 'Territory':
+        return cls(f"eia:{eia_id}", eia_id, utility_name, zip_code)
+
+    @classmethod
+    def for_address(cls, address: str, zip_code: Optional[str] = None) -> 'Territory':
+        return cls(f"addr:{canonical_address(address)}", zip_code=zip_code)
+
+    def __eq__(self, other):
+        return isinstance(other, Territory) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Territory({self.key!r})"
+
+
+class TerritoryResolver:
+    """
+    Resolves addresses to service territories through the ServiceTerritory table.
+
+    ZIP lookups hit the (zip_code, eia_id) index and are memoized in an
+    in-process LRU of ``max_entries`` ZIP codes, so a warm resolver does no
+    database work. ZIPs with no territory are looked up again on every
+    call. Lookup errors degrade to the address territory.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._utilities: 'OrderedDict[str, List[Tuple[str, str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, address: str) -> Territory:
+        """
+        Territory of an address
+
+        Args:
+            address: Service address as entered by the user
+
+        Returns:
+            Territory: The utility's territory when the address's ZIP code
+            has exactly one utility, otherwise the canonical address
+        """
+        zip_code = extract_zip_code(address)
+        if zip_code is None:
+            return Territory.for_address(address)
+        return self._territory(address, zip_code, self.zip_utilities(zip_code))
+
+    async def aresolve(self, address: str) -> Territory:
+        """Async variant of resolve; database lookups run in a worker thread"""
+        zip_code = extract_zip_code(address)
+        if zip_code is None:
+            return Territory.for_address(address)
+        utilities = self._get_local(zip_code)
+        if utilities is None:
+            utilities = await sync_to_async(self.zip_utilities)(zip_code)
+        return self._territory(address, zip_code, utilities)
+
+    @staticmethod
+    def _territory(address: str, zip_code: str, utilities: List[Tuple[str, str]]) -> Territory:
+        if len(utilities) == 1:
+            eia_id, utility_name = utilities[0]
+            return Territory.for_utility(eia_id, utility_name, zip_code)
+        return Territory.for_address(address, zip_code)
+
+    def clear(self):
+        with self._lock:
+            self._utilities.clear()
+
+    def zip_utilities(self, zip_code: str) -> List[Tuple[str, str]]:
+        """(EIA id, utility name) of every utility serving a ZIP code"""
+        utilities = self._get_local(zip_code)
+        if utilities is not None:
+            return utilities
+        try:
+            utilities = list(
+                ServiceTerritory.objects
+                .filter(zip_code=zip_code)
+                .order_by('eia_id')
+                .values_list('eia_id', 'utility_name')
+            )
+        except Exception as e:
+            logger.warning(f"Error resolving territory for ZIP {zip_code}: {str(e)}")
+            return []
+
+        # ZIPs without territories are not cached, so loading them later takes effect
+        if not utilities:
+            return utilities
+        with self._lock:
+            self._utilities[zip_code] = utilities
+            while len(self._utilities) > self.max_entries:
+                self._utilities.popitem(last=False)
+        return utilities
+
+    def _get_local(self, zip_code: str) -> Optional[List[Tuple[str, str]]]:
+        with self._lock:
+            utilities = self._utilities.get(zip_code)
+            if utilities is not None:
+                self._utilities.move_to_end(zip_code)
+            return utilities
+
+
+class TerritoryLoader:
+    """
+    Streams a ZIP to utility lookup CSV into the ServiceTerritory table.
+
+    Expects the column layout of the public "U.S. Electric Utility
+    Companies and Rates: Look-up by Zipcode" dataset (zip, eiaid,
+    utility_name, state, ...); extra columns are ignored. Rows are
+    inserted in batches, skipping pairs that are already loaded.
+    """
+
+    ZIP_COLUMNS = ('zip', 'zip_code', 'zipcode')
+    EIA_COLUMNS = ('eiaid', 'eia_id', 'eia')
+    NAME_COLUMNS = ('utility_name', 'utility', 'name')
+    STATE_COLUMNS = ('state',)
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+
+    def load(self, stream: IO[bytes]) -> Dict[str, int]:
+        """
+        Bulk-load one CSV file
+
+        Returns:
+            Dict: Rows read, valid rows written and invalid rows skipped
+        """
+        stats = {'read': 0, 'loaded': 0, 'invalid': 0}
+        batch = []
+        for territory in self._rows(stream, stats):
+            batch.append(territory)
+            if len(batch) >= self.batch_size:
+                self._insert(batch)
+                stats['loaded'] += len(batch)
+                batch = []
+        if batch:
+            self._insert(batch)
+            stats['loaded'] += len(batch)
+        return stats
+
+    def _rows(self, stream: IO[bytes], stats: Dict[str, int]) -> Iterator[ServiceTerritory]:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            reader = csv.DictReader(text)
+            fields = {name.strip().lower(): name for name in reader.fieldnames or []}
+            zip_field = self._column(fields, self.ZIP_COLUMNS)
+            eia_field = self._column(fields, self.EIA_COLUMNS)
+            name_field = self._column(fields, self.NAME_COLUMNS)
+            state_field = self._column(fields, self.STATE_COLUMNS, required=False)
+
+            for row in reader:
+                stats['read'] += 1
+                zip_code = (row.get(zip_field) or '').strip()
+                eia_id = (row.get(eia_field) or '').strip()
+                if not eia_id or not zip_code.isdigit() or len(zip_code) > 5:
+                    stats['invalid'] += 1
+                    continue
+                yield ServiceTerritory(
+                    # Spreadsheet exports drop leading zeros
+                    zip_code=zip_code.zfill(5),
+                    eia_id=eia_id,
+                    utility_name=(row.get(name_field) or '').strip()[:255],
+                    state=(row.get(state_field) or '').strip()[:2] if state_field else '',
+                )
+        finally:
+            text.detach()
+
+    @staticmethod
+    def _column(fields: Dict[str, str], candidates, required: bool = True) -> Optional[str]:
+        for candidate in candidates:
+            if candidate in fields:
+                return fields[candidate]
+        if required:
+            raise ValueError(f"Territory CSV needs one of the columns: {', '.join(candidates)}")
+        return None
+
+    @staticmethod
+    def _insert(batch: List[ServiceTerritory]):
+        ServiceTerritory.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+_default_resolver: Optional[TerritoryResolver] = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_territory_resolver() -> TerritoryResolver:
+    """Process-wide TerritoryResolver"""
+    global _default_resolver
+    if _default_resolver is None:
+        with _default_resolver_lock:
+            if _default_resolver is None:
+                _default_resolver = TerritoryResolver()
+    return _default_resolver
@@ -0,0 +1,132 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import WebhookOutbox
+from .http_client import HttpClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    """
+    Drains the WebhookOutbox table outside the request path.
+
+    Due rows are claimed in batches under a short lease, so concurrent
+    dispatchers never deliver the same row at once. They are POSTed with
+    bounded concurrency, and failures are rescheduled with jittered
+    exponential backoff until ``max_attempts``, after which the row is
+    dead-lettered.
+    """
+
+    def __init__(self,
+                 http: Optional[HttpClient] = None,
+                 batch_size: int = 50,
+                 max_workers: int = 4,
+                 max_attempts: int = 8,
+                 base_delay: float = 5.0,
+                 max_delay: float = 3600.0,
+                 lease_seconds: float = 120.0):
+        self.http = http or get_http_client()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+
+    def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Deliver due rows until none are left
+
+        Args:
+            max_batches: Stop after this many batches (None drains fully)
+
+        Returns:
+            Dict: Counts of delivered, retried and dead-lettered rows
+        """
+        totals = {'delivered': 0, 'retried': 0, 'dead': 0}
+        batches = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='webhook') as executor:
+            while max_batches is None or batches < max_batches:
+                rows = self.claim_batch()
+                if not rows:
+                    break
+                results = list(executor.map(self.deliver, rows))
+                for key, count in self._record_results(rows, results).items():
+                    totals[key] += count
+                batches += 1
+        return totals
+
+    def run_forever(self, poll_interval: float = 2.0):
+        while True:
+            totals = self.drain()
+            if any(totals.values()):
+                logger.info(f"Webhook dispatch: {totals}")
+            time.sleep(poll_interval)
+
+    def claim_batch(self) -> List[WebhookOutbox]:
+        """Lease the next batch of due pending rows"""
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                WebhookOutbox.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=WebhookOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:self.batch_size]
+            )
+            if rows:
+                WebhookOutbox.objects.filter(id__in=[row.id for row in rows]).update(
+                    next_attempt_at=now + timedelta(seconds=self.lease_seconds)
+                )
+        return rows
+
+    def deliver(self, row: WebhookOutbox) -> Tuple[bool, str]:
+        """POST one outbox row; runs in a worker thread and does not touch the DB"""
+        try:
+            response = self.http.post(
+                row.url,
+                json={'event': row.event, 'project': row.payload},
+                headers={'Content-Type': 'application/json'}
+            )
+            if response.ok:
+                return True, ''
+            return False, f"HTTP {response.status_code}: {response.text[:500]}"
+        except Exception as e:
+            return False, str(e)
+
+    def _record_results(self, rows: List[WebhookOutbox], results: List[Tuple[bool, str]]) -> Dict[str, int]:
+        now = timezone.now()
+        counts = {'delivered': 0, 'retried': 0, 'dead': 0}
+
+        for row, (ok, error) in zip(rows, results):
+            row.attempts += 1
+            row.last_error = error
+            if ok:
+                row.status = WebhookOutbox.STATUS_DELIVERED
+                row.delivered_at = now
+                counts['delivered'] += 1
+            elif row.attempts >= self.max_attempts:
+                row.status = WebhookOutbox.STATUS_DEAD
+                counts['dead'] += 1
+                logger.error(f"Webhook {row.id} ({row.event}) dead-lettered after {row.attempts} attempts: {error}")
+            else:
+                row.next_attempt_at = now + timedelta(seconds=self._backoff(row.attempts))
+                counts['retried'] += 1
+                logger.warning(f"Webhook {row.id} ({row.event}) failed, attempt {row.attempts}: {error}")
+
+        WebhookOutbox.objects.bulk_update(
+            rows,
+            ['attempts', 'last_error', 'status', 'delivered_at', 'next_attempt_at']
+        )
+        return counts
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
@@ -1,3 +1,851 @@
-from django.test import TestCase
+import copy
+import csv
+import gzip
+import io
+import asyncio
+import base64
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .models import Project, ProposalUtility, ServiceTerritory, Tariff, TariffCacheEntry, WebhookOutbox
+from .services import portfolio_repricer, pricing_benchmark
+from .services.compiled_tariff import CompiledTariff
+from .services.exact_billing import BILLING_MODE_EXACT, CENT, ExactBillingEngine
+from .services.http_client import HttpClient, get_async_http_client
+from .services.interval_data import IntervalDataParser
+from .services.load_profiles import LoadProfileRegistry
+from .services.local_rate_provider import LocalRateProvider
+from .services.pricing_benchmark import (
+    DEFAULT_BASELINE, DEFAULT_FIXTURE, PricingBenchmark, baseline_mismatch, environment_differences,
+    find_regressions, load_report, synthetic_openei_payload
+)
+from .services.rate_calculator import RateCalculator
+from .services.rate_engine import TIER_MODES
+from .services.rate_pricing import RatePricer
+from .services.rate_processor import ProcessedRateCache, RateProcessor
+from .services.rate_provider import RateProvider
+from .services.portfolio_repricer import PortfolioRepricer
+from .services.tariff_cache import TariffCache
+from .services.tariff_import import FORMAT_CSV, FORMAT_JSON, TariffSync, USURDBReader
+from .services.territory import Territory, TerritoryResolver, extract_zip_code, get_territory_resolver
+from .services.webhook_dispatcher import WebhookDispatcher
+
+
+def load_fixture():
+    with open(DEFAULT_FIXTURE) as f:
+        return json.load(f)
+
+
+def fixture_items():
+    """Fixture and generated OpenEI items, covering tiers, TOU periods and demand"""
+    return load_fixture()['items'] + synthetic_openei_payload(30, seed=3)['items']
+
+
+class RateEngineTests(SimpleTestCase):
+    """The vectorized daily pricing path against the scalar reference"""
+
+    # Includes consumptions whose hourly kWh lands on tier limits
+    DAILY_CONSUMPTIONS = [0.0, 1.0, 8.5, 24.66, 40.0, 100.0, 250.0, 1234.5]
+
+    def setUp(self):
+        self.calculator = RateCalculator(tier_mode=settings.RATE_TIER_MODE)
+
+    def test_batch_matches_scalar_daily_cost(self):
+        items = fixture_items()
+        costs = self.calculator.calculate_daily_costs(items, self.DAILY_CONSUMPTIONS)
+        self.assertEqual(costs.shape, (len(self.DAILY_CONSUMPTIONS), len(items)))
+
+        for column, item in enumerate(items):
+            for row, consumption in enumerate(self.DAILY_CONSUMPTIONS):
+                expected = self.calculator.calculate_daily_cost(
+                    item['energyratestructure'], item['energyweekdayschedule'], consumption
+                )
+                self.assertAlmostEqual(costs[row, column], expected, places=9, msg=item['label'])
+
+    def test_non_increasing_tier_maxima(self):
+        item = copy.deepcopy(load_fixture()['items'][0])
+        item['energyratestructure'] = [
+            [{'max': 2.0, 'rate': 0.10}, {'max': 0.5, 'rate': 0.20}, {'max': 1.5, 'rate': 0.30}, {'rate': 0.40}],
+            [{'max': 1.0, 'rate': 0.05}, {'max': 1.0, 'rate': 0.15}, {'rate': 0.25}],
+        ]
+        item['energyweekdayschedule'] = [[hour % 2 for hour in range(24)]] * 12
+        item['energyweekendschedule'] = item['energyweekdayschedule']
+        consumptions = self.DAILY_CONSUMPTIONS + [12.0, 36.0, 48.0, 60.0]
+        costs = self.calculator.calculate_daily_costs([item], consumptions)
+        for row, consumption in enumerate(consumptions):
+            expected = self.calculator.calculate_daily_cost(
+                item['energyratestructure'], item['energyweekdayschedule'], consumption
+            )
+            self.assertAlmostEqual(costs[row, 0], expected, places=9, msg=consumption)
+
+    def test_batch_splits_large_workloads(self):
+        items = fixture_items()
+        consumptions = np.linspace(0, 500, 64)
+        expected = self.calculator.calculate_daily_costs(items, consumptions)
+        with mock.patch.object(self.calculator.engine, 'MAX_BATCH_ELEMENTS', 1):
+            np.testing.assert_allclose(self.calculator.calculate_daily_costs(items, consumptions), expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(self.calculator.calculate_daily_costs([], [10.0]).shape, (1, 0))
+        self.assertEqual(self.calculator.calculate_daily_costs(fixture_items(), []).shape[0], 0)
+
+
+class CompiledTariffTests(SimpleTestCase):
+    """Tariffs compiled once by RateProcessor price like the raw OpenEI dicts"""
+
+    def setUp(self):
+        self.calculator = RateCalculator(tier_mode=settings.RATE_TIER_MODE)
+        self.items = fixture_items()
+        rates = RateProcessor(cache=ProcessedRateCache()).process_rate_data({'items': self.items})
+        by_label = {rate['label']: rate for rate in rates}
+        self.rates = [by_label[item['label']] for item in self.items]
+
+    def test_processor_compiles_every_rate(self):
+        for rate, item in zip(self.rates, self.items):
+            compiled = rate['compiled']
+            self.assertIsInstance(compiled, CompiledTariff)
+            self.assertEqual(compiled.label, item['label'])
+            self.assertAlmostEqual(rate['avg_rate'], RateProcessor().calculate_rate(item), places=4)
+            self.assertAlmostEqual(
+                compiled.annual_fixed_charge,
+                self.calculator._calculate_annual_fixed_charge(
+                    item.get('fixedchargefirstmeter', 0), item.get('fixedchargeunits', '')
+                )
+            )
+
+    def test_compiled_matches_raw_pricing(self):
+        for rate, item in zip(self.rates, self.items):
+            compiled = rate['compiled']
+            for daily in (3.0, 27.4, 150.0):
+                self.assertAlmostEqual(
+                    self.calculator.calculate_daily_cost(compiled, None, daily),
+                    self.calculator.calculate_daily_cost(
+                        item['energyratestructure'], item['energyweekdayschedule'], daily
+                    ),
+                    places=9
+                )
+                self.assertEqual(
+                    self.calculator.calculate_average_rate(compiled, None, daily),
+                    self.calculator.calculate_average_rate(
+                        item['energyratestructure'], item['energyweekdayschedule'], daily
+                    )
+                )
+            np.testing.assert_allclose(
+                self.calculator.calculate_yearly_cost(rate, 9000, 4.5),
+                self.calculator.calculate_yearly_cost(item, 9000, 4.5)
+            )
+
+    def test_immutable_and_picklable(self):
+        import pickle
+
+        compiled = self.rates[0]['compiled']
+        with self.assertRaises(AttributeError):
+            compiled.label = 'changed'
+        with self.assertRaises(AttributeError):
+            del compiled.rates
+        self.assertFalse(compiled.rates.flags.writeable)
+
+        restored = pickle.loads(pickle.dumps(compiled))
+        self.assertEqual(restored.label, compiled.label)
+        self.assertEqual(
+            self.calculator.calculate_base_cost(restored, 9000), self.calculator.calculate_base_cost(compiled, 9000)
+        )
+
+
+class ExactBillingTests(SimpleTestCase):
+    """Exact Decimal bills stay within ExactBillingEngine.tolerance of the fast path"""
+
+    def setUp(self):
+        self.rates = RateProcessor(cache=ProcessedRateCache()).process_rate_data({'items': fixture_items()})
+        registry = LoadProfileRegistry(settings.LOAD_PROFILE_DIR)
+        self.profiles = [None] + [registry.get(key) for key in registry.keys()[:3]]
+
+    def test_exact_within_tolerance_of_fast(self):
+        for tier_mode in TIER_MODES:
+            calculator = RateCalculator(tier_mode=tier_mode)
+            for rate in self.rates:
+                tolerance = ExactBillingEngine.tolerance(rate['compiled'])
+                for profile in self.profiles:
+                    for consumption in (1500, 9000, 42000):
+                        fast = calculator.calculate_base_cost(rate, consumption, profile)
+                        exact = calculator.calculate_base_cost(rate, consumption, profile, BILLING_MODE_EXACT)
+                        self.assertIsInstance(exact, Decimal)
+                        self.assertEqual(exact, exact.quantize(CENT))
+                        self.assertLessEqual(abs(float(exact) - fast), tolerance, msg=(tier_mode, rate['label']))
+
+    def test_exact_projection_is_billed_in_cents(self):
+        yearly = ExactBillingEngine().project(Decimal('1234.567'), 3.3, 5)
+        self.assertEqual(yearly[0], Decimal('1234.57'))
+        self.assertTrue(all(cost == cost.quantize(CENT) for cost in yearly))
+        cumulative, npv = ExactBillingEngine.totals(yearly, 0.0)
+        self.assertEqual(cumulative, sum(yearly))
+        self.assertEqual(npv, cumulative)
+
+    def test_exact_top_k_matches_full_ranking(self):
+        pricer = RatePricer(tier_mode=settings.RATE_TIER_MODE, load_profile_dir=settings.LOAD_PROFILE_DIR)
+        payload = {'items': fixture_items()}
+        ranked = pricer.price(payload, 9000, 4.0, top_k=5, billing_mode=BILLING_MODE_EXACT)
+        full = pricer.price(payload, 9000, 4.0, billing_mode=BILLING_MODE_EXACT)
+        cheapest = sorted(full, key=lambda result: (result['first_year_cost'], result['label']))[:5]
+        self.assertEqual(
+            [result['first_year_cost'] for result in ranked], [result['first_year_cost'] for result in cheapest]
+        )
+
+
+class LoadProfileRegistryTests(SimpleTestCase):
+    """Key checks reuse the directory listing"""
+
+    def test_membership_lists_directory_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            np.save(os.path.join(directory, 'custom.npy'), np.full(8760, 1 / 8760, dtype=np.float32))
+            registry = LoadProfileRegistry(directory)
+            self.assertIn('custom', registry)
+            with mock.patch.object(pathlib.Path, 'glob', side_effect=AssertionError("directory listed again")):
+                self.assertIn('custom', LoadProfileRegistry(directory))
+                self.assertNotIn('missing', registry)
+                self.assertIn('custom', registry.keys())
+
+    def test_written_profiles_refresh_the_listing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry = LoadProfileRegistry(directory)
+            self.assertNotIn('custom', registry)
+            np.save(os.path.join(directory, 'custom.npy'), np.full(8760, 1 / 8760, dtype=np.float32))
+            self.assertNotIn('custom', registry)
+            registry.write_builtin_profiles()
+            self.assertIn('custom', registry)
+
+
+def partial_schedule_item():
+    """Fixture item whose schedule only covers one month: priceable daily, not annually"""
+    item = copy.deepcopy(load_fixture()['items'][0])
+    item['label'] = 'partial-schedule'
+    item['energyweekdayschedule'] = item['energyweekdayschedule'][:1]
+    item['energyweekendschedule'] = item['energyweekendschedule'][:1]
+    return item
+
+
+class PriceBatchTests(SimpleTestCase):
+    """Batch pricing leaves out the rates price() leaves out"""
+
+    def setUp(self):
+        self.pricer = RatePricer(tier_mode=settings.RATE_TIER_MODE, load_profile_dir=settings.LOAD_PROFILE_DIR)
+        self.payload = {'items': load_fixture()['items'] + [partial_schedule_item()]}
+
+    def test_rates_without_annual_schedule_are_skipped(self):
+        self.assertFalse(self.pricer.calculator.compile(partial_schedule_item()).annual_valid)
+        batch = self.pricer.price_batch(self.payload, [5000, 9000], [4.0, 6.0], [None, None])
+        single = self.pricer.price(self.payload, 5000, 4.0)
+        self.assertNotIn('partial-schedule', batch['label'])
+        self.assertEqual(sorted(batch['label']), sorted(result['label'] for result in single))
+        by_label = dict(zip(batch['label'], batch['first_year_cost'][0]))
+        for result in single:
+            self.assertAlmostEqual(by_label[result['label']], result['first_year_cost'], places=6)
+
+    def test_failing_rate_drops_only_its_column(self):
+        failing = load_fixture()['items'][1]['label']
+        calculate = self.pricer.calculator.calculate_yearly_costs
+
+        def calculate_yearly_costs(rate, *args, **kwargs):
+            if rate['label'] == failing:
+                raise ValueError("broken tariff")
+            return calculate(rate, *args, **kwargs)
+
+        profile = LoadProfileRegistry(settings.LOAD_PROFILE_DIR).keys()[0]
+        with mock.patch.object(self.pricer.calculator, 'calculate_yearly_costs', calculate_yearly_costs):
+            batch = self.pricer.price_batch(self.payload, [5000, 9000], [4.0, 6.0], [None, profile])
+
+        self.assertNotIn(failing, batch['label'])
+        self.assertEqual(len(batch['label']), len(load_fixture()['items']) - 1)
+        for row in batch['yearly_projection']:
+            self.assertEqual(len(row), len(batch['label']))
+            self.assertTrue(all(costs is not None for costs in row))
+
+
+class StubWebhookServer:
+    """Local HTTP server recording POSTed JSON bodies and answering with queued status codes"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.received = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                stub.received.append(json.loads(self.rfile.read(length)))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                self.send_response(status)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WebhookDispatcherTests(TestCase):
+    """Outbox delivery against a local stub server"""
+
+    def dispatcher(self, **kwargs):
+        kwargs.setdefault('base_delay', 10.0)
+        return WebhookDispatcher(http=HttpClient(max_retries=0), max_workers=2, **kwargs)
+
+    def enqueue(self, url, count=1):
+        return [
+            WebhookOutbox.objects.create(event='project.updated', url=url, payload={'id': n, 'name': f"Project {n}"})
+            for n in range(count)
+        ]
+
+    @staticmethod
+    def make_due(rows):
+        WebhookOutbox.objects.filter(id__in=[row.id for row in rows]).update(next_attempt_at=timezone.now())
+
+    def test_delivers_due_rows(self):
+        with StubWebhookServer() as server:
+            rows = self.enqueue(server.url, 3)
+            self.assertEqual(self.dispatcher(batch_size=2).drain(), {'delivered': 3, 'retried': 0, 'dead': 0})
+
+        self.assertEqual(sorted(body['project']['id'] for body in server.received), [0, 1, 2])
+        self.assertTrue(all(body['event'] == 'project.updated' for body in server.received))
+        for row in rows:
+            row.refresh_from_db()
+            self.assertEqual(row.status, WebhookOutbox.STATUS_DELIVERED)
+            self.assertEqual(row.attempts, 1)
+            self.assertIsNotNone(row.delivered_at)
+
+    def test_failure_is_retried_with_backoff(self):
+        dispatcher = self.dispatcher()
+        with StubWebhookServer(statuses=[500]) as server:
+            rows = self.enqueue(server.url)
+            before = timezone.now()
+            self.assertEqual(dispatcher.drain(), {'delivered': 0, 'retried': 1, 'dead': 0})
+
+            row = WebhookOutbox.objects.get(id=rows[0].id)
+            self.assertEqual(row.status, WebhookOutbox.STATUS_PENDING)
+            self.assertIn('HTTP 500', row.last_error)
+            # Jittered between half and all of base_delay
+            self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=5))
+            self.assertLessEqual(row.next_attempt_at, timezone.now() + timedelta(seconds=10))
+
+            # Not due yet, so nothing is sent
+            self.assertEqual(dispatcher.drain(), {'delivered': 0, 'retried': 0, 'dead': 0})
+            self.make_due(rows)
+            self.assertEqual(dispatcher.drain(), {'delivered': 1, 'retried': 0, 'dead': 0})
+
+        self.assertEqual(len(server.received), 2)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (WebhookOutbox.STATUS_DELIVERED, 2))
+
+    def test_dead_letter_after_max_attempts(self):
+        dispatcher = self.dispatcher(max_attempts=2)
+        with StubWebhookServer(statuses=[503, 503, 503]) as server:
+            rows = self.enqueue(server.url)
+            self.assertEqual(dispatcher.drain()['retried'], 1)
+            self.make_due(rows)
+            self.assertEqual(dispatcher.drain()['dead'], 1)
+            self.make_due(rows)
+            self.assertEqual(dispatcher.drain(), {'delivered': 0, 'retried': 0, 'dead': 0})
+
+        self.assertEqual(len(server.received), 2)
+        row = WebhookOutbox.objects.get(id=rows[0].id)
+        self.assertEqual((row.status, row.attempts), (WebhookOutbox.STATUS_DEAD, 2))
+
+    def test_unreachable_endpoint_is_retried(self):
+        with StubWebhookServer() as server:
+            url = server.url
+        rows = self.enqueue(url)
+        self.assertEqual(self.dispatcher().drain(), {'delivered': 0, 'retried': 1, 'dead': 0})
+        row = WebhookOutbox.objects.get(id=rows[0].id)
+        self.assertEqual(row.attempts, 1)
+        self.assertTrue(row.last_error)
+
+    def test_claimed_rows_are_leased(self):
+        dispatcher = self.dispatcher(lease_seconds=60.0)
+        rows = self.enqueue('http://127.0.0.1:9/hook', 2)
+
+        claimed = dispatcher.claim_batch()
+        self.assertEqual({row.id for row in claimed}, {row.id for row in rows})
+        # A second dispatcher sees nothing while the lease holds
+        self.assertEqual(self.dispatcher().claim_batch(), [])
+        lease = WebhookOutbox.objects.get(id=rows[0].id).next_attempt_at
+        self.assertGreater(lease, timezone.now() + timedelta(seconds=50))
+
+        # An expired lease (a crashed dispatcher) makes the rows due again
+        self.make_due(rows)
+        self.assertEqual(len(self.dispatcher().claim_batch()), 2)
+
+
+class AsyncRateViewTests(TestCase):
+    """Authentication of the async endpoint and its per-loop HTTP client"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        self.project = Project.objects.create(
+            user=self.owner, name='p', address='1 Main St', consumption=5000, percentage=4.0
+        )
+        self.url = f'/api/projects/{self.project.pk}/calculate_rates_async/'
+
+    def basic_auth(self, username, password):
+        token = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        return {'HTTP_AUTHORIZATION': f'Basic {token}'}
+
+    def test_anonymous_is_rejected(self):
+        response = self.client.post(self.url, '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_drf_authenticators_are_used(self):
+        # BasicAuthentication is invisible to request.auser()
+        response = self.client.post(
+            self.url, '{}', content_type='application/json', **self.basic_auth('other', 'pw')
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_bad_credentials_are_rejected(self):
+        response = self.client.post(
+            self.url, '{}', content_type='application/json', **self.basic_auth('owner', 'wrong')
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_async_client_closed_with_its_loop(self):
+        async def shared_client():
+            client = get_async_http_client()
+            self.assertIs(get_async_http_client(), client)
+            return client
+
+        first = asyncio.run(shared_client())
+        second = asyncio.run(shared_client())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.client.is_closed)
+        self.assertTrue(second.client.is_closed)
+
+
+class MetricsViewTests(SimpleTestCase):
+    """Access to the Prometheus endpoint"""
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_in_debug_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class GreenButtonTests(SimpleTestCase):
+    """Green Button XML uploads"""
+
+    READINGS = ''.join(
+        f'<IntervalReading><timePeriod><duration>3600</duration><start>{1704067200 + hour * 3600}</start>'
+        f'</timePeriod><value>{500 + hour}</value></IntervalReading>'
+        for hour in range(48)
+    )
+    FEED = (
+        '<feed xmlns="http://www.w3.org/2005/Atom"><entry><content>'
+        '<IntervalBlock xmlns="http://naesb.org/espi">{readings}</IntervalBlock>'
+        '</content></entry></feed>'
+    )
+
+    def parse(self, document):
+        return IntervalDataParser().parse(io.BytesIO(document.encode()), 'usage.xml')
+
+    def test_readings_are_parsed(self):
+        source, data = self.parse('<?xml version="1.0"?>' + self.FEED.format(readings=self.READINGS))
+        self.assertEqual(source, 'green_button')
+        self.assertEqual(data.values.size, 48)
+        self.assertAlmostEqual(data.total_kwh, sum(500 + hour for hour in range(48)) / 1000)
+
+    def test_dtd_is_rejected(self):
+        documents = [
+            # Entity expansion
+            '<!DOCTYPE feed [<!ENTITY a "aaaa"><!ENTITY b "&a;&a;&a;&a;">]>' + self.FEED.format(readings='&b;'),
+            # External entity
+            '<!DOCTYPE feed [<!ENTITY x SYSTEM "file:///etc/passwd">]>' + self.FEED.format(readings='&x;'),
+            '<?xml version="1.0"?>\n<!DOCTYPE feed SYSTEM "http://example.com/feed.dtd">'
+            + self.FEED.format(readings=self.READINGS),
+        ]
+        for document in documents:
+            with self.subTest(document=document[:40]):
+                with self.assertRaisesMessage(ValueError, 'DOCTYPE'):
+                    self.parse(document)
+
+
+class TerritoryTests(TestCase):
+    """ZIP extraction and the resolver's ZIP cache"""
+
+    def test_extract_zip_code(self):
+        cases = {
+            '123 Main St, Springfield, IL 62701': '62701',
+            '123 Main St, Springfield IL 62701-1234, USA': '62701',
+            '62701 Main St, Springfield, il. 62704 Apt 3': '62704',
+            '1600 Pennsylvania Ave NW, Washington DC 20500': '20500',
+            '10 Oak Rd 94107': '94107',
+            'Unit 5, 12345 Main St, Springfield IL': None,
+            '12345 Main St': None,
+            '': None,
+        }
+        for address, zip_code in cases.items():
+            with self.subTest(address=address):
+                self.assertEqual(extract_zip_code(address), zip_code)
+
+    def test_empty_lookup_is_not_cached(self):
+        resolver = TerritoryResolver()
+        address = '1 Main St, Springfield, IL 62701'
+        self.assertEqual(resolver.resolve(address).key, 'addr:1 main st springfield il 62701')
+
+        ServiceTerritory.objects.create(zip_code='62701', eia_id='19547', utility_name='Sample Valley')
+        self.assertEqual(resolver.resolve(address).key, 'eia:19547')
+        with self.assertNumQueries(0):
+            resolver.resolve(address)
+
+    def test_territory_only_keys_the_cache(self):
+        ServiceTerritory.objects.create(zip_code='62701', eia_id='19547', utility_name='Sample Valley')
+        http = mock.Mock()
+        http.get.return_value = mock.Mock(status_code=200, json=lambda: {'items': []})
+        provider = RateProvider(
+            api_key='key', cache=TariffCache(ttl=3600, stale_ttl=3600, persistent=False), http=http,
+            resolver=TerritoryResolver()
+        )
+        provider.get_utility_rates('1 Main St, Springfield, IL 62701')
+        provider.get_utility_rates('9 Oak Ave, Springfield, IL 62701')
+
+        http.get.assert_called_once()
+        params = http.get.call_args.kwargs['params']
+        self.assertEqual(params['address'], '1 Main St, Springfield, IL 62701')
+        self.assertNotIn('eia', params)
+
+    def test_load_territories_clears_process_resolver(self):
+        resolver = get_territory_resolver()
+        resolver.clear()
+        ServiceTerritory.objects.create(zip_code='62701', eia_id='19547', utility_name='Sample Valley')
+        self.assertEqual(resolver.resolve('1 Main St, Springfield, IL 62701').key, 'eia:19547')
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('zip,eiaid,utility_name,state\n62701,20001,Other Utility,IL\n')
+        self.addCleanup(os.remove, f.name)
+        call_command('load_territories', f.name, '--replace', stdout=io.StringIO())
+        self.assertEqual(resolver.resolve('1 Main St, Springfield, IL 62701').key, 'eia:20001')
+
+
+def usurdb_items():
+    """Fixture tariffs as a dump would hold them, plus one RateProcessor rejects"""
+    items = copy.deepcopy(load_fixture()['items'])
+    items.append({'label': 'unnamed', 'name': '', 'utility': 'Sample Valley Electric Cooperative'})
+    return items
+
+
+class TariffImportTests(TestCase):
+    """USURDB dumps read incrementally and upserted into the Tariff table"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.items = usurdb_items()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt') as f:
+            f.write(content)
+        return path
+
+    def read(self, content, file_format=FORMAT_JSON):
+        reader = USURDBReader()
+        # A small buffer makes items straddle reads
+        reader.READ_SIZE = 512
+        return list(reader.items(io.BytesIO(content.encode()), file_format))
+
+    def test_json_layouts(self):
+        expected = self.read(json.dumps(self.items))
+        self.assertEqual(len(expected), len(self.items))
+        self.assertEqual(expected[0]['energyratestructure'], self.items[0]['energyratestructure'])
+        self.assertEqual(self.read(json.dumps({'status': 'ok', 'items': self.items})), expected)
+        self.assertEqual(self.read('\n'.join(json.dumps(item) for item in self.items)), expected)
+
+    def test_mongo_export_fields(self):
+        item = dict(self.items[0], startdate={'$date': {'$numberLong': '1672531200000'}}, approved='true')
+        del item['label']
+        item['_id'] = {'$oid': 'abc123'}
+        [read] = self.read(json.dumps([item]))
+        self.assertEqual((read['label'], read['startdate'], read['approved']), ('abc123', 1672531200, True))
+
+    def test_csv_rows_rebuild_items(self):
+        item = self.items[8]
+        row = {}
+        for field, value in item.items():
+            if field.endswith('structure'):
+                for p, tiers in enumerate(value):
+                    for t, tier in enumerate(tiers):
+                        for key, tier_value in tier.items():
+                            row[f"{field}/period{p}/tier{t}{key}"] = tier_value
+            elif isinstance(value, list):
+                row[field] = json.dumps(value)
+            elif field == 'startdate':
+                row[field] = '2023-01-09 00:00:00'
+            else:
+                row[field] = value
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=sorted(row))
+        writer.writeheader()
+        writer.writerow(row)
+
+        [read] = self.read(out.getvalue(), FORMAT_CSV)
+        for field in ('energyratestructure', 'demandratestructure', 'energyweekdayschedule', 'flatdemandmonths'):
+            self.assertEqual(read[field], item[field], msg=field)
+        self.assertEqual((read['eiaid'], read['is_default'], read['startdate']), (19547, True, item['startdate']))
+
+    def test_import_command_upserts(self):
+        path = self.write('usurdb.json.gz', json.dumps(self.items))
+        call_command('import_tariffs', path, '--chunk-size', '3', stdout=io.StringIO())
+        self.assertEqual(Tariff.objects.count(), len(self.items) - 1)
+        self.assertFalse(Tariff.objects.filter(label='unnamed').exists())
+
+        tariff = Tariff.objects.get(label=self.items[1]['label'])
+        self.assertEqual((tariff.eia_id, tariff.name), ('19547', self.items[1]['name']))
+        self.assertEqual(tariff.payload['energyratestructure'], self.items[1]['energyratestructure'])
+
+        self.items[1]['name'] = 'Renamed'
+        call_command('import_tariffs', self.write('usurdb.json', json.dumps(self.items)), stdout=io.StringIO())
+        self.assertEqual(Tariff.objects.count(), len(self.items) - 1)
+        self.assertEqual(Tariff.objects.get(label=self.items[1]['label']).name, 'Renamed')
+
+    def test_local_provider_serves_imported_tariffs(self):
+        self.items[2]['enddate'] = int((timezone.now() - timedelta(days=1)).timestamp())
+        self.items[3]['is_default'] = False
+        call_command('import_tariffs', self.write('usurdb.json', json.dumps(self.items)), stdout=io.StringIO())
+        ServiceTerritory.objects.create(zip_code='62701', eia_id='19547', utility_name='Sample Valley')
+
+        provider = LocalRateProvider(resolver=TerritoryResolver())
+        served = provider.get_utility_rates('1 Main St, Springfield, IL 62701')['items']
+        labels = {item['label'] for item in served}
+        self.assertEqual(len(labels), len(self.items) - 3)
+        self.assertNotIn(self.items[2]['label'], labels)
+        self.assertNotIn(self.items[3]['label'], labels)
+        self.assertEqual(provider.get_utility_rates('1 Main St, Nowhere 99999'), {'items': []})
+
+
+class TariffSyncTests(TestCase):
+    """Incremental refresh of the Tariff table from a newer dump"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.items = usurdb_items()[:-1]
+        # One tariff of a second utility
+        self.items[0]['eiaid'] = 20001
+        self.sync(self.items)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sync(self, items, *args):
+        dump = os.path.join(self.directory.name, 'usurdb.json')
+        changes = os.path.join(self.directory.name, 'changes.json')
+        with open(dump, 'w') as f:
+            json.dump(items, f)
+        out = io.StringIO()
+        call_command('import_tariffs', dump, '--sync', '--changes', changes, '--chunk-size', '4', *args, stdout=out)
+        with open(changes) as f:
+            return json.load(f), out.getvalue()
+
+    def test_first_sync_imports_everything(self):
+        Tariff.objects.all().delete()
+        changes, output = self.sync(self.items)
+        self.assertEqual(Tariff.objects.count(), len(self.items))
+        self.assertEqual(changes['labels'], sorted(item['label'] for item in self.items))
+        self.assertEqual(changes['territories'], ['eia:19547', 'eia:20001'])
+        self.assertIn(f"{len(self.items)} new or changed, 0 unchanged", output)
+
+    def test_unchanged_dump_reprocesses_nothing(self):
+        with mock.patch.object(TariffSync, 'compile_chunk') as compile_chunk:
+            changes, output = self.sync(self.items)
+        compile_chunk.assert_not_called()
+        self.assertEqual(changes, {'labels': [], 'territories': []})
+        self.assertIn(f"0 new or changed, {len(self.items)} unchanged", output)
+
+    def test_changed_expired_and_pruned(self):
+        changed, expired, removed = self.items[3], self.items[4], self.items[0]
+        items = copy.deepcopy(self.items)
+        items[3]['name'] = 'Changed'
+        items[4]['enddate'] = int((timezone.now() - timedelta(days=1)).timestamp())
+        del items[0]
+
+        compiled = []
+        compile_chunk = TariffSync.compile_chunk
+
+        def spy(sync, chunk):
+            compiled.extend(item['label'] for item in chunk)
+            return compile_chunk(sync, chunk)
+
+        with mock.patch.object(TariffSync, 'compile_chunk', spy):
+            changes, output = self.sync(items, '--prune')
+
+        self.assertEqual(sorted(compiled), sorted([changed['label'], expired['label']]))
+        self.assertEqual(changes['labels'], sorted([changed['label'], expired['label'], removed['label']]))
+        self.assertEqual(changes['territories'], ['eia:19547', 'eia:20001'])
+        self.assertIn("1 expired, 1 pruned", output)
+        self.assertEqual(Tariff.objects.count(), len(self.items) - 2)
+        self.assertEqual(Tariff.objects.get(label=changed['label']).name, 'Changed')
+
+    def test_missing_tariffs_kept_without_prune(self):
+        changes, _ = self.sync(self.items[1:])
+        self.assertEqual(changes['labels'], [])
+        self.assertTrue(Tariff.objects.filter(label=self.items[0]['label']).exists())
+
+    def test_affected_territory_cache_is_dropped(self):
+        for territory in ('eia:19547', 'eia:20001'):
+            TariffCacheEntry.objects.create(
+                key=territory, address='1 Main St', territory=territory, payload={'items': []}, fetched_at=timezone.now()
+            )
+        items = copy.deepcopy(self.items)
+        items[0]['name'] = 'Changed'
+        self.sync(items)
+        self.assertEqual(list(TariffCacheEntry.objects.values_list('territory', flat=True)), ['eia:19547'])
+
+    def test_repricing_limited_to_changed_labels(self):
+        user = User.objects.create_user('sync', 'sync@example.com', 'sync')
+        for label in (self.items[1]['label'], self.items[2]['label']):
+            project = Project.objects.create(
+                user=user, name=label, address='1 Main St', consumption=5000, percentage=4.0
+            )
+            ProposalUtility.objects.create(
+                project=project, openei_id=label, rate_name='Rate', average_rate=0.1,
+                first_year_cost=500.0, pricing_matrix=[]
+            )
+        repricer = PortfolioRepricer(
+            rate_provider=None, tier_mode=settings.RATE_TIER_MODE, load_profile_dir=settings.LOAD_PROFILE_DIR,
+            labels=[self.items[2]['label']]
+        )
+        streamed = [project.proposal.openei_id for chunk in repricer._stream_chunks(0) for project in chunk]
+        self.assertEqual(streamed, [self.items[2]['label']])
+
+
+class StubRateProvider(pricing_benchmark.FixtureRateProvider):
+    """Fixture provider that puts every address in one territory"""
+
+    def resolve_territory(self, address):
+        return Territory.for_utility('19547')
+
+
+class PortfolioRepricerTests(TestCase):
+    """Bulk repricing skips unpriceable tariffs and isolates pricing failures"""
+
+    def setUp(self):
+        self.items = load_fixture()['items'][:2] + [partial_schedule_item()]
+        user = User.objects.create_user('reprice', 'reprice@example.com', 'reprice')
+        for item in self.items:
+            project = Project.objects.create(
+                user=user, name=item['label'], address='1 Main St', consumption=5000, percentage=4.0
+            )
+            ProposalUtility.objects.create(
+                project=project, openei_id=item['label'], rate_name='Rate', average_rate=0.1,
+                first_year_cost=500.0, pricing_matrix=[]
+            )
+
+    def reprice(self):
+        return PortfolioRepricer(
+            rate_provider=StubRateProvider({'items': self.items}), tier_mode=settings.RATE_TIER_MODE,
+            load_profile_dir=settings.LOAD_PROFILE_DIR
+        ).run()
+
+    def first_year_cost(self, label):
+        return ProposalUtility.objects.get(openei_id=label).first_year_cost
+
+    def test_tariffs_without_annual_schedule_are_skipped(self):
+        stats = self.reprice()
+        self.assertEqual((stats['repriced'], stats['skipped'], stats['failed']), (2, 1, 0))
+        self.assertEqual(self.first_year_cost('partial-schedule'), 500.0)
+        self.assertNotEqual(self.first_year_cost(self.items[0]['label']), 500.0)
+
+    def test_failing_unit_does_not_abort_the_chunk(self):
+        failing = self.items[1]['label']
+        price_unit = portfolio_repricer._price_unit
+
+        def flaky_price_unit(unit):
+            if unit[5].label == failing:
+                raise ValueError("broken tariff")
+            return price_unit(unit)
+
+        with mock.patch.object(portfolio_repricer, '_price_unit', flaky_price_unit):
+            stats = self.reprice()
+        self.assertEqual((stats['repriced'], stats['skipped'], stats['failed']), (1, 1, 1))
+        self.assertEqual(self.first_year_cost(failing), 500.0)
+        self.assertNotEqual(self.first_year_cost(self.items[0]['label']), 500.0)
+
+
+class PricingBenchmarkTests(SimpleTestCase):
+    """The committed fixture and the baseline bench_pricing --check compares against"""
+
+    def test_fixture_tariffs_are_priceable(self):
+        fixture = load_fixture()
+        rates = RateProcessor(cache=ProcessedRateCache()).process_rate_data(fixture)
+        self.assertEqual(len(rates), len(fixture['items']))
+        self.assertTrue(all(rate['compiled'].annual_valid for rate in rates))
+
+    def test_baseline_matches_fixture_run(self):
+        baseline = load_report(DEFAULT_BASELINE)
+        benchmark = PricingBenchmark(
+            tier_mode=baseline['tier_mode'], repeats=1, fixture=load_fixture(), fixture_name=DEFAULT_FIXTURE.name
+        )
+        with mock.patch.object(pricing_benchmark, 'MIN_SAMPLE_SECONDS', 0):
+            report = benchmark.run(['1'])
+
+        self.assertIsNone(baseline_mismatch(report, baseline))
+        measured = {(result['scenario'], result['benchmark']) for result in baseline['results']}
+        for result in report['results']:
+            self.assertIn((result['scenario'], result['benchmark']), measured)
+            self.assertGreater(result['ops_per_second'], 0)
+
+    def test_baseline_mismatch(self):
+        report = {'fixture': 'synthetic', 'tier_mode': settings.RATE_TIER_MODE, 'results': []}
+        self.assertIn('fixture', baseline_mismatch(report, load_report(DEFAULT_BASELINE)))
+
+    def test_environment_differences(self):
+        baseline = {'python': '3.11.7', 'numpy': '2.1.3'}
+        self.assertEqual(environment_differences(dict(baseline), baseline), [])
+        differences = environment_differences({'python': '3.11.7', 'numpy': '2.4.6'}, baseline)
+        self.assertEqual(len(differences), 1)
+        self.assertIn('numpy', differences[0])
+
+    def test_find_regressions(self):
+        baseline = {'results': [{'scenario': '50', 'benchmark': 'daily_cost', 'ops_per_second': 1000.0}]}
+
+        def report(ops_per_second):
+            return {'results': [{'scenario': '50', 'benchmark': 'daily_cost', 'ops_per_second': ops_per_second}]}
+
+        self.assertEqual(find_regressions(report(850.0), baseline, 0.2), [])
+        self.assertEqual(len(find_regressions(report(700.0), baseline, 0.2)), 1)
+        self.assertEqual(find_regressions(report(1.0), {'results': []}, 0.2), [])
@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import HomeView, ProjectViewSet, ProposalUtilityViewSet, ProjectWebhookViewSet
+from .views import (
+    HomeView, ProjectViewSet, ProposalUtilityViewSet, ProjectWebhookViewSet,
+    CalculateRatesAsyncView, MetricsView
+)
 
 router = DefaultRouter()
 router.register(r'api/projects', ProjectViewSet, basename='project')
@@ -9,5 +12,11 @@ router.register(r'api/webhooks/project', ProjectWebhookViewSet, basename='webhoo
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path(
+        'api/projects/<int:pk>/calculate_rates_async/',
+        CalculateRatesAsyncView.as_view(),
+        name='project-calculate-rates-async'
+    ),
     path('', include(router.urls)),
 ]
@@ -2,10 +2,14 @@ from .home_view import HomeView
 from .project_viewset import ProjectViewSet
 from .proposal_utility_viewset import ProposalUtilityViewSet
 from .project_webhook_view import ProjectWebhookViewSet
+from .async_rate_view import CalculateRatesAsyncView
+from .metrics_view import MetricsView
 
 __all__ = [
     'HomeView',
     'ProjectViewSet',
     'ProposalUtilityViewSet',
-    'ProjectWebhookViewSet'
+    'ProjectWebhookViewSet',
+    'CalculateRatesAsyncView',
+    'MetricsView'
     ]
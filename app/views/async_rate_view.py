@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from ..models import Project
+from ..serializers import CalculateRatesOptionsSerializer
+from ..services.metrics import metrics, span
+from ..services.rate_pricing import RatePricer
+from ..services.rate_provider import get_rate_provider
+
+logger = logging.getLogger(__name__)
+
+_pricing_executor: Optional[ThreadPoolExecutor] = None
+_pricing_executor_lock = threading.Lock()
+
+
+def get_pricing_executor() -> ThreadPoolExecutor:
+    """Process-wide executor that runs CPU-bound pricing off the event loop"""
+    global _pricing_executor
+    if _pricing_executor is None:
+        with _pricing_executor_lock:
+            if _pricing_executor is None:
+                _pricing_executor = ThreadPoolExecutor(
+                    max_workers=settings.PRICING_EXECUTOR_WORKERS,
+                    thread_name_prefix='pricing'
+                )
+    return _pricing_executor
+
+
+class CalculateRatesAsyncView(View):
+    """
+    Async variant of ProjectViewSet.calculate_rates for ASGI deployments.
+
+    The OpenEI lookup is awaited on a pooled async HTTP client and pricing
+    runs on a shared executor, so one worker can keep many projects in
+    flight. Responses match the synchronous endpoint.
+    """
+
+    @staticmethod
+    def _authenticate(request):
+        """
+        Resolve the user with the DRF authentication classes used by every
+        other API endpoint, including the CSRF check of SessionAuthentication.
+
+        Args:
+            request: Django HttpRequest
+
+        Returns:
+            Authenticated user, or AnonymousUser
+        """
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        )
+        return drf_request.user
+
+    async def post(self, request, pk):
+        try:
+            user = await sync_to_async(self._authenticate)(request)
+        except exceptions.APIException as e:
+            return JsonResponse({"detail": str(e.detail)}, status=e.status_code)
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403
+            )
+
+        project = await Project.objects.filter(pk=pk, user=user).afirst()
+        if project is None:
+            return JsonResponse({"detail": "Not found."}, status=404)
+
+        try:
+            body = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({"detail": "JSON parse error."}, status=400)
+        options = CalculateRatesOptionsSerializer(data=body)
+        if not options.is_valid():
+            return JsonResponse(options.errors, status=400)
+
+        interval_data = None
+        if options.validated_data.pop('use_interval_data'):
+            series = await project.interval_series.order_by('-created_at').afirst()
+            if series is None:
+                return JsonResponse({"error": "No interval data uploaded for this project"}, status=400)
+            interval_data = series.to_interval_data()
+
+        try:
+            rate_provider = get_rate_provider()
+            raw_rates = await rate_provider.aget_utility_rates(project.address)
+
+            rate_pricer = RatePricer(
+                tier_mode=settings.RATE_TIER_MODE,
+                load_profile_dir=settings.LOAD_PROFILE_DIR,
+                horizon=settings.PROJECTION_HORIZON_YEARS,
+                discount_rate=settings.PROJECTION_DISCOUNT_RATE
+            )
+            # Carry the request's timing trace into the executor thread
+            results = await asyncio.get_running_loop().run_in_executor(
+                get_pricing_executor(),
+                partial(
+                    contextvars.copy_context().run,
+                    rate_pricer.price,
+                    raw_rates,
+                    project.consumption,
+                    project.percentage,
+                    project.load_profile,
+                    interval_data=interval_data,
+                    **options.validated_data
+                )
+            )
+
+            with span('serialize'):
+                return JsonResponse(results, safe=False)
+
+        except Exception as e:
+            metrics.increment('request_errors_total', view='calculate_rates_async')
+            logger.error(f"Error calculating rates for project {pk}: {str(e)}")
+            return JsonResponse(
+                {"error": "Failed to calculate utility rates"},
+                status=500
+            )
@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from ..services.metrics import metrics
+
+
+class MetricsView(View):
+    """
+    Prometheus text exposition of the pricing counters and stage histograms.
+
+    Scrapes need the METRICS_TOKEN bearer token; without one configured the
+    endpoint only exists in DEBUG.
+    """
+
+    def get(self, request):
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected.encode()):
+                return HttpResponse(status=401)
+        elif not settings.DEBUG:
+            raise Http404()
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,16 +1,28 @@
 import logging
+from collections import OrderedDict
+from datetime import timezone as dt_timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
+from django.db.models.functions import Left
 from django.conf import settings
+from django.utils import timezone
 
-from ..models import Project, ProposalUtility
-from ..serializers import ProjectSerializer, ProposalUtilitySerializer
-from ..services.rate_calculator import RateCalculator
-from ..services.rate_provider import RateProvider
-from ..services.rate_processor import RateProcessor
+from ..models import IntervalSeries, Project, ProposalUtility
+from ..pagination import ProjectCursorPagination
+from ..serializers import (
+    DESCRIPTION_PREVIEW_LENGTH, BatchCalculateRatesSerializer, CalculateRatesOptionsSerializer,
+    IntervalSeriesSerializer, ProjectListSerializer, ProjectSerializer, ProposalUtilitySerializer
+)
+from ..services.interval_data import IntervalDataParser
+from ..services.metrics import metrics
+from ..services.rate_pricing import RatePricer
+from ..services.rate_provider import get_rate_provider
+from ..services.territory import get_territory_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +33,28 @@ class ProjectViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ProjectCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'updated_at']
 
     def get_queryset(self):
         """Filter queryset to return only the authenticated user's projects"""
-        return Project.objects.filter(user=self.request.user)
+        queryset = Project.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            # One query per page: proposals are joined in, large columns skipped
+            # and only the start of the description is read for the card
+            queryset = (
+                queryset
+                .select_related('proposal')
+                .defer('description', 'proposal__pricing_matrix')
+                .annotate(description_preview=Left('description', DESCRIPTION_PREVIEW_LENGTH))
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProjectListSerializer
+        return ProjectSerializer
 
     def perform_create(self, serializer):
         """Create a new project associated with the current user"""
@@ -40,69 +70,225 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def calculate_rates(self, request, pk=None):
         """
         Calculate utility rates for a project based on its address
-        and consumption data
+        and consumption data. The body may set horizon, discount_rate and
+        an escalator_grid for a sensitivity analysis, top_k to return
+        only the cheapest rates, and use_interval_data to price the
+        project's latest uploaded interval series.
         """
         project = self.get_object()
+        options = CalculateRatesOptionsSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+
+        interval_data = None
+        if options.validated_data.pop('use_interval_data'):
+            series = project.interval_series.order_by('-created_at').first()
+            if series is None:
+                return Response(
+                    {"error": "No interval data uploaded for this project"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            interval_data = series.to_interval_data()
 
         try:
-            # Initialize providers and calculators
-            rate_provider = RateProvider(api_key=settings.OPENEI_API_KEY)
-            rate_processor = RateProcessor()
-            rate_calculator = RateCalculator()
+            # Initialize provider and pricer
+            rate_provider = get_rate_provider()
+            rate_pricer = RatePricer(
+                tier_mode=settings.RATE_TIER_MODE,
+                load_profile_dir=settings.LOAD_PROFILE_DIR,
+                horizon=settings.PROJECTION_HORIZON_YEARS,
+                discount_rate=settings.PROJECTION_DISCOUNT_RATE
+            )
 
-            # Fetch and process rates
+            # Fetch rates and calculate costs for each one
             raw_rates = rate_provider.get_utility_rates(project.address)
-            processed_rates = rate_processor.process_rate_data(raw_rates)
-
-            # Calculate costs for each rate
-            results = []
-            for rate in processed_rates:
-                yearly_costs = rate_calculator.calculate_yearly_cost(
-                    rate_info=rate,
-                    yearly_consumption=project.consumption,
-                    escalator=project.percentage
-                )
-
-                results.append({
-                    'rate_name': rate['name'],
-                    'utility': rate['utility'],
-                    'avg_rate': rate['avg_rate'],
-                    'first_year_cost': yearly_costs[0],
-                    'yearly_projection': yearly_costs
-                })
+            results = rate_pricer.price(
+                raw_rates,
+                yearly_consumption=project.consumption,
+                escalator=project.percentage,
+                load_profile_key=project.load_profile,
+                interval_data=interval_data,
+                **options.validated_data
+            )
 
             return Response(results, status=status.HTTP_200_OK)
 
         except Exception as e:
+            metrics.increment('request_errors_total', view='calculate_rates')
             logger.error(f"Error calculating rates for project {pk}: {str(e)}")
             return Response(
                 {"error": "Failed to calculate utility rates"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser])
+    def upload_intervals(self, request, pk=None):
+        """
+        Upload metered interval usage as a utility CSV export or Green
+        Button XML file. The file is parsed as a stream and stored as a
+        packed array series on the project.
+        """
+        project = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "No file uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            parser = IntervalDataParser(max_intervals=settings.INTERVAL_DATA_MAX_INTERVALS)
+            source, data = parser.parse(upload.file, upload.name)
+        except Exception as e:
+            logger.error(f"Error parsing interval data for project {pk}: {str(e)}")
+            return Response({"error": f"Invalid interval data: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        series = IntervalSeries.objects.create(
+            project=project,
+            source=source,
+            start=data.start.replace(tzinfo=dt_timezone.utc),
+            utc_offset_minutes=data.utc_offset_minutes,
+            interval_minutes=data.interval_minutes,
+            count=data.values.size,
+            missing_intervals=data.missing,
+            total_kwh=data.total_kwh,
+            values=data.to_bytes()
+        )
+        logger.info(f"Stored {series.count} intervals for project {pk}")
+        return Response(IntervalSeriesSerializer(series).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def calculate_rates_batch(self, request):
+        """
+        Calculate utility rates for many saved projects and inline
+        scenarios in one request.
+
+        Scenarios are grouped by service territory, so each territory's
+        rates are fetched and processed once and priced for all of its
+        scenarios together. Each territory gets one columnar result,
+        labelled with the first address seen for it.
+        """
+        serializer = BatchCalculateRatesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project_ids = list(dict.fromkeys(serializer.validated_data['project_ids']))
+        scenarios = serializer.validated_data['scenarios']
+
+        projects = {
+            project.id: project
+            for project in self.get_queryset()
+            .filter(id__in=project_ids)
+            .only('id', 'address', 'consumption', 'percentage', 'load_profile')
+        }
+        errors = [
+            {'project_id': project_id, 'error': "Project not found"}
+            for project_id in project_ids if project_id not in projects
+        ]
+
+        # territory -> (address, project ids, scenario indices, consumptions, escalators, load profiles)
+        groups = OrderedDict()
+
+        resolver = get_territory_resolver()
+
+        def add(address, project_id, scenario, consumption, escalator, load_profile):
+            key = resolver.resolve(address).key
+            if key not in groups:
+                groups[key] = (address, [], [], [], [], [])
+            _, ids, indices, consumptions, escalators, profiles = groups[key]
+            ids.append(project_id)
+            indices.append(scenario)
+            consumptions.append(consumption)
+            escalators.append(escalator)
+            profiles.append(load_profile)
+
+        for project in projects.values():
+            add(project.address, project.id, None, project.consumption, project.percentage, project.load_profile)
+        for index, scenario in enumerate(scenarios):
+            add(scenario['address'], None, index, scenario['consumption'],
+                scenario['percentage'], scenario['load_profile'])
+
+        rate_provider = get_rate_provider()
+        rate_pricer = RatePricer(
+            tier_mode=settings.RATE_TIER_MODE,
+            load_profile_dir=settings.LOAD_PROFILE_DIR,
+            horizon=settings.PROJECTION_HORIZON_YEARS
+        )
+
+        results = []
+        for address, ids, indices, consumptions, escalators, profiles in groups.values():
+            try:
+                raw_rates = rate_provider.get_utility_rates(address)
+                priced = rate_pricer.price_batch(raw_rates, consumptions, escalators, profiles)
+            except Exception as e:
+                metrics.increment('request_errors_total', view='calculate_rates_batch')
+                logger.error(f"Error calculating batch rates for {address}: {str(e)}")
+                errors.append({
+                    'address': address,
+                    'project_id': [project_id for project_id in ids if project_id is not None],
+                    'scenario': [index for index in indices if index is not None],
+                    'error': "Failed to calculate utility rates"
+                })
+                continue
+
+            results.append({'address': address, 'project_id': ids, 'scenario': indices, **priced})
+
+        return Response({'results': results, 'errors': errors}, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def select_rate(self, request, pk=None):
         """
         Select a specific utility rate and create/update the associated
-        ProposalUtility instance
+        ProposalUtility instance.
+
+        The body only identifies the rate, by its OpenEI label or by
+        rate_name (and optionally utility). The projection is recomputed
+        server-side from the cached tariff and stored with the tariff's
+        content hash and the engine version, so reads serve the stored
+        numbers without pricing.
         """
         project = self.get_object()
-        rate_data = request.data
+        label = request.data.get('label')
+        rate_name = request.data.get('rate_name')
+        if not label and not rate_name:
+            return Response({"error": "label or rate_name is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
+            rate_provider = get_rate_provider()
+            rate_pricer = RatePricer(
+                tier_mode=settings.RATE_TIER_MODE,
+                load_profile_dir=settings.LOAD_PROFILE_DIR,
+                horizon=settings.PROJECTION_HORIZON_YEARS,
+                discount_rate=settings.PROJECTION_DISCOUNT_RATE
+            )
+            result = rate_pricer.price_selected(
+                rate_provider.get_utility_rates(project.address),
+                yearly_consumption=project.consumption,
+                escalator=project.percentage,
+                label=label,
+                rate_name=rate_name,
+                utility=request.data.get('utility'),
+                load_profile_key=project.load_profile
+            )
+            if result is None:
+                return Response(
+                    {"error": f"Rate {label or rate_name} not found for this project's address"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             with transaction.atomic():
                 # Update project with selected rate
-                project.selected_rate = rate_data.get('rate_name', '')
-                project.save()
+                project.selected_rate = result['rate_name']
+                project.save(update_fields=['selected_rate', 'updated_at'])
 
                 # Create or update proposal
                 proposal_data = {
                     'project': project,
-                    'openei_id': rate_data.get('label', ''),
-                    'rate_name': rate_data.get('rate_name', ''),
-                    'average_rate': rate_data.get('avg_rate', 0.0),
-                    'first_year_cost': rate_data.get('first_year_cost', 0.0),
-                    'pricing_matrix': rate_data.get('yearly_projection', [])
+                    'openei_id': result['label'],
+                    'rate_name': result['rate_name'],
+                    'average_rate': result['avg_rate'],
+                    'first_year_cost': result['first_year_cost'],
+                    'pricing_matrix': result['yearly_projection'],
+                    'cumulative_cost': result['cumulative_cost'],
+                    'npv': result['npv'],
+                    'horizon': result['horizon'],
+                    'tariff_hash': result['tariff_hash'],
+                    'engine_version': result['engine_version'],
+                    'computed_at': timezone.now()
                 }
 
                 proposal, created = ProposalUtility.objects.update_or_create(
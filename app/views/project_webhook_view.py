@@ -1,5 +1,4 @@
 import logging
-import requests
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,8 +6,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
 from django.db import transaction
 
-from ..models import Project
+from ..models import Project, WebhookOutbox
 from ..serializers import ProjectSerializer
+from ..services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +19,29 @@ class ProjectWebhookHandler:
         self.webhook_url = settings.WEBHOOK_URL
         if not self.webhook_url:
             raise ValueError("WEBHOOK_URL setting is not configured")
+        self.http = get_http_client()
+
+    def enqueue(self, event_type, project_data):
+        """
+        Queue a webhook notification in the outbox
+
+        Call inside the transaction that writes the project, so the
+        notification is recorded if and only if the write commits. Delivery
+        happens later in `python manage.py dispatch_webhooks`.
+
+        Args:
+            event_type (str): Type of event (e.g., 'project.created', 'project.updated')
+            project_data (dict): Project data to send in webhook
+        """
+        return WebhookOutbox.objects.create(
+            event=event_type,
+            url=self.webhook_url,
+            payload=project_data
+        )
 
     def notify(self, event_type, project_data):
         """
-        Send webhook notification for project events
+        Send webhook notification for project events synchronously
 
         Args:
             event_type (str): Type of event (e.g., 'project.created', 'project.updated')
@@ -36,7 +55,7 @@ class ProjectWebhookHandler:
 
             logger.info(f"Sending webhook to {self.webhook_url} with payload: {payload}")
 
-            response = requests.post(
+            response = self.http.post(
                 self.webhook_url,
                 json=payload,
                 headers={'Content-Type': 'application/json'}
@@ -73,7 +92,7 @@ class ProjectWebhookViewSet(viewsets.ModelViewSet):
         return Project.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        """Create a new project and send webhook notification"""
+        """Create a new project and queue a webhook notification"""
         try:
             with transaction.atomic():
                 # Save the project
@@ -91,18 +110,15 @@ class ProjectWebhookViewSet(viewsets.ModelViewSet):
                     'description': project.description
                 }
 
-                # Send webhook notification
-                webhook_success = self.webhook_handler.notify('project.created', project_data)
-
-                if not webhook_success:
-                    logger.warning(f"Webhook delivery failed for project {project.id}")
+                # Queue webhook notification for the dispatcher
+                self.webhook_handler.enqueue('project.created', project_data)
 
         except Exception as e:
             logger.error(f"Error creating project: {str(e)}")
             raise
 
     def perform_update(self, serializer):
-        """Update project and send webhook notification"""
+        """Update project and queue a webhook notification"""
         try:
             with transaction.atomic():
                 project = serializer.save()
@@ -120,32 +136,26 @@ class ProjectWebhookViewSet(viewsets.ModelViewSet):
                     'selected_rate': project.selected_rate
                 }
 
-                # Send webhook notification
-                webhook_success = self.webhook_handler.notify('project.updated', project_data)
-
-                if not webhook_success:
-                    logger.warning(f"Webhook delivery failed for project {project.id}")
+                # Queue webhook notification for the dispatcher
+                self.webhook_handler.enqueue('project.updated', project_data)
 
         except Exception as e:
             logger.error(f"Error updating project: {str(e)}")
             raise
 
     def perform_destroy(self, instance):
-        """Delete project and send webhook notification"""
+        """Delete project and queue a webhook notification"""
         try:
             project_data = {
                 'id': instance.id,
                 'user_id': self.request.user.id
             }
 
-            # Send webhook notification before deletion
-            webhook_success = self.webhook_handler.notify('project.deleted', project_data)
-
-            if not webhook_success:
-                logger.warning(f"Webhook delivery failed for project {instance.id}")
-
-            instance.delete()
-            logger.info(f"Deleted project {instance.id}")
+            with transaction.atomic():
+                # Queue webhook notification alongside the deletion
+                self.webhook_handler.enqueue('project.deleted', project_data)
+                instance.delete()
+            logger.info(f"Deleted project {project_data['id']}")
 
         except Exception as e:
             logger.error(f"Error deleting project: {str(e)}")
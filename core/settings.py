@@ -29,8 +29,66 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 # OpenEI API settings
 OPENEI_API_KEY= os.getenv('OPENEI_API_KEY')
 
+# Rate calculation settings
+# 'hourly' applies OpenEI tier limits to each hour's kWh (the calculator's default),
+# 'monthly' to month-to-date kWh; switching changes every computed cost
+RATE_TIER_MODE = os.getenv('RATE_TIER_MODE', 'hourly')
+
+# Threads pricing tariffs for the async calculate_rates endpoint
+PRICING_EXECUTOR_WORKERS = int(os.getenv('PRICING_EXECUTOR_WORKERS', 4))
+
+# Default cost projection length in years and the annual discount rate (percent)
+# applied to the NPV totals returned with each projection
+PROJECTION_HORIZON_YEARS = int(os.getenv('PROJECTION_HORIZON_YEARS', 20))
+PROJECTION_DISCOUNT_RATE = float(os.getenv('PROJECTION_DISCOUNT_RATE', 5.0))
+
+# Upper bound on projects plus inline scenarios in one batch calculate_rates request
+RATE_BATCH_MAX_ITEMS = int(os.getenv('RATE_BATCH_MAX_ITEMS', 500))
+
+# Default and largest page size of cursor-paginated project and proposal lists
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+
+# Fraction of requests whose stage timings are recorded and returned in a
+# Server-Timing header; counters on /metrics are always kept
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', 0.01))
+# Bearer token required to scrape /metrics; when empty it is only served with DEBUG on
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Largest interval series accepted from a usage upload (5 years of 15-minute data)
+INTERVAL_DATA_MAX_INTERVALS = int(os.getenv('INTERVAL_DATA_MAX_INTERVALS', 5 * 366 * 96))
+
+# Directory of memory-mapped 8760-hour load profiles (<key>.npy),
+# populated by `python manage.py build_load_profiles`
+LOAD_PROFILE_DIR = os.getenv('LOAD_PROFILE_DIR', str(BASE_DIR / 'app' / 'data' / 'load_profiles'))
+
+# Where rates are looked up: 'openei' (live API) or 'local' (the Tariff
+# table imported by `python manage.py import_tariffs`)
+TARIFF_SOURCE = os.getenv('TARIFF_SOURCE', 'openei')
+
+# Tariff cache: entries are fresh for TARIFF_CACHE_TTL seconds and served
+# stale (while refreshing in the background) until TARIFF_CACHE_STALE_TTL
+TARIFF_CACHE_TTL = int(os.getenv('TARIFF_CACHE_TTL', 7 * 24 * 3600))
+TARIFF_CACHE_STALE_TTL = int(os.getenv('TARIFF_CACHE_STALE_TTL', 30 * 24 * 3600))
+TARIFF_CACHE_MAX_ENTRIES = int(os.getenv('TARIFF_CACHE_MAX_ENTRIES', 512))
+
+# Outbound HTTP (OpenEI, webhooks): timeouts in seconds, per-host pool size,
+# retries with jittered exponential backoff, and the share of traffic that
+# may be spent on retries
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_RETRY_BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', 0.2))
+
 # Webhook settings
 WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+# Outbox delivery: attempts before dead-lettering, concurrent deliveries and
+# rows claimed per batch by `python manage.py dispatch_webhooks`
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 8))
+WEBHOOK_DISPATCH_WORKERS = int(os.getenv('WEBHOOK_DISPATCH_WORKERS', 4))
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 50))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -51,6 +109,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',